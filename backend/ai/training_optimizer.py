@@ -1,17 +1,399 @@
 import numpy as np
-import pandas as pd
-from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_squared_error, accuracy_score
 import json
-from datetime import datetime, timedelta
+from collections import namedtuple
+from enum import IntEnum
+from dataclasses import dataclass, fields
+from bisect import bisect_right
+from copy import deepcopy
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from types import MappingProxyType
 import sys
 import os
 
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; the kernels below then run as plain NumPy
+    prange = range
+    
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
 # Add the backend directory to the path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+class Level(IntEnum):
+    """Fitness levels, interned to small ints; OTHER stands for any unrecognised level"""
+    BEGINNER = 0
+    INTERMEDIATE = 1
+    ADVANCED = 2
+    ELITE = 3
+    OTHER = 4
+
+class Sport(IntEnum):
+    """Sport types (mirrors models.user.SportType); unrecognised sports map to OTHER"""
+    FOOTBALL = 0
+    BASKETBALL = 1
+    TENNIS = 2
+    RUNNING = 3
+    CYCLING = 4
+    SWIMMING = 5
+    VOLLEYBALL = 6
+    BADMINTON = 7
+    OTHER = 8
+
+_LEVELS_BY_NAME = MappingProxyType({level.name.lower(): level for level in Level})
+_SPORTS_BY_NAME = MappingProxyType({sport.name.lower(): sport for sport in Sport})
+
+def _parse_level(value):
+    """Level for a fitness level name such as 'elite'"""
+    return value if isinstance(value, Level) else _LEVELS_BY_NAME.get(value, Level.OTHER)
+
+def _parse_sport(value):
+    """Sport for a sport type name such as 'tennis'"""
+    return value if isinstance(value, Sport) else _SPORTS_BY_NAME.get(value, Sport.OTHER)
+
+# Static lookup tables, built once at import instead of on every call
+
+FocusSpec = namedtuple('FocusSpec', 'primary_type secondary_type sport_adjustments')
+
+# Periodization model: alternate between different focuses (indexed by week cycle)
+_FOCUS_CYCLE = (
+    FocusSpec('strength', 'power', None),
+    FocusSpec('hiit', 'agility', None),
+    FocusSpec('endurance', 'sport_specific', None),
+    FocusSpec('agility', 'flexibility', None)
+)
+
+_SPORT_ADJUSTMENTS = MappingProxyType({
+    Sport.FOOTBALL: MappingProxyType({'strength': 1.2, 'agility': 1.3, 'power': 1.1}),
+    Sport.BASKETBALL: MappingProxyType({'agility': 1.3, 'hiit': 1.2, 'power': 1.1}),
+    Sport.TENNIS: MappingProxyType({'agility': 1.4, 'endurance': 1.1, 'flexibility': 1.2}),
+    Sport.RUNNING: MappingProxyType({'endurance': 1.4, 'hiit': 1.2, 'strength': 0.9}),
+    Sport.CYCLING: MappingProxyType({'endurance': 1.3, 'strength': 1.1, 'hiit': 1.1}),
+    Sport.SWIMMING: MappingProxyType({'endurance': 1.3, 'flexibility': 1.2, 'strength': 1.1})
+})
+
+# Exercise database by type and sport
+_EXERCISE_DB = MappingProxyType({
+    'strength': MappingProxyType({
+        Level.BEGINNER: ('bodyweight_squats', 'push_ups', 'planks', 'lunges'),
+        Level.INTERMEDIATE: ('goblet_squats', 'deadlifts', 'bench_press', 'rows'),
+        Level.ADVANCED: ('back_squats', 'deadlifts', 'bench_press', 'clean_pulls'),
+        Level.ELITE: ('back_squats', 'deadlifts', 'power_cleans', 'snatches')
+    }),
+    'hiit': MappingProxyType({
+        Level.BEGINNER: ('burpees', 'mountain_climbers', 'jumping_jacks', 'high_knees'),
+        Level.INTERMEDIATE: ('box_jumps', 'battle_ropes', 'kettlebell_swings', 'sprints'),
+        Level.ADVANCED: ('plyometric_jumps', 'medicine_ball_slams', 'sprint_intervals'),
+        Level.ELITE: ('depth_jumps', 'reactive_jumps', 'olympic_lift_complexes')
+    }),
+    'agility': MappingProxyType({
+        'all': ('ladder_drills', 't_test', 'cone_drills', '5_10_5_drill', 'reactive_drills')
+    }),
+    'endurance': MappingProxyType({
+        'all': ('tempo_runs', 'bike_intervals', 'swimming_sets', 'rowing_intervals')
+    }),
+    'sport_specific': MappingProxyType({
+        Sport.FOOTBALL: ('40_yard_dash', 'position_drills', 'tackling_drills'),
+        Sport.BASKETBALL: ('suicide_drills', 'defensive_slides', 'shooting_drills'),
+        Sport.TENNIS: ('court_sprints', 'serve_practice', 'volley_drills'),
+        Sport.RUNNING: ('interval_training', 'hill_repeats', 'tempo_runs'),
+        Sport.CYCLING: ('hill_climbs', 'sprint_intervals', 'time_trials'),
+        Sport.SWIMMING: ('stroke_technique', 'flip_turns', 'breathing_drills')
+    })
+})
+
+# Exercise picks pre-sliced at import: up to 3 for the focus type (per fitness level, or 'all'),
+# plus up to 2 sport-specific ones
+_PRIMARY_EXERCISES = MappingProxyType({
+    (exercise_type, level): names[:3]
+    for exercise_type, by_level in _EXERCISE_DB.items() if exercise_type != 'sport_specific'
+    for level, names in by_level.items() if level != 'all'
+})
+_PRIMARY_EXERCISES_ALL = MappingProxyType({
+    exercise_type: by_level['all'][:3]
+    for exercise_type, by_level in _EXERCISE_DB.items() if 'all' in by_level
+})
+_SPORT_EXERCISES = MappingProxyType({
+    sport: names[:2] for sport, names in _EXERCISE_DB['sport_specific'].items()
+})
+
+# Weekly improvement rates by metric (% per week)
+_BASE_IMPROVEMENT_RATES = MappingProxyType({
+    'power': 2.0,
+    'speed': 1.5,
+    'agility': 1.8,
+    'endurance': 2.5,
+    'strength': 2.2,
+    'flexibility': 1.0
+})
+
+# Fitness level adjustments for improvement rates
+_LEVEL_MULTIPLIERS = MappingProxyType({
+    Level.BEGINNER: 1.5,
+    Level.INTERMEDIATE: 1.0,
+    Level.ADVANCED: 0.7,
+    Level.ELITE: 0.5
+})
+
+# Session names, preformatted for up to 15 training days per week
+_SESSION_NAMES = tuple("Training Day %d" % day for day in range(1, 16))
+
+# Daily session focus rotation, by weekly training frequency (<=3, <=5, more)
+_FOCUS_LOW = ('Full Body', 'Upper Body', 'Lower Body')
+_FOCUS_MED = ('Power', 'Strength', 'Endurance', 'Agility', 'Recovery')
+_FOCUS_HIGH = ('Power', 'Strength', 'Endurance', 'Agility', 'Sport-Specific', 'Recovery', 'Active Recovery')
+
+# Session duration / difficulty scaling by fitness level
+_LEVEL_ADJUSTMENTS = MappingProxyType({
+    Level.BEGINNER: MappingProxyType({'duration': 0.8, 'difficulty': 0.7}),
+    Level.INTERMEDIATE: MappingProxyType({'duration': 1.0, 'difficulty': 1.0}),
+    Level.ADVANCED: MappingProxyType({'duration': 1.2, 'difficulty': 1.2}),
+    Level.ELITE: MappingProxyType({'duration': 1.4, 'difficulty': 1.4})
+})
+
+# Array form of _LEVEL_ADJUSTMENTS indexed by Level, for batch plan generation (OTHER uses intermediate)
+_LEVEL_DURATION = np.array([
+    _LEVEL_ADJUSTMENTS.get(level, _LEVEL_ADJUSTMENTS[Level.INTERMEDIATE])['duration'] for level in Level
+])
+_LEVEL_DIFFICULTY = np.array([
+    _LEVEL_ADJUSTMENTS.get(level, _LEVEL_ADJUSTMENTS[Level.INTERMEDIATE])['difficulty'] for level in Level
+])
+
+# Target physiological adaptations, before focus-specific adjustments
+_BASE_ADAPTATIONS = MappingProxyType({
+    'muscle_fiber_types': MappingProxyType({
+        'type_2_activation': 0.7,  # Focus on Type 2 fibers
+        'type_1_endurance': 0.3
+    }),
+    'energy_systems': MappingProxyType({
+        'phosphocreatine': 0.4,
+        'glycolytic': 0.4,
+        'oxidative': 0.2
+    }),
+    'neuromuscular': MappingProxyType({
+        'power_output': 0.8,
+        'coordination': 0.6,
+        'reaction_time': 0.5
+    }),
+    'mitochondrial': MappingProxyType({
+        'density_increase': 0.3,
+        'enzyme_activity': 0.4
+    })
+})
+
+# Adjustments by training focus: (group, adaptation, target)
+_ADAPTATION_PATCHES = MappingProxyType({
+    'strength': (('muscle_fiber_types', 'type_2_activation', 0.9), ('neuromuscular', 'power_output', 0.9)),
+    'endurance': (('mitochondrial', 'density_increase', 0.8), ('energy_systems', 'oxidative', 0.6)),
+    'hiit': (('energy_systems', 'glycolytic', 0.7), ('muscle_fiber_types', 'type_2_activation', 0.8))
+})
+
+def _build_adaptations(patch):
+    """Plain (JSON-serializable) adaptations dict with a patch applied"""
+    adaptations = {group: dict(targets) for group, targets in _BASE_ADAPTATIONS.items()}
+    for group, name, target in patch:
+        adaptations[group][name] = target
+    return adaptations
+
+# Materialized once per focus type and shared between plans
+_TARGET_ADAPTATIONS = MappingProxyType({
+    focus: _build_adaptations(patch) for focus, patch in _ADAPTATION_PATCHES.items()
+})
+_DEFAULT_ADAPTATIONS = _build_adaptations(())
+
+# Training type multipliers for different metrics
+_TRAINING_MULTIPLIERS = MappingProxyType({
+    'strength': MappingProxyType({
+        'power': 1.3,
+        'strength': 1.5,
+        'speed': 1.1,
+        'agility': 0.9,
+        'endurance': 0.8
+    }),
+    'hiit': MappingProxyType({
+        'power': 1.4,
+        'speed': 1.3,
+        'agility': 1.2,
+        'endurance': 1.2,
+        'strength': 1.0
+    }),
+    'endurance': MappingProxyType({
+        'endurance': 1.5,
+        'speed': 1.1,
+        'power': 0.8,
+        'agility': 0.9,
+        'strength': 0.9
+    }),
+    'agility': MappingProxyType({
+        'agility': 1.5,
+        'speed': 1.2,
+        'power': 1.1,
+        'endurance': 0.9,
+        'strength': 0.9
+    })
+})
+
+# Sport-specific improvement factors
+_SPORT_FACTORS = MappingProxyType({
+    Sport.FOOTBALL: MappingProxyType({
+        'power': 1.2,
+        'strength': 1.3,
+        'agility': 1.2,
+        'speed': 1.1
+    }),
+    Sport.BASKETBALL: MappingProxyType({
+        'agility': 1.3,
+        'power': 1.2,
+        'endurance': 1.1,
+        'speed': 1.1
+    }),
+    Sport.TENNIS: MappingProxyType({
+        'agility': 1.4,
+        'speed': 1.2,
+        'endurance': 1.1,
+        'flexibility': 1.2
+    }),
+    Sport.RUNNING: MappingProxyType({
+        'endurance': 1.4,
+        'speed': 1.2,
+        'power': 0.9
+    }),
+    Sport.CYCLING: MappingProxyType({
+        'endurance': 1.3,
+        'power': 1.1,
+        'strength': 1.1
+    }),
+    Sport.SWIMMING: MappingProxyType({
+        'endurance': 1.3,
+        'flexibility': 1.2,
+        'strength': 1.1
+    })
+})
+
+# Base exercise parameters by exercise type and fitness level
+_BASE_EXERCISE_PARAMS = MappingProxyType({
+    'strength': MappingProxyType({
+        Level.BEGINNER: MappingProxyType({'sets': 2, 'reps': 12, 'reps_type': 'fixed', 'intensity': 60, 'rest_time': 90}),
+        Level.INTERMEDIATE: MappingProxyType({'sets': 3, 'reps_min': 8, 'reps_max': 12, 'reps_type': 'range', 'intensity': 70, 'rest_time': 120}),
+        Level.ADVANCED: MappingProxyType({'sets': 4, 'reps_min': 6, 'reps_max': 10, 'reps_type': 'range', 'intensity': 80, 'rest_time': 150}),
+        Level.ELITE: MappingProxyType({'sets': 5, 'reps_min': 4, 'reps_max': 8, 'reps_type': 'range', 'intensity': 85, 'rest_time': 180})
+    }),
+    'power': MappingProxyType({
+        Level.BEGINNER: MappingProxyType({'sets': 3, 'reps': 8, 'reps_type': 'fixed', 'intensity': 70, 'rest_time': 120}),
+        Level.INTERMEDIATE: MappingProxyType({'sets': 4, 'reps_min': 6, 'reps_max': 8, 'reps_type': 'range', 'intensity': 80, 'rest_time': 150}),
+        Level.ADVANCED: MappingProxyType({'sets': 5, 'reps_min': 4, 'reps_max': 6, 'reps_type': 'range', 'intensity': 85, 'rest_time': 180}),
+        Level.ELITE: MappingProxyType({'sets': 6, 'reps_min': 3, 'reps_max': 5, 'reps_type': 'range', 'intensity': 90, 'rest_time': 200})
+    }),
+    'endurance': MappingProxyType({
+        'all': MappingProxyType({'sets': 3, 'reps': 20, 'reps_type': 'fixed', 'intensity': 60, 'rest_time': 60})
+    })
+})
+
+# Metric-specific prediction confidence
+_METRIC_CONFIDENCE = MappingProxyType({
+    'strength': 0.8,
+    'endurance': 0.75,
+    'power': 0.7,
+    'agility': 0.65,
+    'speed': 0.7,
+    'flexibility': 0.6
+})
+
+# Metric order shared by every vectorized table
+_METRICS = tuple(_BASE_IMPROVEMENT_RATES)
+
+_BASE_RATES = np.array([_BASE_IMPROVEMENT_RATES[m] for m in _METRICS])
+
+# Improvement-rate multiplier indexed by Level (OTHER keeps the base rate)
+_LEVEL_MULTIPLIER_VECTOR = np.array([_LEVEL_MULTIPLIERS.get(level, 1.0) for level in Level])
+
+_METRIC_CONFIDENCE_VECTOR = np.array([_METRIC_CONFIDENCE.get(m, 0.7) for m in _METRICS])
+
+# Lower bounds of each intensity level above 'low'
+_INTENSITY_THRESH = (60, 70, 80, 90)
+_INTENSITY_LABELS = ('low', 'moderate', 'high', 'very_high', 'maximal')
+
+_DEFAULT_EXERCISE_PARAMS = MappingProxyType({'sets': 3, 'reps': 10, 'reps_type': 'fixed', 'intensity': 70, 'rest_time': 90})
+
+def _metric_row(table, default=1.0):
+    """Metric table values in _METRICS order"""
+    return [table.get(metric, default) for metric in _METRICS]
+
+# Training multipliers as rows aligned with _METRICS (missing metrics are 1.0)
+_TRAINING_MULTIPLIER_ROWS = MappingProxyType({
+    training_type: tuple(_metric_row(table)) for training_type, table in _TRAINING_MULTIPLIERS.items()
+})
+_NEUTRAL_ROW = (1.0,) * len(_METRICS)
+
+# Sport factors as a matrix indexed by Sport (sports without factors get the neutral row)
+_SPORT_FACTOR_MATRIX = np.array([
+    _metric_row(_SPORT_FACTORS[sport]) if sport in _SPORT_FACTORS else _NEUTRAL_ROW for sport in Sport
+])
+
+def _round_array(values, ndigits=2):
+    """Vectorized equivalent of Python's round(x, ndigits), applied element-wise"""
+    scale = 10.0 ** ndigits
+    scaled = values * scale
+    rounded = np.rint(scaled) / scale
+    
+    # Scaling can push a value onto (or off) a .5 tie, where rint and round() may disagree;
+    # settle those few elements with round(), which works on the exact stored value
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) <= 1e-9 * np.maximum(1.0, np.abs(scaled))
+    if near_tie.any():
+        rounded[near_tie] = [round(value, ndigits) for value in values[near_tie].tolist()]
+    
+    return rounded
+
+def _round_list(values, ndigits=2):
+    """Round an array with _round_array and return it as (nested) Python lists"""
+    return _round_array(values, ndigits).tolist()
+
+# Compiled on first call (and loaded from numba's on-disk cache after that), not at import
+@njit(cache=True, parallel=True)
+def _predict_core(rates, multipliers, factors, weeks_ahead, experienced, older):
+    """Weekly and total improvement per user (rows) and metric (columns)"""
+    weekly = rates * multipliers * factors
+    total = weekly * weeks_ahead
+    
+    for i in prange(total.shape[0]):
+        if experienced[i]:
+            total[i] *= 0.8  # Experienced athletes improve slower
+        if older[i]:
+            total[i] *= 0.9  # Older athletes improve slower
+    
+    return weekly, total
+
+@dataclass(frozen=True)
+class UserProfile:
+    """Profile fields read by the optimizer, with defaults resolved once at the boundary"""
+    age: int = 25
+    years_experience: int = 0
+    fitness_level: Level = Level.INTERMEDIATE
+    training_frequency: int = 3
+    sport_type: Sport = Sport.OTHER
+    has_injuries: bool = False
+    
+    def __post_init__(self):
+        # Intern level and sport names once, so helpers compare and index small ints
+        object.__setattr__(self, 'fitness_level', _parse_level(self.fitness_level))
+        object.__setattr__(self, 'sport_type', _parse_sport(self.sport_type))
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Build a profile from a user profile dict, ignoring unrelated keys"""
+        return cls(**{name: data[name] for name in _PROFILE_FIELDS if name in data})
+
+_PROFILE_FIELDS = tuple(field.name for field in fields(UserProfile))
+
+def _as_profile(profile):
+    """Accept either a UserProfile or a user profile dict"""
+    return profile if isinstance(profile, UserProfile) else UserProfile.from_dict(profile)
+
 class TrainingOptimizer:
     """AI-powered training program optimizer"""
     
@@ -19,70 +401,86 @@ class TrainingOptimizer:
         self.progression_model = None
         self.exercise_selector = None
         self.load_balancer = None
-        self.scaler = StandardScaler()
+        self._scaler = None
         self.label_encoders = {}
-        
-    def generate_training_plan(self, user_profile, current_week=1, performance_history=None):
+    
+    @property
+    def scaler(self):
+        """Feature scaler, created on first use so sklearn is only imported when needed"""
+        if self._scaler is None:
+            from sklearn.preprocessing import StandardScaler
+            self._scaler = StandardScaler()
+        return self._scaler
+        
+    def generate_training_plan(self, user_profile, current_week=1, performance_history=None, now_iso=None):
         """
         Generate AI-optimized training plan for user
         
         Args:
-            user_profile: Dict containing user information
+            user_profile: UserProfile or dict containing user information
             current_week: Current training week number
-            performance_history: List of previous performance test results
+            performance_history: List of previous performance test results (does not change the plan body)
+            now_iso: Pre-formatted generation timestamp, shared across a batch of plans
             
         Returns:
-            Dict containing complete training plan
+            Dict containing complete training plan, owned by the caller
         """
-        try:
-            # Analyze user profile and needs
-            user_analysis = self._analyze_user_profile(user_profile)
+        # Deep copy: the cached body is shared by every caller with the same inputs
+        plan = deepcopy(_cached_plan_body(_as_profile(user_profile), current_week))
+        plan['generated_at'] = now_iso or datetime.now(timezone.utc).isoformat()
+        return plan
+    
+    def _generate_plan_body(self, user_profile, current_week, performance_history):
+        """Generate a training plan without its generation timestamp"""
+        # Optimize training parameters
+        training_params = self._optimize_training_parameters(
+            user_profile, 
+            performance_history,
+            current_week
+        )
+        
+        return self._build_training_plan(user_profile, current_week, training_params, None)
+    
+    def generate_training_plans(self, user_profiles, current_week=1):
+        """
+        Generate training plans for a cohort of users in one pass
+        
+        Args:
+            user_profiles: List of UserProfile objects or user profile dicts
+            current_week: Current training week number
             
-            # Determine training focus based on sport and week
-            training_focus = self._determine_training_focus(
-                user_profile['sport_type'],
+        Returns:
+            List of training plan dicts, in the same order as user_profiles
+        """
+        user_profiles = [_as_profile(p) for p in user_profiles]
+        now_iso = datetime.now(timezone.utc).isoformat()
+        
+        # Duration and difficulty for every user at once
+        level_idx = np.fromiter(
+            (p.fitness_level for p in user_profiles),
+            dtype=np.intp, count=len(user_profiles)
+        )
+        durations = (45 * _LEVEL_DURATION[level_idx]).astype(int)
+        difficulties = np.minimum(10, 5 * _LEVEL_DIFFICULTY[level_idx])
+        
+        week_progression = 1 + ((current_week - 1) * 0.05)
+        difficulties *= min(week_progression, 1.5)
+        
+        return [
+            self._build_training_plan(
+                user_profile,
                 current_week,
-                user_analysis
+                {
+                    'total_duration': duration,
+                    'difficulty_score': difficulty,
+                    'week_progression': week_progression
+                },
+                now_iso
             )
-            
-            # Generate exercise selection
-            exercises = self._select_exercises(user_profile, training_focus)
-            
-            # Optimize training parameters
-            training_params = self._optimize_training_parameters(
-                user_profile, 
-                performance_history,
-                current_week
-            )
-            
-            # Create weekly plan structure
-            weekly_plan = self._create_weekly_plan(
-                exercises, 
-                training_params, 
-                user_profile['training_frequency']
-            )
-            
-            # Generate specific adaptations
-            target_adaptations = self._generate_target_adaptations(
-                user_profile,
-                training_focus,
-                current_week
+            for user_profile, duration, difficulty in zip(
+                user_profiles, durations.tolist(), _round_list(difficulties, 1)
             )
-            
-            return {
-                'plan_name': f"Week {current_week} - {training_focus['primary_type']} Focus",
-                'week_number': current_week,
-                'training_type': training_focus['primary_type'],
-                'target_adaptations': target_adaptations,
-                'expected_duration': training_params['total_duration'],
-                'difficulty_score': training_params['difficulty_score'],
-                'sessions': weekly_plan,
-                'model_version': '1.0',
-                'generated_at': datetime.utcnow().isoformat()
-            }
-            
-        except Exception as e:
-            raise Exception(f"Error generating training plan: {str(e)}")
+        ]
     
     def predict_performance_improvement(self, user_profile, training_plan, weeks_ahead=4):
         """
@@ -96,48 +494,62 @@ class TrainingOptimizer:
         Returns:
             Dict with predicted improvements by metric
         """
-        try:
-            # Base improvement rates by age and fitness level
-            base_rates = self._get_base_improvement_rates(
-                user_profile['age'],
-                user_profile['fitness_level']
-            )
-            
-            # Training type multipliers
-            training_multipliers = self._get_training_multipliers(
-                training_plan['training_type']
-            )
-            
-            # Sport-specific factors
-            sport_factors = self._get_sport_factors(user_profile['sport_type'])
-            
-            predictions = {}
+        return self.predict_performance_improvements(
+            [user_profile], [training_plan], weeks_ahead
+        )[0]
+    
+    def predict_performance_improvements(self, user_profiles, training_plans, weeks_ahead=4):
+        """
+        Predict expected performance improvements for many users at once
+        
+        Args:
+            user_profiles: List of UserProfile objects or user profile dicts
+            training_plans: List of training plans, aligned with user_profiles
+            weeks_ahead: Number of weeks to predict
             
-            for metric, base_rate in base_rates.items():
-                multiplier = training_multipliers.get(metric, 1.0)
-                sport_factor = sport_factors.get(metric, 1.0)
-                
-                # Calculate predicted improvement
-                weekly_improvement = base_rate * multiplier * sport_factor
-                total_improvement = weekly_improvement * weeks_ahead
-                
-                # Add some variation based on user characteristics
-                if user_profile.get('years_experience', 0) > 5:
-                    total_improvement *= 0.8  # Experienced athletes improve slower
-                
-                if user_profile.get('age', 25) > 30:
-                    total_improvement *= 0.9  # Older athletes improve slower
-                
-                predictions[metric] = {
-                    'expected_improvement_percentage': round(total_improvement, 2),
-                    'confidence_score': self._calculate_confidence_score(user_profile, metric),
-                    'weekly_rate': round(weekly_improvement, 2)
+        Returns:
+            List of prediction dicts by metric, in the same order as user_profiles
+        """
+        user_profiles = [_as_profile(p) for p in user_profiles]
+        
+        # One row per user, one column per metric (_METRICS order)
+        experience = np.array([p.years_experience for p in user_profiles])
+        ages = np.array([p.age for p in user_profiles])
+        levels = np.fromiter((p.fitness_level for p in user_profiles), dtype=np.intp, count=len(user_profiles))
+        
+        rates = self._get_base_improvement_rates(ages, levels).reshape(-1, len(_METRICS))
+        multiplier_row = _TRAINING_MULTIPLIER_ROWS.get
+        multipliers = np.array([
+            multiplier_row(plan['training_type'], _NEUTRAL_ROW) for plan in training_plans
+        ], dtype=np.float64).reshape(-1, len(_METRICS))
+        factors = _SPORT_FACTOR_MATRIX[
+            np.fromiter((p.sport_type for p in user_profiles), dtype=np.intp, count=len(user_profiles))
+        ]
+        
+        # Calculate predicted improvement, with some variation based on user characteristics
+        weekly_improvement, total_improvement = _predict_core(
+            rates, multipliers, factors, float(weeks_ahead), experience > 5, ages > 30
+        )
+        
+        confidence_scores = self._calculate_confidence_scores(experience, ages)
+        
+        return [
+            {
+                metric: {
+                    'expected_improvement_percentage': total,
+                    'confidence_score': confidence,
+                    'weekly_rate': weekly
                 }
-            
-            return predictions
-            
-        except Exception as e:
-            raise Exception(f"Error predicting performance: {str(e)}")
+                for metric, total, confidence, weekly in zip(
+                    _METRICS, total_row, confidence_row, weekly_row
+                )
+            }
+            for total_row, confidence_row, weekly_row in zip(
+                _round_list(total_improvement),
+                _round_list(confidence_scores),
+                _round_list(weekly_improvement)
+            )
+        ]
     
     def optimize_exercise_load(self, exercise_type, user_profile, performance_history=None):
         """
@@ -151,68 +563,107 @@ class TrainingOptimizer:
         Returns:
             Dict with optimized exercise parameters
         """
-        try:
-            # Base parameters by fitness level
-            base_params = self._get_base_exercise_parameters(
-                exercise_type,
-                user_profile['fitness_level']
+        user_profile = _as_profile(user_profile)
+        
+        # Base parameters by fitness level
+        base_params = self._get_base_exercise_parameters(
+            exercise_type,
+            user_profile.fitness_level
+        )
+        
+        # Adjust based on training experience
+        experience_factor = min(user_profile.years_experience / 10, 1.0)
+        
+        # Adjust based on age
+        age_factor = 1.0 if user_profile.age < 30 else 0.9
+        
+        # Adjust based on recent performance (history may be a list of tests or an array of values)
+        performance_factor = 1.0
+        if performance_history is not None:
+            recent_trend = self._analyze_performance_trend(performance_history)
+            if recent_trend > 0:
+                performance_factor = 1.1  # Increase load if improving
+            elif recent_trend < -5:
+                performance_factor = 0.9  # Decrease load if declining
+        
+        # Calculate optimized parameters
+        sets = max(1, int(base_params['sets'] * experience_factor * age_factor))
+        
+        if base_params['reps_type'] == 'range':
+            min_reps = max(1, int(base_params['reps_min'] * performance_factor))
+            reps = f"{min_reps}-{max(min_reps + 2, int(base_params['reps_max'] * performance_factor))}"
+        else:
+            reps = str(max(1, int(base_params['reps'] * performance_factor)))
+        
+        # No need to cap at 100%: everything from 90% up maps to 'maximal'
+        intensity = base_params['intensity'] * performance_factor
+        
+        return {
+            'sets': sets,
+            'reps': reps,
+            'intensity': self._intensity_to_level(intensity),
+            'rest_time': base_params['rest_time'],
+            'load_factor': performance_factor,
+            'progression_notes': self._generate_progression_notes(
+                exercise_type, performance_factor
             )
-            
-            # Adjust based on training experience
-            experience_factor = min(user_profile.get('years_experience', 1) / 10, 1.0)
-            
-            # Adjust based on age
-            age_factor = 1.0 if user_profile['age'] < 30 else 0.9
-            
-            # Adjust based on recent performance
-            performance_factor = 1.0
-            if performance_history:
-                recent_trend = self._analyze_performance_trend(performance_history)
-                if recent_trend > 0:
-                    performance_factor = 1.1  # Increase load if improving
-                elif recent_trend < -5:
-                    performance_factor = 0.9  # Decrease load if declining
-            
-            # Calculate optimized parameters
-            sets = max(1, int(base_params['sets'] * experience_factor * age_factor))
-            
-            if base_params['reps_type'] == 'range':
-                min_reps = max(1, int(base_params['reps_min'] * performance_factor))
-                max_reps = max(min_reps + 2, int(base_params['reps_max'] * performance_factor))
-                reps = f"{min_reps}-{max_reps}"
-            else:
-                reps = str(max(1, int(base_params['reps'] * performance_factor)))
-            
-            intensity = min(100, base_params['intensity'] * performance_factor)
-            
-            return {
-                'sets': sets,
-                'reps': reps,
-                'intensity': self._intensity_to_level(intensity),
-                'rest_time': base_params['rest_time'],
-                'load_factor': performance_factor,
-                'progression_notes': self._generate_progression_notes(
-                    exercise_type, performance_factor
-                )
-            }
-            
-        except Exception as e:
-            raise Exception(f"Error optimizing exercise load: {str(e)}")
+        }
     
     # Private helper methods
     
+    def _build_training_plan(self, user_profile, current_week, training_params, now_iso):
+        """Assemble a training plan around precomputed training parameters"""
+        # Analyze user profile and needs
+        user_analysis = self._analyze_user_profile(user_profile)
+        
+        # Determine training focus based on sport and week
+        training_focus = self._determine_training_focus(
+            user_profile.sport_type,
+            current_week,
+            user_analysis
+        )
+        
+        # Generate exercise selection
+        exercises = self._select_exercises(user_profile, training_focus)
+        
+        # Create weekly plan structure
+        weekly_plan = self._create_weekly_plan(
+            exercises, 
+            training_params, 
+            user_profile.training_frequency
+        )
+        
+        # Generate specific adaptations
+        target_adaptations = self._generate_target_adaptations(
+            user_profile,
+            training_focus,
+            current_week
+        )
+        
+        return {
+            'plan_name': "Week %s - %s Focus" % (current_week, training_focus.primary_type),
+            'week_number': current_week,
+            'training_type': training_focus.primary_type,
+            'target_adaptations': target_adaptations,
+            'expected_duration': training_params['total_duration'],
+            'difficulty_score': training_params['difficulty_score'],
+            'sessions': weekly_plan,
+            'model_version': '1.0',
+            'generated_at': now_iso
+        }
+    
     def _analyze_user_profile(self, profile):
         """Analyze user profile to determine training needs"""
         analysis = {
             'primary_weakness': None,
-            'injury_considerations': profile.get('has_injuries', False),
+            'injury_considerations': profile.has_injuries,
             'training_capacity': 'moderate',
             'recovery_needs': 'standard'
         }
         
         # Determine training capacity based on experience and frequency
-        experience = profile.get('years_experience', 0)
-        frequency = profile.get('training_frequency', 3)
+        experience = profile.years_experience
+        frequency = profile.training_frequency
         
         if experience >= 5 and frequency >= 5:
             analysis['training_capacity'] = 'high'
@@ -220,9 +671,9 @@ class TrainingOptimizer:
             analysis['training_capacity'] = 'low'
         
         # Determine recovery needs based on age
-        if profile.get('age', 25) > 35:
+        if profile.age > 35:
             analysis['recovery_needs'] = 'extended'
-        elif profile.get('age', 25) < 25:
+        elif profile.age < 25:
             analysis['recovery_needs'] = 'quick'
         
         return analysis
@@ -230,82 +681,24 @@ class TrainingOptimizer:
     def _determine_training_focus(self, sport_type, week, user_analysis):
         """Determine training focus for the week"""
         # Periodization model: alternate between different focuses
-        week_cycle = (week - 1) % 4
-        
-        base_focuses = {
-            0: {'primary_type': 'strength', 'secondary_type': 'power'},
-            1: {'primary_type': 'hiit', 'secondary_type': 'agility'},
-            2: {'primary_type': 'endurance', 'secondary_type': 'sport_specific'},
-            3: {'primary_type': 'agility', 'secondary_type': 'flexibility'}
-        }
-        
-        focus = base_focuses[week_cycle].copy()
+        focus = _FOCUS_CYCLE[(week - 1) & 3]
         
         # Sport-specific adjustments
-        sport_adjustments = {
-            'football': {'strength': 1.2, 'agility': 1.3, 'power': 1.1},
-            'basketball': {'agility': 1.3, 'hiit': 1.2, 'power': 1.1},
-            'tennis': {'agility': 1.4, 'endurance': 1.1, 'flexibility': 1.2},
-            'running': {'endurance': 1.4, 'hiit': 1.2, 'strength': 0.9},
-            'cycling': {'endurance': 1.3, 'strength': 1.1, 'hiit': 1.1},
-            'swimming': {'endurance': 1.3, 'flexibility': 1.2, 'strength': 1.1}
-        }
-        
-        if sport_type in sport_adjustments:
-            focus['sport_adjustments'] = sport_adjustments[sport_type]
+        if sport_type in _SPORT_ADJUSTMENTS:
+            focus = focus._replace(sport_adjustments=_SPORT_ADJUSTMENTS[sport_type])
         
         return focus
     
     def _select_exercises(self, user_profile, training_focus):
         """Select appropriate exercises based on profile and focus"""
-        sport_type = user_profile['sport_type']
-        fitness_level = user_profile['fitness_level']
-        
-        # Exercise database by type and sport
-        exercise_db = {
-            'strength': {
-                'beginner': ['bodyweight_squats', 'push_ups', 'planks', 'lunges'],
-                'intermediate': ['goblet_squats', 'deadlifts', 'bench_press', 'rows'],
-                'advanced': ['back_squats', 'deadlifts', 'bench_press', 'clean_pulls'],
-                'elite': ['back_squats', 'deadlifts', 'power_cleans', 'snatches']
-            },
-            'hiit': {
-                'beginner': ['burpees', 'mountain_climbers', 'jumping_jacks', 'high_knees'],
-                'intermediate': ['box_jumps', 'battle_ropes', 'kettlebell_swings', 'sprints'],
-                'advanced': ['plyometric_jumps', 'medicine_ball_slams', 'sprint_intervals'],
-                'elite': ['depth_jumps', 'reactive_jumps', 'olympic_lift_complexes']
-            },
-            'agility': {
-                'all': ['ladder_drills', 't_test', 'cone_drills', '5_10_5_drill', 'reactive_drills']
-            },
-            'endurance': {
-                'all': ['tempo_runs', 'bike_intervals', 'swimming_sets', 'rowing_intervals']
-            },
-            'sport_specific': {
-                'football': ['40_yard_dash', 'position_drills', 'tackling_drills'],
-                'basketball': ['suicide_drills', 'defensive_slides', 'shooting_drills'],
-                'tennis': ['court_sprints', 'serve_practice', 'volley_drills'],
-                'running': ['interval_training', 'hill_repeats', 'tempo_runs'],
-                'cycling': ['hill_climbs', 'sprint_intervals', 'time_trials'],
-                'swimming': ['stroke_technique', 'flip_turns', 'breathing_drills']
-            }
-        }
-        
-        selected_exercises = []
-        
-        # Select primary focus exercises
-        primary_type = training_focus['primary_type']
-        if primary_type in exercise_db:
-            if fitness_level in exercise_db[primary_type]:
-                selected_exercises.extend(exercise_db[primary_type][fitness_level][:3])
-            elif 'all' in exercise_db[primary_type]:
-                selected_exercises.extend(exercise_db[primary_type]['all'][:3])
+        primary_type = training_focus.primary_type
         
-        # Add sport-specific exercises
-        if sport_type in exercise_db.get('sport_specific', {}):
-            selected_exercises.extend(exercise_db['sport_specific'][sport_type][:2])
+        # Primary focus exercises followed by sport-specific ones (at most 5, a tuple shared across calls)
+        primary = _PRIMARY_EXERCISES.get((primary_type, user_profile.fitness_level))
+        if primary is None:
+            primary = _PRIMARY_EXERCISES_ALL.get(primary_type, ())
         
-        return selected_exercises[:6]  # Limit to 6 exercises per session
+        return primary + _SPORT_EXERCISES.get(user_profile.sport_type, ())
     
     def _optimize_training_parameters(self, user_profile, performance_history, week):
         """Optimize training parameters based on user data"""
@@ -313,15 +706,8 @@ class TrainingOptimizer:
         base_difficulty = 5  # 1-10 scale
         
         # Adjust based on fitness level
-        level_adjustments = {
-            'beginner': {'duration': 0.8, 'difficulty': 0.7},
-            'intermediate': {'duration': 1.0, 'difficulty': 1.0},
-            'advanced': {'duration': 1.2, 'difficulty': 1.2},
-            'elite': {'duration': 1.4, 'difficulty': 1.4}
-        }
-        
-        fitness_level = user_profile.get('fitness_level', 'intermediate')
-        adjustments = level_adjustments.get(fitness_level, level_adjustments['intermediate'])
+        fitness_level = user_profile.fitness_level
+        adjustments = _LEVEL_ADJUSTMENTS.get(fitness_level, _LEVEL_ADJUSTMENTS[Level.INTERMEDIATE])
         
         duration = int(base_duration * adjustments['duration'])
         difficulty = min(10, base_difficulty * adjustments['difficulty'])
@@ -338,265 +724,95 @@ class TrainingOptimizer:
     
     def _create_weekly_plan(self, exercises, training_params, frequency):
         """Create weekly training plan structure"""
-        sessions = []
+        # Fields shared by every session of the week
+        shared = {
+            'exercises': exercises,
+            'warm_up_duration': 10,
+            'main_duration': training_params['total_duration'] - 20,
+            'cool_down_duration': 10,
+            'difficulty_level': training_params['difficulty_score']
+        }
         
-        for day in range(1, frequency + 1):
-            session = {
+        return [
+            {
                 'session_number': day,
-                'session_name': f"Training Day {day}",
+                'session_name': _SESSION_NAMES[day - 1] if day <= len(_SESSION_NAMES) else "Training Day %d" % day,
                 'primary_focus': self._get_daily_focus(day, frequency),
-                'exercises': exercises,
-                'warm_up_duration': 10,
-                'main_duration': training_params['total_duration'] - 20,
-                'cool_down_duration': 10,
-                'difficulty_level': training_params['difficulty_score']
+                **shared
             }
-            sessions.append(session)
-        
-        return sessions
+            for day in range(1, frequency + 1)
+        ]
     
     def _get_daily_focus(self, day, frequency):
         """Get daily training focus based on frequency"""
-        if frequency <= 3:
-            focuses = ['Full Body', 'Upper Body', 'Lower Body']
-        elif frequency <= 5:
-            focuses = ['Power', 'Strength', 'Endurance', 'Agility', 'Recovery']
-        else:
-            focuses = ['Power', 'Strength', 'Endurance', 'Agility', 'Sport-Specific', 'Recovery', 'Active Recovery']
-        
+        focuses = _FOCUS_LOW if frequency <= 3 else _FOCUS_MED if frequency <= 5 else _FOCUS_HIGH
         return focuses[(day - 1) % len(focuses)]
     
     def _generate_target_adaptations(self, user_profile, training_focus, week):
-        """Generate target physiological adaptations"""
-        adaptations = {
-            'muscle_fiber_types': {
-                'type_2_activation': 0.7,  # Focus on Type 2 fibers
-                'type_1_endurance': 0.3
-            },
-            'energy_systems': {
-                'phosphocreatine': 0.4,
-                'glycolytic': 0.4,
-                'oxidative': 0.2
-            },
-            'neuromuscular': {
-                'power_output': 0.8,
-                'coordination': 0.6,
-                'reaction_time': 0.5
-            },
-            'mitochondrial': {
-                'density_increase': 0.3,
-                'enzyme_activity': 0.4
-            }
-        }
-        
-        # Adjust based on training focus
-        if training_focus['primary_type'] == 'strength':
-            adaptations['muscle_fiber_types']['type_2_activation'] = 0.9
-            adaptations['neuromuscular']['power_output'] = 0.9
-        elif training_focus['primary_type'] == 'endurance':
-            adaptations['mitochondrial']['density_increase'] = 0.8
-            adaptations['energy_systems']['oxidative'] = 0.6
-        elif training_focus['primary_type'] == 'hiit':
-            adaptations['energy_systems']['glycolytic'] = 0.7
-            adaptations['muscle_fiber_types']['type_2_activation'] = 0.8
-        
-        return adaptations
+        """Generate target physiological adaptations (shared per focus type, treat as read-only)"""
+        return _TARGET_ADAPTATIONS.get(training_focus.primary_type, _DEFAULT_ADAPTATIONS)
     
     def _get_base_improvement_rates(self, age, fitness_level):
-        """Get base weekly improvement rates by metric"""
-        base_rates = {
-            'power': 2.0,      # % per week
-            'speed': 1.5,
-            'agility': 1.8,
-            'endurance': 2.5,
-            'strength': 2.2,
-            'flexibility': 1.0
-        }
+        """Get base weekly improvement rates aligned with _METRICS (arrays of ages/levels give one row per user)"""
+        age = np.asarray(age)[..., None]
         
-        # Age adjustments
-        if age > 30:
-            for metric in base_rates:
-                base_rates[metric] *= 0.9
-        if age > 40:
-            for metric in base_rates:
-                base_rates[metric] *= 0.8
+        # Age adjustments (cumulative: over 40 also gets the over-30 reduction)
+        rates = _BASE_RATES * np.where(age > 30, 0.9, 1.0)
+        rates *= np.where(age > 40, 0.8, 1.0)
         
         # Fitness level adjustments
-        level_multipliers = {
-            'beginner': 1.5,
-            'intermediate': 1.0,
-            'advanced': 0.7,
-            'elite': 0.5
-        }
-        
-        multiplier = level_multipliers.get(fitness_level, 1.0)
-        for metric in base_rates:
-            base_rates[metric] *= multiplier
-        
-        return base_rates
-    
-    def _get_training_multipliers(self, training_type):
-        """Get training type multipliers for different metrics"""
-        multipliers = {
-            'strength': {
-                'power': 1.3,
-                'strength': 1.5,
-                'speed': 1.1,
-                'agility': 0.9,
-                'endurance': 0.8
-            },
-            'hiit': {
-                'power': 1.4,
-                'speed': 1.3,
-                'agility': 1.2,
-                'endurance': 1.2,
-                'strength': 1.0
-            },
-            'endurance': {
-                'endurance': 1.5,
-                'speed': 1.1,
-                'power': 0.8,
-                'agility': 0.9,
-                'strength': 0.9
-            },
-            'agility': {
-                'agility': 1.5,
-                'speed': 1.2,
-                'power': 1.1,
-                'endurance': 0.9,
-                'strength': 0.9
-            }
-        }
-        
-        return multipliers.get(training_type, {})
+        rates *= _LEVEL_MULTIPLIER_VECTOR[np.asarray(fitness_level)][..., None]
+        return rates
     
-    def _get_sport_factors(self, sport_type):
-        """Get sport-specific improvement factors"""
-        factors = {
-            'football': {
-                'power': 1.2,
-                'strength': 1.3,
-                'agility': 1.2,
-                'speed': 1.1
-            },
-            'basketball': {
-                'agility': 1.3,
-                'power': 1.2,
-                'endurance': 1.1,
-                'speed': 1.1
-            },
-            'tennis': {
-                'agility': 1.4,
-                'speed': 1.2,
-                'endurance': 1.1,
-                'flexibility': 1.2
-            },
-            'running': {
-                'endurance': 1.4,
-                'speed': 1.2,
-                'power': 0.9
-            },
-            'cycling': {
-                'endurance': 1.3,
-                'power': 1.1,
-                'strength': 1.1
-            },
-            'swimming': {
-                'endurance': 1.3,
-                'flexibility': 1.2,
-                'strength': 1.1
-            }
-        }
-        
-        return factors.get(sport_type, {})
-    
-    def _calculate_confidence_score(self, user_profile, metric):
-        """Calculate confidence score for prediction"""
-        base_confidence = 0.7
+    def _calculate_confidence_scores(self, experience, ages):
+        """Calculate prediction confidence scores, one row per user aligned with _METRICS"""
+        base_confidence = np.full(len(ages), 0.7)
         
         # Higher confidence for experienced users
-        experience = user_profile.get('years_experience', 0)
-        if experience >= 3:
-            base_confidence += 0.1
+        base_confidence += np.where(experience >= 3, 0.1, 0.0)
         
         # Lower confidence for older athletes (more variable)
-        age = user_profile.get('age', 25)
-        if age > 35:
-            base_confidence -= 0.1
+        base_confidence -= np.where(ages > 35, 0.1, 0.0)
         
         # Metric-specific adjustments
-        metric_confidence = {
-            'strength': 0.8,
-            'endurance': 0.75,
-            'power': 0.7,
-            'agility': 0.65,
-            'speed': 0.7,
-            'flexibility': 0.6
-        }
-        
-        final_confidence = base_confidence * metric_confidence.get(metric, 0.7)
-        return round(min(max(final_confidence, 0.3), 0.95), 2)
+        final_confidence = base_confidence[:, None] * _METRIC_CONFIDENCE_VECTOR
+        return np.clip(final_confidence, 0.3, 0.95)
     
     def _get_base_exercise_parameters(self, exercise_type, fitness_level):
         """Get base exercise parameters"""
-        parameters = {
-            'strength': {
-                'beginner': {'sets': 2, 'reps': 12, 'reps_type': 'fixed', 'intensity': 60, 'rest_time': 90},
-                'intermediate': {'sets': 3, 'reps_min': 8, 'reps_max': 12, 'reps_type': 'range', 'intensity': 70, 'rest_time': 120},
-                'advanced': {'sets': 4, 'reps_min': 6, 'reps_max': 10, 'reps_type': 'range', 'intensity': 80, 'rest_time': 150},
-                'elite': {'sets': 5, 'reps_min': 4, 'reps_max': 8, 'reps_type': 'range', 'intensity': 85, 'rest_time': 180}
-            },
-            'power': {
-                'beginner': {'sets': 3, 'reps': 8, 'reps_type': 'fixed', 'intensity': 70, 'rest_time': 120},
-                'intermediate': {'sets': 4, 'reps_min': 6, 'reps_max': 8, 'reps_type': 'range', 'intensity': 80, 'rest_time': 150},
-                'advanced': {'sets': 5, 'reps_min': 4, 'reps_max': 6, 'reps_type': 'range', 'intensity': 85, 'rest_time': 180},
-                'elite': {'sets': 6, 'reps_min': 3, 'reps_max': 5, 'reps_type': 'range', 'intensity': 90, 'rest_time': 200}
-            },
-            'endurance': {
-                'all': {'sets': 3, 'reps': 20, 'reps_type': 'fixed', 'intensity': 60, 'rest_time': 60}
-            }
-        }
-        
-        if exercise_type in parameters:
-            if fitness_level in parameters[exercise_type]:
-                return parameters[exercise_type][fitness_level]
-            elif 'all' in parameters[exercise_type]:
-                return parameters[exercise_type]['all']
+        if exercise_type in _BASE_EXERCISE_PARAMS:
+            if fitness_level in _BASE_EXERCISE_PARAMS[exercise_type]:
+                return _BASE_EXERCISE_PARAMS[exercise_type][fitness_level]
+            elif 'all' in _BASE_EXERCISE_PARAMS[exercise_type]:
+                return _BASE_EXERCISE_PARAMS[exercise_type]['all']
         
         # Default parameters
-        return {'sets': 3, 'reps': 10, 'reps_type': 'fixed', 'intensity': 70, 'rest_time': 90}
+        return _DEFAULT_EXERCISE_PARAMS
     
     def _intensity_to_level(self, intensity_percent):
         """Convert intensity percentage to level"""
-        if intensity_percent >= 90:
-            return 'maximal'
-        elif intensity_percent >= 80:
-            return 'very_high'
-        elif intensity_percent >= 70:
-            return 'high'
-        elif intensity_percent >= 60:
-            return 'moderate'
-        else:
-            return 'low'
+        return _INTENSITY_LABELS[bisect_right(_INTENSITY_THRESH, intensity_percent)]
     
     def _analyze_performance_trend(self, performance_history):
-        """Analyze recent performance trend"""
-        if not performance_history or len(performance_history) < 2:
+        """Analyze recent performance trend (history of test dicts or an array of primary values)"""
+        if performance_history is None or len(performance_history) < 2:
             return 0
         
         # Calculate simple trend over last few tests
-        values = [test.get('primary_value', 0) for test in performance_history[-3:]]
-        if len(values) < 2:
-            return 0
+        if isinstance(performance_history, np.ndarray):
+            values = performance_history[-3:]
+        else:
+            recent = performance_history[-3:]
+            values = np.fromiter(
+                (test.get('primary_value', 0.0) for test in recent),
+                dtype=np.float64, count=len(recent)
+            )
         
         # Calculate percentage change
-        initial_value = values[0]
-        final_value = values[-1]
-        
-        if initial_value == 0:
+        if values[0] == 0:
             return 0
         
-        change_percent = ((final_value - initial_value) / initial_value) * 100
+        change_percent = float((values[-1] - values[0]) / values[0]) * 100
         return round(change_percent, 2)
     
     def _generate_progression_notes(self, exercise_type, load_factor):
@@ -606,4 +822,11 @@ class TrainingOptimizer:
         elif load_factor < 0.95:
             return f"Reduce load by {round((1 - load_factor) * 100, 1)}% to allow for recovery"
         else:
-            return "Maintain current load and focus on form"
\ No newline at end of file
+            return "Maintain current load and focus on form"
+
+_plan_builder = TrainingOptimizer()
+
+@lru_cache(maxsize=512)
+def _cached_plan_body(user_profile, current_week):
+    """Training plan body for identical inputs, built once (the performance history does not change it)"""
+    return _plan_builder._generate_plan_body(user_profile, current_week, None)
\ No newline at end of file
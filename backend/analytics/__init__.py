@@ -0,0 +1 @@
+# Analytics module initialization
\ No newline at end of file
@@ -0,0 +1,27 @@
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the slope then falls back to NumPy
+    njit = None
+
+def _linreg_slope_pct(values):
+    """Least-squares slope of values against 0..n-1, as a percentage of their mean"""
+    n = values.shape[0]
+    # x is 0..n-1, so its sums have closed forms
+    sum_x = n * (n - 1) / 2.0
+    sum_x2 = (n - 1) * n * (2 * n - 1) / 6.0
+    sum_y = 0.0
+    sum_xy = 0.0
+    for i in range(n):
+        sum_y += values[i]
+        sum_xy += i * values[i]
+    slope = (n * sum_xy - sum_x * sum_y) / (n * sum_x2 - sum_x * sum_x)
+    mean = sum_y / n
+    return slope / mean * 100 if mean != 0 else 0.0
+
+if njit is not None:
+    # Compiled on first call (and loaded from numba's on-disk cache after that), not at import
+    linreg_slope_pct = njit(cache=True)(_linreg_slope_pct)
+else:
+    linreg_slope_pct = _linreg_slope_pct
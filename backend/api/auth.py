@@ -1,197 +1,188 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, create_refresh_token
 from datetime import datetime, timedelta
+from sqlalchemy import lambda_stmt, select
 import sys
 import os
 
 from models.user import User
-from models import db
+from models import db, utcnow
+from api.cache import invalidate_user_cache
+from api.errors import api_safe
 
 auth_bp = Blueprint('auth', __name__)
 
 @auth_bp.route('/register', methods=['POST'])
+@api_safe(rollback=True)
 def register():
     """Register a new user"""
-    try:
-        data = request.get_json()
-        
-        # Validate required fields
-        required_fields = ['email', 'password', 'first_name', 'last_name', 'age', 'height', 'weight', 'gender', 'sport_type', 'years_experience', 'fitness_level', 'training_frequency']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({'error': f'Missing required field: {field}'}), 400
-        
-        # Check if user already exists
-        if User.query.filter_by(email=data['email']).first():
-            return jsonify({'error': 'Email already registered'}), 409
-        
-        # Create new user
-        user = User(
-            email=data['email'],
-            first_name=data['first_name'],
-            last_name=data['last_name'],
-            age=data['age'],
-            height=data['height'],
-            weight=data['weight'],
-            gender=data['gender'],
-            sport_type=data['sport_type'],
-            years_experience=data['years_experience'],
-            fitness_level=data['fitness_level'],
-            training_frequency=data['training_frequency'],
-            has_injuries=data.get('has_injuries', False),
-            injury_description=data.get('injury_description'),
-            medical_conditions=data.get('medical_conditions')
-        )
-        
-        user.set_password(data['password'])
-        
-        db.session.add(user)
-        db.session.commit()
-        
-        # Create access token
-        access_token = create_access_token(identity=user.id, expires_delta=timedelta(hours=24))
-        refresh_token = create_refresh_token(identity=user.id, expires_delta=timedelta(days=30))
-        
-        return jsonify({
-            'message': 'User registered successfully',
-            'user': user.to_dict(),
-            'access_token': access_token,
-            'refresh_token': refresh_token
-        }), 201
-        
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'error': str(e)}), 500
+    data = request.get_json()
+    
+    # Validate required fields
+    required_fields = ['email', 'password', 'first_name', 'last_name', 'age', 'height', 'weight', 'gender', 'sport_type', 'years_experience', 'fitness_level', 'training_frequency']
+    for field in required_fields:
+        if field not in data:
+            return jsonify({'error': f'Missing required field: {field}'}), 400
+    
+    # Check if user already exists (answered from the unique email index, no row fetch)
+    email = data['email']
+    if db.session.execute(lambda_stmt(lambda: select(User.id).where(User.email == email))).first():
+        return jsonify({'error': 'Email already registered'}), 409
+    
+    # Create new user
+    user = User(
+        email=data['email'],
+        first_name=data['first_name'],
+        last_name=data['last_name'],
+        age=data['age'],
+        height=data['height'],
+        weight=data['weight'],
+        gender=data['gender'],
+        sport_type=data['sport_type'],
+        years_experience=data['years_experience'],
+        fitness_level=data['fitness_level'],
+        training_frequency=data['training_frequency'],
+        has_injuries=data.get('has_injuries', False),
+        injury_description=data.get('injury_description'),
+        medical_conditions=data.get('medical_conditions')
+    )
+    
+    user.set_password(data['password'])
+    
+    db.session.add(user)
+    db.session.commit()
+    
+    # Create access token
+    access_token = create_access_token(identity=user.id, expires_delta=timedelta(hours=24))
+    refresh_token = create_refresh_token(identity=user.id, expires_delta=timedelta(days=30))
+    
+    return jsonify({
+        'message': 'User registered successfully',
+        'user': user.to_view(),
+        'access_token': access_token,
+        'refresh_token': refresh_token
+    }), 201
 
 @auth_bp.route('/login', methods=['POST'])
+@api_safe()
 def login():
     """Login user"""
-    try:
-        data = request.get_json()
-        
-        if not data.get('email') or not data.get('password'):
-            return jsonify({'error': 'Email and password required'}), 400
-        
-        user = User.query.filter_by(email=data['email']).first()
-        
-        if not user or not user.check_password(data['password']):
-            return jsonify({'error': 'Invalid email or password'}), 401
-        
-        # Update last login
-        user.last_login = datetime.utcnow()
-        db.session.commit()
-        
-        # Create tokens
-        access_token = create_access_token(identity=user.id, expires_delta=timedelta(hours=24))
-        refresh_token = create_refresh_token(identity=user.id, expires_delta=timedelta(days=30))
-        
-        return jsonify({
-            'message': 'Login successful',
-            'user': user.to_dict(),
-            'access_token': access_token,
-            'refresh_token': refresh_token
-        })
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    data = request.get_json()
+    
+    if not data.get('email') or not data.get('password'):
+        return jsonify({'error': 'Email and password required'}), 400
+    
+    # Built once per process (lambda_stmt); later logins only bind the email
+    email = data['email']
+    user = db.session.execute(lambda_stmt(lambda: select(User).where(User.email == email))).scalar()
+    
+    if not user or not user.check_password(data['password']):
+        return jsonify({'error': 'Invalid email or password'}), 401
+    
+    # Upgrade hashes made with an older, cheaper work factor while the password is at hand
+    if user.password_needs_rehash():
+        user.set_password(data['password'])
+    
+    # Update last login
+    user.last_login = datetime.utcnow()
+    db.session.commit()
+    
+    # Create tokens
+    access_token = create_access_token(identity=user.id, expires_delta=timedelta(hours=24))
+    refresh_token = create_refresh_token(identity=user.id, expires_delta=timedelta(days=30))
+    
+    return jsonify({
+        'message': 'Login successful',
+        'user': user.to_view(),
+        'access_token': access_token,
+        'refresh_token': refresh_token
+    })
 
 @auth_bp.route('/refresh', methods=['POST'])
 @jwt_required(refresh=True)
+@api_safe()
 def refresh():
     """Refresh access token"""
-    try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
-        new_token = create_access_token(identity=user.id, expires_delta=timedelta(hours=24))
-        
-        return jsonify({
-            'access_token': new_token
-        })
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    current_user_id = get_jwt_identity()
+    user = User.query.get(current_user_id)
+    
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    
+    new_token = create_access_token(identity=user.id, expires_delta=timedelta(hours=24))
+    
+    return jsonify({
+        'access_token': new_token
+    })
 
 @auth_bp.route('/profile', methods=['GET'])
 @jwt_required()
+@api_safe()
 def get_profile():
     """Get current user profile"""
-    try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
-        return jsonify(user.to_dict())
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    current_user_id = get_jwt_identity()
+    user = User.query.get(current_user_id)
+    
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    
+    return jsonify(user.to_view())
 
 @auth_bp.route('/profile', methods=['PUT'])
 @jwt_required()
+@api_safe(rollback=True)
 def update_profile():
     """Update current user profile"""
-    try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
-        data = request.get_json()
-        
-        # Update allowed fields
-        updatable_fields = [
-            'first_name', 'last_name', 'age', 'height', 'weight', 'gender',
-            'sport_type', 'years_experience', 'fitness_level', 'training_frequency',
-            'has_injuries', 'injury_description', 'medical_conditions'
-        ]
-        
-        for field in updatable_fields:
-            if field in data:
-                setattr(user, field, data[field])
-        
-        user.updated_at = datetime.utcnow()
-        db.session.commit()
-        
-        return jsonify({
-            'message': 'Profile updated successfully',
-            'user': user.to_dict()
-        })
-        
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'error': str(e)}), 500
+    current_user_id = get_jwt_identity()
+    user = User.query.get(current_user_id)
+    
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    
+    data = request.get_json()
+    
+    # Update allowed fields
+    updatable_fields = [
+        'first_name', 'last_name', 'age', 'height', 'weight', 'gender',
+        'sport_type', 'years_experience', 'fitness_level', 'training_frequency',
+        'has_injuries', 'injury_description', 'medical_conditions'
+    ]
+    
+    for field in updatable_fields:
+        if field in data:
+            setattr(user, field, data[field])
+    
+    # Touched even when nothing changed; the database clock fills it in, like the column's onupdate
+    user.updated_at = utcnow()
+    db.session.commit()
+    # Cached performance analysis depends on age, fitness level and other profile fields
+    invalidate_user_cache(user.id)
+    
+    return jsonify({
+        'message': 'Profile updated successfully',
+        'user': user.to_view()
+    })
 
 @auth_bp.route('/change-password', methods=['POST'])
 @jwt_required()
+@api_safe(rollback=True)
 def change_password():
     """Change user password"""
-    try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
-        data = request.get_json()
-        
-        if not data.get('current_password') or not data.get('new_password'):
-            return jsonify({'error': 'Current password and new password required'}), 400
-        
-        if not user.check_password(data['current_password']):
-            return jsonify({'error': 'Current password is incorrect'}), 401
-        
-        user.set_password(data['new_password'])
-        user.updated_at = datetime.utcnow()
-        db.session.commit()
-        
-        return jsonify({'message': 'Password changed successfully'})
-        
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+    current_user_id = get_jwt_identity()
+    user = User.query.get(current_user_id)
+    
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    
+    data = request.get_json()
+    
+    if not data.get('current_password') or not data.get('new_password'):
+        return jsonify({'error': 'Current password and new password required'}), 400
+    
+    if not user.check_password(data['current_password']):
+        return jsonify({'error': 'Current password is incorrect'}), 401
+    
+    user.set_password(data['new_password'])
+    db.session.commit()
+    
+    return jsonify({'message': 'Password changed successfully'})
\ No newline at end of file
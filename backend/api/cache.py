@@ -0,0 +1,92 @@
+from functools import wraps
+from urllib.parse import urlencode
+from flask import Response, current_app, make_response, request
+from flask_jwt_extended import get_jwt_identity
+
+try:
+    import redis
+except ImportError:  # caching is optional; without redis every request hits the handler
+    redis = None
+
+# Stale copies outlive the fresh entries so they can be served while the database is down
+STALE_TTL = 24 * 60 * 60
+
+_client = None
+
+def get_redis():
+    """Shared Redis client, or None when caching is not configured"""
+    global _client
+    if _client is None and redis is not None and current_app.config.get('REDIS_URL'):
+        _client = redis.Redis.from_url(current_app.config['REDIS_URL'])
+    return _client
+
+def _cache_key(prefix, user_id):
+    """Cache key for the current request: user, path and sorted query arguments"""
+    query = urlencode(sorted(request.args.items(multi=True)))
+    return f"{prefix}:{user_id}:{request.path}:{query}"
+
+def _cached_response(body, state):
+    """JSON response built from cached bytes"""
+    response = Response(body, mimetype='application/json')
+    response.headers['X-Cache'] = state
+    return response
+
+def cached(ttl, prefix='perf', per_user=True):
+    """Cache successful JSON responses of a GET endpoint in Redis for ttl seconds.
+
+    Per-user entries must be applied below @jwt_required(); with per_user=False one
+    entry is shared by all callers. Redis failures never fail the request;
+    if the handler errors, the last good response (if any) is served instead.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            client = get_redis()
+            if client is None:
+                return view(*args, **kwargs)
+
+            user_id = get_jwt_identity() if per_user else 'shared'
+            key = _cache_key(prefix, user_id)
+            stale_key = _cache_key(f"{prefix}-stale", user_id)
+
+            try:
+                body = client.get(key)
+            except redis.RedisError as e:
+                current_app.logger.warning('Cache read failed: %s', e)
+                return view(*args, **kwargs)
+            if body is not None:
+                return _cached_response(body, 'HIT')
+
+            response = make_response(view(*args, **kwargs))
+
+            try:
+                if response.status_code == 200:
+                    body = response.get_data()
+                    pipe = client.pipeline(transaction=False)
+                    pipe.setex(key, ttl, body)
+                    pipe.setex(stale_key, STALE_TTL, body)
+                    pipe.execute()
+                    response.headers['X-Cache'] = 'MISS'
+                elif response.status_code >= 500:
+                    stale = client.get(stale_key)
+                    if stale is not None:
+                        return _cached_response(stale, 'STALE')
+            except redis.RedisError as e:
+                current_app.logger.warning('Cache write failed: %s', e)
+
+            return response
+        return wrapper
+    return decorator
+
+def invalidate_user_cache(user_id, prefix='perf'):
+    """Drop every fresh cache entry of a user (stale copies are kept for outages)"""
+    client = get_redis()
+    if client is None:
+        return
+
+    try:
+        keys = list(client.scan_iter(match=f"{prefix}:{user_id}:*", count=500))
+        if keys:
+            client.unlink(*keys)
+    except redis.RedisError as e:
+        current_app.logger.warning('Cache invalidation failed: %s', e)
@@ -0,0 +1,27 @@
+from functools import wraps
+from flask import Response, current_app
+from werkzeug.exceptions import HTTPException
+import orjson
+
+from models import db
+
+def api_safe(rollback=False):
+    """Turn unexpected exceptions of an endpoint into a JSON 500 {'error': message}.
+
+    HTTP errors (abort, 404, ...) pass through untouched. With rollback=True the
+    session is rolled back first, for endpoints that write.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                return view(*args, **kwargs)
+            except HTTPException:
+                raise
+            except Exception as e:
+                if rollback:
+                    db.session.rollback()
+                current_app.logger.exception('Unhandled error in %s', view.__name__)
+                return Response(orjson.dumps({'error': str(e)}), status=500, mimetype='application/json')
+        return wrapper
+    return decorator
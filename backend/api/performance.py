@@ -1,476 +1,685 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime, timedelta
-import json
+from collections import OrderedDict, defaultdict
+from threading import Lock
+import numpy as np
 import sys
 import os
+from types import SimpleNamespace
+from sqlalchemy import and_, case, func, insert, lambda_stmt, or_, select
+from sqlalchemy.orm import raiseload
 
 from models.user import User
 from models import db
-from models.performance import Performance, PerformanceBaseline, PerformanceReport, TestType, PerformanceMetric
+from models.performance import Performance, PerformanceBaseline, PerformanceReport, TestType, PerformanceMetric, improvement_trigger_present
+from api.cache import cached, invalidate_user_cache
+from api.errors import api_safe
+from api.responses import encode_json, json_response, stream_encoded_list, stream_json_list
+from api.tasks import submit
 
 performance_bp = Blueprint('performance', __name__)
 
+# Rows per INSERT statement in /tests/bulk
+BULK_CHUNK_SIZE = 10000
+
+# Mock percentile ranking: base percentile per fitness level plus random jitter
+_PERCENTILE_BASE = {'elite': 85, 'advanced': 70, 'intermediate': 55}
+_rng = np.random.Generator(np.random.SFC64())
+
+# Time-based tests: lower is better
+_TIME_BASED_TESTS = frozenset({'sprint_20m', 't_test', 'heart_rate_recovery'})
+_TEST_TYPES = tuple(TestType)
+
+_TREND_LABELS = ('declining', 'stable', 'improving')
+
+# Encoded reports by (id, generated_at), least recently used first; reports are never modified
+REPORT_CACHE_SIZE = 1024
+_report_cache = OrderedDict()
+_report_cache_lock = Lock()
+
 @performance_bp.route('/tests', methods=['POST'])
 @jwt_required()
+@api_safe(rollback=True)
 def record_performance_test():
     """Record a new performance test result"""
-    try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
-        data = request.get_json()
-        
-        # Validate required fields
-        required_fields = ['test_type', 'primary_metric', 'primary_value', 'primary_unit']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({'error': f'Missing required field: {field}'}), 400
-        
-        # Create performance record
-        performance = Performance(
-            user_id=user.id,
-            test_type=data['test_type'],
-            test_date=datetime.fromisoformat(data.get('test_date', datetime.utcnow().isoformat())),
-            week_number=data.get('week_number'),
-            primary_metric=data['primary_metric'],
-            primary_value=data['primary_value'],
-            primary_unit=data['primary_unit'],
-            secondary_metrics=json.dumps(data.get('secondary_metrics', {})),
-            test_conditions=json.dumps(data.get('test_conditions', {})),
-            pre_test_state=json.dumps(data.get('pre_test_state', {})),
-            tester_notes=data.get('tester_notes'),
-            user_feedback=data.get('user_feedback'),
-            video_url=data.get('video_url')
-        )
-        
-        # Calculate improvements
-        previous_tests = Performance.query.filter_by(
-            user_id=user.id,
-            test_type=data['test_type'],
-            primary_metric=data['primary_metric']
-        ).order_by(Performance.test_date.desc()).all()
-        
-        if previous_tests:
-            last_test = previous_tests[0]
+    current_user_id = get_jwt_identity()
+    user = User.query.get(current_user_id)
+    
+    if not user:
+        return json_response({'error': 'User not found'}), 404
+    
+    data = request.get_json()
+    
+    # Validate required fields
+    required_fields = ['test_type', 'primary_metric', 'primary_value', 'primary_unit']
+    for field in required_fields:
+        if field not in data:
+            return json_response({'error': f'Missing required field: {field}'}), 400
+    
+    # Create performance record
+    performance = Performance(
+        user_id=user.id,
+        test_type=data['test_type'],
+        test_date=datetime.fromisoformat(data.get('test_date', datetime.utcnow().isoformat())),
+        week_number=data.get('week_number'),
+        primary_metric=data['primary_metric'],
+        primary_value=data['primary_value'],
+        primary_unit=data['primary_unit'],
+        secondary_metrics=data.get('secondary_metrics', {}),
+        test_conditions=data.get('test_conditions', {}),
+        pre_test_state=data.get('pre_test_state', {}),
+        tester_notes=data.get('tester_notes'),
+        user_feedback=data.get('user_feedback'),
+        video_url=data.get('video_url')
+    )
+    
+    user_id, test_type, metric = user.id, data['test_type'], data['primary_metric']
+    
+    # Calculate improvements, unless the database's insert trigger (installed by init-db) fills it in
+    if not improvement_trigger_present():
+        last_test = db.session.execute(lambda_stmt(lambda: (
+            select(Performance)
+            .where(Performance.user_id == user_id, Performance.test_type == test_type, Performance.primary_metric == metric)
+            .order_by(Performance.test_date.desc())
+            .limit(1)
+        ))).scalar()
+        
+        if last_test:
             performance.improvement_from_last_test = calculate_improvement(
                 data['primary_value'], 
                 last_test.primary_value, 
                 data['test_type']
             )
-        
-        # Get or create baseline
-        baseline = PerformanceBaseline.query.filter_by(
+    
+    # Get or create baseline
+    baseline = db.session.execute(lambda_stmt(lambda: (
+        select(PerformanceBaseline)
+        .where(PerformanceBaseline.user_id == user_id, PerformanceBaseline.test_type == test_type,
+               PerformanceBaseline.metric == metric)
+        .limit(1)
+    ))).scalar()
+    
+    if not baseline:
+        # Create new baseline
+        baseline = PerformanceBaseline(
             user_id=user.id,
             test_type=data['test_type'],
-            metric=data['primary_metric']
-        ).first()
+            metric=data['primary_metric'],
+            baseline_value=data['primary_value'],
+            baseline_unit=data['primary_unit'],
+            baseline_date=performance.test_date,
+            user_age_at_baseline=user.age,
+            fitness_level_at_baseline=user.fitness_level.value if user.fitness_level else None
+        )
+        db.session.add(baseline)
+        performance.improvement_from_baseline = 0
+    else:
+        # Calculate improvement from baseline
+        performance.improvement_from_baseline = calculate_improvement(
+            data['primary_value'],
+            baseline.baseline_value,
+            data['test_type']
+        )
+        # Update baseline current best
+        baseline.update_current_best(data['primary_value'], performance.test_date)
+    
+    db.session.add(performance)
+    db.session.commit()
+    invalidate_user_cache(user.id)
+    
+    # Percentile rank, AI analysis and recommendations are filled in by a background task;
+    # clients poll GET /tests/<id> for them
+    submit(enrich_performance, performance.id)
+    
+    return json_response({
+        'message': 'Performance test recorded, analysis in progress',
+        'performance': performance.to_dict(),
+        'baseline_updated': baseline.to_dict()
+    }), 202
+
+@performance_bp.route('/tests/bulk', methods=['POST'])
+@jwt_required()
+@api_safe(rollback=True)
+def record_performance_tests_bulk():
+    """Record many performance test results in one request (e.g. history imports, wearable syncs)"""
+    current_user_id = get_jwt_identity()
+    user = User.query.get(current_user_id)
+    
+    if not user:
+        return json_response({'error': 'User not found'}), 404
+    
+    data = request.get_json()
+    records = data.get('tests') if isinstance(data, dict) else data
+    if not isinstance(records, list) or not records:
+        return json_response({'error': 'Expected a non-empty list of tests'}), 400
+    
+    # Validate every record before writing anything
+    required_fields = ['test_type', 'primary_metric', 'primary_value', 'primary_unit']
+    test_dates = []
+    for i, record in enumerate(records):
+        if not isinstance(record, dict):
+            return json_response({'error': f'Test {i} must be an object'}), 400
+        for field in required_fields:
+            if field not in record:
+                return json_response({'error': f'Test {i}: missing required field: {field}'}), 400
+        for field, enum_class in (('test_type', TestType), ('primary_metric', PerformanceMetric)):
+            try:
+                enum_class(record[field])
+            except ValueError:
+                return json_response({'error': f'Test {i}: invalid {field}: {record[field]!r}'}), 400
+        try:
+            test_dates.append(datetime.fromisoformat(record['test_date']) if 'test_date' in record else datetime.utcnow())
+        except (TypeError, ValueError):
+            return json_response({'error': f'Test {i}: invalid test_date'}), 400
+    
+    # Existing history and baselines, loaded once and keyed by (test_type, metric)
+    history = {}
+    for row in db.session.execute(
+        select(Performance.test_type, Performance.primary_metric, Performance.primary_value)
+        .where(Performance.user_id == user.id)
+        .order_by(Performance.test_date.desc())
+    ):
+        history.setdefault(_group_key(row.test_type, row.primary_metric), []).append(row)
+    
+    baselines = {
+        _group_key(b.test_type, b.metric): b
+        for b in PerformanceBaseline.query.filter_by(user_id=user.id).all()
+    }
+    touched_baselines = {}
+    best_results = []  # results after each baseline's first test, folded per baseline before writing
+    
+    # Process records in request order, as if each had been posted on its own
+    adjustments = _rng.integers(-10, 11, size=len(records)).tolist()
+    rows = []
+    for record, test_date, adjustment in zip(records, test_dates, adjustments):
+        key = _group_key(record['test_type'], record['primary_metric'])
+        previous_tests = history.setdefault(key, [])
+        
+        improvement_from_last_test = None
+        if previous_tests:
+            improvement_from_last_test = calculate_improvement(
+                record['primary_value'], previous_tests[0].primary_value, record['test_type']
+            )
         
+        baseline = baselines.get(key)
         if not baseline:
-            # Create new baseline
             baseline = PerformanceBaseline(
                 user_id=user.id,
-                test_type=data['test_type'],
-                metric=data['primary_metric'],
-                baseline_value=data['primary_value'],
-                baseline_unit=data['primary_unit'],
-                baseline_date=performance.test_date,
+                test_type=TestType(record['test_type']),  # bulk_update_bests compares enum members before flush
+                metric=record['primary_metric'],
+                baseline_value=record['primary_value'],
+                baseline_unit=record['primary_unit'],
+                baseline_date=test_date,
                 user_age_at_baseline=user.age,
-                fitness_level_at_baseline=user.fitness_level.value if user.fitness_level else None
+                fitness_level_at_baseline=user.fitness_level.value if user.fitness_level else None,
+                tests_count=0  # the column default only applies at flush; bulk_update_bests adds to it before that
             )
             db.session.add(baseline)
-            performance.improvement_from_baseline = 0
+            baselines[key] = baseline
+            improvement_from_baseline = 0
         else:
-            # Calculate improvement from baseline
-            performance.improvement_from_baseline = calculate_improvement(
-                data['primary_value'],
-                baseline.baseline_value,
-                data['test_type']
+            improvement_from_baseline = calculate_improvement(
+                record['primary_value'], baseline.baseline_value, record['test_type']
             )
-            # Update baseline current best
-            baseline.update_current_best(data['primary_value'], performance.test_date)
+            best_results.append((baseline, record['primary_value'], test_date))
+        touched_baselines[key] = baseline
         
-        # Calculate percentile rank (simplified)
-        performance.percentile_rank = calculate_percentile_rank(
-            user, data['test_type'], data['primary_value']
+        # Only the fields read by the analysis helpers
+        performance = SimpleNamespace(
+            primary_value=record['primary_value'],
+            improvement_from_last_test=improvement_from_last_test
         )
         
-        # Generate AI analysis
-        performance.ai_analysis = json.dumps(generate_ai_analysis(performance, previous_tests))
-        performance.recommendations = json.dumps(generate_recommendations(performance, user))
-        
-        db.session.add(performance)
-        db.session.commit()
-        
-        return jsonify({
-            'message': 'Performance test recorded successfully',
-            'performance': performance.to_dict(),
-            'baseline_updated': baseline.to_dict()
-        }), 201
-        
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'error': str(e)}), 500
+        rows.append({
+            'user_id': user.id,
+            'test_type': record['test_type'],
+            'test_date': test_date,
+            'week_number': record.get('week_number'),
+            'primary_metric': record['primary_metric'],
+            'primary_value': record['primary_value'],
+            'primary_unit': record['primary_unit'],
+            'secondary_metrics': record.get('secondary_metrics', {}),
+            'test_conditions': record.get('test_conditions', {}),
+            'pre_test_state': record.get('pre_test_state', {}),
+            'improvement_from_baseline': improvement_from_baseline,
+            'improvement_from_last_test': improvement_from_last_test,
+            'percentile_rank': calculate_percentile_rank(user, record['test_type'], record['primary_value'], adjustment),
+            'ai_analysis': generate_ai_analysis(performance, previous_tests),
+            'recommendations': generate_recommendations(performance, user),
+            'tester_notes': record.get('tester_notes'),
+            'user_feedback': record.get('user_feedback'),
+            'video_url': record.get('video_url')
+        })
+        previous_tests.insert(0, performance)
+    
+    # Bests and counts first, so new baselines are complete when the INSERTs autoflush them
+    PerformanceBaseline.bulk_update_bests(best_results)
+    for start in range(0, len(rows), BULK_CHUNK_SIZE):
+        db.session.execute(insert(Performance), rows[start:start + BULK_CHUNK_SIZE])
+    db.session.commit()
+    invalidate_user_cache(user.id)
+    
+    return json_response({
+        'message': 'Performance tests recorded successfully',
+        'created': len(rows),
+        'baselines_updated': [b.to_dict() for b in touched_baselines.values()]
+    }), 201
 
 @performance_bp.route('/tests', methods=['GET'])
 @jwt_required()
+@api_safe()
 def get_performance_tests():
     """Get user's performance test history"""
-    try:
-        current_user_id = get_jwt_identity()
-        
-        # Query parameters
-        test_type = request.args.get('test_type')
-        metric = request.args.get('metric')
-        limit = int(request.args.get('limit', 20))
-        weeks = int(request.args.get('weeks', 0))  # Filter by recent weeks
-        
-        query = Performance.query.filter_by(user_id=current_user_id)
-        
-        if test_type:
-            query = query.filter_by(test_type=test_type)
-        
-        if metric:
-            query = query.filter_by(primary_metric=metric)
-        
-        if weeks > 0:
-            cutoff_date = datetime.utcnow() - timedelta(weeks=weeks)
-            query = query.filter(Performance.test_date >= cutoff_date)
-        
-        tests = query.order_by(Performance.test_date.desc()).limit(limit).all()
-        
-        return jsonify({
-            'tests': [test.to_dict() for test in tests],
-            'total_count': len(tests)
-        })
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    current_user_id = get_jwt_identity()
+    
+    # Query parameters
+    test_type = request.args.get('test_type')
+    metric = request.args.get('metric')
+    limit = int(request.args.get('limit', 20))
+    weeks = int(request.args.get('weeks', 0))  # Filter by recent weeks
+    
+    # Plain rows rather than ORM objects: no identity map or instrumentation per test
+    query = select(*Performance.view_columns()).where(Performance.user_id == current_user_id)
+    
+    if test_type:
+        query = query.where(Performance.test_type == test_type)
+    
+    if metric:
+        query = query.where(Performance.primary_metric == metric)
+    
+    if weeks > 0:
+        cutoff_date = datetime.utcnow() - timedelta(weeks=weeks)
+        query = query.where(Performance.test_date >= cutoff_date)
+    
+    # Executed here so query errors still become a 500; rows are fetched 100 at a time while streaming
+    rows = db.session.execute(
+        query.order_by(Performance.test_date.desc()).limit(limit).execution_options(yield_per=100)
+    )
+    
+    return stream_json_list('tests', map(Performance.view_from_row, rows))
 
 @performance_bp.route('/tests/<int:test_id>', methods=['GET'])
 @jwt_required()
+@api_safe()
 def get_performance_test(test_id):
     """Get specific performance test details"""
-    try:
-        current_user_id = get_jwt_identity()
-        
-        test = Performance.query.filter_by(
-            id=test_id,
-            user_id=current_user_id
-        ).first()
-        
-        if not test:
-            return jsonify({'error': 'Performance test not found'}), 404
-        
-        return jsonify(test.to_dict())
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    current_user_id = get_jwt_identity()
+    
+    # Polled by clients until background analysis lands, so the statement is built once (lambda_stmt)
+    test = db.session.execute(lambda_stmt(
+        lambda: select(Performance).where(Performance.id == test_id, Performance.user_id == current_user_id)
+    )).scalar()
+    
+    if not test:
+        return json_response({'error': 'Performance test not found'}), 404
+    
+    return json_response(test.to_view())
 
 @performance_bp.route('/baselines', methods=['GET'])
 @jwt_required()
+@cached(ttl=60)
+@api_safe()
 def get_performance_baselines():
     """Get user's performance baselines"""
-    try:
-        current_user_id = get_jwt_identity()
-        
-        baselines = PerformanceBaseline.query.filter_by(user_id=current_user_id).all()
-        
-        return jsonify({
-            'baselines': [baseline.to_dict() for baseline in baselines],
-            'total_count': len(baselines)
-        })
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    current_user_id = get_jwt_identity()
+    
+    baselines = PerformanceBaseline.query.filter_by(user_id=current_user_id).all()
+    
+    return json_response({
+        'baselines': [baseline.to_dict() for baseline in baselines],
+        'total_count': len(baselines)
+    })
 
 @performance_bp.route('/baselines/<int:baseline_id>/targets', methods=['PUT'])
 @jwt_required()
+@api_safe(rollback=True)
 def update_performance_targets(baseline_id):
     """Update performance targets for a baseline"""
-    try:
-        current_user_id = get_jwt_identity()
-        
-        baseline = PerformanceBaseline.query.filter_by(
-            id=baseline_id,
-            user_id=current_user_id
-        ).first()
-        
-        if not baseline:
-            return jsonify({'error': 'Baseline not found'}), 404
-        
-        data = request.get_json()
-        
-        if 'short_term_target' in data:
-            baseline.short_term_target = data['short_term_target']
-        if 'medium_term_target' in data:
-            baseline.medium_term_target = data['medium_term_target']
-        if 'long_term_target' in data:
-            baseline.long_term_target = data['long_term_target']
-        
-        db.session.commit()
-        
-        return jsonify({
-            'message': 'Targets updated successfully',
-            'baseline': baseline.to_dict()
-        })
-        
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'error': str(e)}), 500
+    current_user_id = get_jwt_identity()
+    
+    baseline = PerformanceBaseline.query.filter_by(
+        id=baseline_id,
+        user_id=current_user_id
+    ).first()
+    
+    if not baseline:
+        return json_response({'error': 'Baseline not found'}), 404
+    
+    data = request.get_json()
+    
+    if 'short_term_target' in data:
+        baseline.short_term_target = data['short_term_target']
+    if 'medium_term_target' in data:
+        baseline.medium_term_target = data['medium_term_target']
+    if 'long_term_target' in data:
+        baseline.long_term_target = data['long_term_target']
+    
+    db.session.commit()
+    invalidate_user_cache(current_user_id)
+    
+    return json_response({
+        'message': 'Targets updated successfully',
+        'baseline': baseline.to_dict()
+    })
 
 @performance_bp.route('/analysis', methods=['GET'])
 @jwt_required()
+@cached(ttl=30)
+@api_safe()
 def get_performance_analysis():
     """Get comprehensive performance analysis"""
-    try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
-        # Get recent tests (last 12 weeks)
-        cutoff_date = datetime.utcnow() - timedelta(weeks=12)
-        recent_tests = Performance.query.filter_by(user_id=current_user_id).filter(
-            Performance.test_date >= cutoff_date
-        ).order_by(Performance.test_date.desc()).all()
-        
-        # Get all baselines
-        baselines = PerformanceBaseline.query.filter_by(user_id=current_user_id).all()
-        
-        # Analyze trends by test type
-        trends = {}
-        for test_type in TestType:
-            type_tests = [t for t in recent_tests if t.test_type == test_type]
-            if len(type_tests) >= 2:
-                trends[test_type.value] = analyze_performance_trend(type_tests)
-        
-        # Overall performance score
-        overall_score = calculate_overall_performance_score(baselines)
-        
-        # Strengths and weaknesses
-        strengths, weaknesses = identify_strengths_weaknesses(baselines)
-        
-        # Recommendations
-        recommendations = generate_comprehensive_recommendations(user, baselines, trends)
-        
-        analysis = {
-            'overall_score': overall_score,
-            'trends': trends,
-            'strengths': strengths,
-            'weaknesses': weaknesses,
-            'recommendations': recommendations,
-            'test_summary': {
-                'total_tests': len(recent_tests),
-                'test_types': len(set([t.test_type.value for t in recent_tests])),
-                'improvement_rate': calculate_improvement_rate(recent_tests)
-            },
-            'baselines_summary': {
-                'total_baselines': len(baselines),
-                'targets_met': len([b for b in baselines if b.calculate_target_progress() >= 100]),
-                'average_progress': round(sum([b.calculate_target_progress() for b in baselines]) / len(baselines), 2) if baselines else 0
-            }
+    current_user_id = get_jwt_identity()
+    user = User.query.get(current_user_id)
+    
+    if not user:
+        return json_response({'error': 'User not found'}), 404
+    
+    # Get recent tests (last 12 weeks), only the columns the analysis reads
+    cutoff_date = datetime.utcnow() - timedelta(weeks=12)
+    recent_tests = db.session.execute(
+        select(
+            Performance.test_type,
+            Performance.primary_value,
+            Performance.test_date,
+            Performance.improvement_from_last_test
+        )
+        .where(Performance.user_id == current_user_id, Performance.test_date >= cutoff_date)
+        .order_by(Performance.test_date)
+    ).all()
+    
+    # Get all baselines
+    baselines = db.session.execute(
+        select(PerformanceBaseline)
+        .options(raiseload('*'))
+        .where(PerformanceBaseline.user_id == current_user_id)
+    ).scalars().all()
+    
+    # Analyze trends by test type (bucketed in one pass; buckets stay in date order)
+    tests_by_type = defaultdict(list)
+    for t in recent_tests:
+        tests_by_type[t.test_type].append(t)
+    
+    trends = {}
+    for test_type in _TEST_TYPES:
+        type_tests = tests_by_type.get(test_type, ())
+        if len(type_tests) >= 2:
+            trends[test_type.value] = analyze_performance_trend(type_tests)
+    
+    # Short-term target progress, loaded with each baseline
+    progresses = [b.short_term_progress for b in baselines]
+    
+    # Overall performance score
+    overall_score = calculate_overall_performance_score(baselines, progresses)
+    
+    # Strengths and weaknesses
+    strengths, weaknesses = identify_strengths_weaknesses(baselines)
+    
+    # Recommendations
+    recommendations = generate_comprehensive_recommendations(user, baselines, trends)
+    
+    analysis = {
+        'overall_score': overall_score,
+        'trends': trends,
+        'strengths': strengths,
+        'weaknesses': weaknesses,
+        'recommendations': recommendations,
+        'test_summary': {
+            'total_tests': len(recent_tests),
+            'test_types': len(tests_by_type),
+            'improvement_rate': calculate_improvement_rate(recent_tests)
+        },
+        'baselines_summary': {
+            'total_baselines': len(baselines),
+            'targets_met': sum(1 for p in progresses if p >= 100),
+            'average_progress': round(sum(progresses) / len(progresses), 2) if progresses else 0
         }
-        
-        return jsonify(analysis)
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    }
+    
+    return json_response(analysis)
 
 @performance_bp.route('/reports', methods=['POST'])
 @jwt_required()
+@api_safe(rollback=True)
 def generate_performance_report():
     """Generate comprehensive performance report"""
-    try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
-        data = request.get_json()
-        report_type = data.get('report_type', 'weekly')  # weekly, monthly, quarterly
-        
-        # Calculate period dates
-        end_date = datetime.utcnow()
-        if report_type == 'weekly':
-            start_date = end_date - timedelta(weeks=1)
-        elif report_type == 'monthly':
-            start_date = end_date - timedelta(days=30)
-        elif report_type == 'quarterly':
-            start_date = end_date - timedelta(days=90)
-        else:
-            return jsonify({'error': 'Invalid report type'}), 400
-        
-        # Get tests in period
-        period_tests = Performance.query.filter_by(user_id=current_user_id).filter(
+    current_user_id = get_jwt_identity()
+    user = User.query.get(current_user_id)
+    
+    if not user:
+        return json_response({'error': 'User not found'}), 404
+    
+    data = request.get_json()
+    report_type = data.get('report_type', 'weekly')  # weekly, monthly, quarterly
+    
+    # Calculate period dates
+    end_date = datetime.utcnow()
+    if report_type == 'weekly':
+        start_date = end_date - timedelta(weeks=1)
+    elif report_type == 'monthly':
+        start_date = end_date - timedelta(days=30)
+    elif report_type == 'quarterly':
+        start_date = end_date - timedelta(days=90)
+    else:
+        return json_response({'error': 'Invalid report type'}), 400
+    
+    # Get tests in period, only the columns the report reads (oldest first)
+    period_tests = db.session.execute(
+        select(Performance.primary_metric, Performance.primary_value, Performance.improvement_from_last_test)
+        .where(
+            Performance.user_id == current_user_id,
             Performance.test_date >= start_date,
             Performance.test_date <= end_date
-        ).all()
-        
-        # Get training sessions in period
-        from models.training import TrainingSession, TrainingPlan
-        period_sessions = db.session.query(TrainingSession).join(TrainingPlan).filter(
-            TrainingPlan.user_id == current_user_id,
-            TrainingSession.actual_end_time >= start_date,
-            TrainingSession.actual_end_time <= end_date
-        ).all()
-        
-        # Generate report content
-        overall_progress = analyze_overall_progress(period_tests, period_sessions)
-        metric_improvements = analyze_metric_improvements(period_tests)
-        training_effectiveness = analyze_training_effectiveness(period_sessions, period_tests)
-        ai_insights = generate_ai_insights(user, period_tests, period_sessions)
-        recommendations = generate_period_recommendations(user, period_tests, period_sessions)
-        risk_factors = identify_risk_factors(user, period_tests, period_sessions)
-        next_period_goals = suggest_next_period_goals(user, period_tests)
-        
-        # Create report
-        report = PerformanceReport(
-            user_id=user.id,
-            report_type=report_type,
-            period_start=start_date,
-            period_end=end_date,
-            overall_progress=json.dumps(overall_progress),
-            metric_improvements=json.dumps(metric_improvements),
-            training_effectiveness=json.dumps(training_effectiveness),
-            ai_insights=json.dumps(ai_insights),
-            recommendations=json.dumps(recommendations),
-            risk_factors=json.dumps(risk_factors),
-            next_period_goals=json.dumps(next_period_goals)
         )
-        
-        db.session.add(report)
-        db.session.commit()
-        
-        return jsonify({
-            'message': 'Performance report generated successfully',
-            'report': report.to_dict()
-        }), 201
-        
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'error': str(e)}), 500
+        .order_by(Performance.test_date)
+    ).all()
+    test_summary = summarize_period_tests(period_tests)
+    
+    # Aggregate training sessions in period (the report never needs the rows)
+    session_summary = summarize_period_sessions(current_user_id, start_date, end_date)
+    
+    # Generate report content
+    overall_progress = analyze_overall_progress(test_summary, session_summary)
+    metric_improvements = analyze_metric_improvements(period_tests, test_summary['improvements'])
+    training_effectiveness = analyze_training_effectiveness(session_summary, test_summary)
+    ai_insights = generate_ai_insights(user, test_summary, session_summary)
+    recommendations = generate_period_recommendations(user, test_summary, session_summary)
+    risk_factors = identify_risk_factors(user, test_summary, session_summary)
+    next_period_goals = suggest_next_period_goals(user, period_tests)
+    
+    # Create report
+    report = PerformanceReport(
+        user_id=user.id,
+        report_type=report_type,
+        period_start=start_date,
+        period_end=end_date,
+        overall_progress=overall_progress,
+        metric_improvements=metric_improvements,
+        training_effectiveness=training_effectiveness,
+        ai_insights=ai_insights,
+        recommendations=recommendations,
+        risk_factors=risk_factors,
+        next_period_goals=next_period_goals
+    )
+    
+    db.session.add(report)
+    db.session.commit()
+    invalidate_user_cache(user.id)
+    
+    return json_response({
+        'message': 'Performance report generated successfully',
+        'report': report.to_dict()
+    }), 201
 
 @performance_bp.route('/reports', methods=['GET'])
 @jwt_required()
+@cached(ttl=60)
+@api_safe()
 def get_performance_reports():
     """Get user's performance reports"""
-    try:
-        current_user_id = get_jwt_identity()
-        
-        report_type = request.args.get('report_type')
-        limit = int(request.args.get('limit', 10))
-        
-        query = PerformanceReport.query.filter_by(user_id=current_user_id)
-        
-        if report_type:
-            query = query.filter_by(report_type=report_type)
-        
-        reports = query.order_by(PerformanceReport.generated_at.desc()).limit(limit).all()
-        
-        return jsonify({
-            'reports': [report.to_dict() for report in reports],
-            'total_count': len(reports)
-        })
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    current_user_id = get_jwt_identity()
+    
+    report_type = request.args.get('report_type')
+    limit = int(request.args.get('limit', 10))
+    
+    # Only the keys; report bodies come from the cache, or from one query for the ones it lacks
+    query = select(PerformanceReport.id, PerformanceReport.generated_at).where(PerformanceReport.user_id == current_user_id)
+    
+    if report_type:
+        query = query.where(PerformanceReport.report_type == report_type)
+    
+    # id breaks generated_at ties (server clock, one-second resolution on SQLite)
+    keys = [tuple(row) for row in db.session.execute(
+        query.order_by(PerformanceReport.generated_at.desc(), PerformanceReport.id.desc()).limit(limit)
+    )]
+    
+    return stream_encoded_list('reports', get_encoded_reports(keys))
 
 @performance_bp.route('/stats', methods=['GET'])
 @jwt_required()
+@cached(ttl=10)
+@api_safe()
 def get_performance_stats():
     """Get performance statistics summary"""
-    try:
-        current_user_id = get_jwt_identity()
-        
-        # Total tests
-        total_tests = Performance.query.filter_by(user_id=current_user_id).count()
-        
-        # Tests by type
-        test_counts = {}
-        for test_type in TestType:
-            count = Performance.query.filter_by(
-                user_id=current_user_id, 
-                test_type=test_type
-            ).count()
-            if count > 0:
-                test_counts[test_type.value] = count
-        
-        # Recent improvements
-        recent_tests = Performance.query.filter_by(user_id=current_user_id).filter(
+    current_user_id = get_jwt_identity()
+    
+    # Tests by type (one GROUP BY instead of a COUNT per test type)
+    type_counts = dict(db.session.execute(
+        select(Performance.test_type, func.count())
+        .where(Performance.user_id == current_user_id)
+        .group_by(Performance.test_type)
+    ).all())
+    test_counts = {t.value: type_counts[t] for t in _TEST_TYPES if type_counts.get(t)}
+    total_tests = sum(type_counts.values())
+    
+    # Recent improvements
+    recent_total, improved_tests = db.session.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(case((Performance.improvement_from_last_test > 0, 1), else_=0)), 0)
+        ).where(
+            Performance.user_id == current_user_id,
             Performance.test_date >= datetime.utcnow() - timedelta(weeks=4)
-        ).all()
-        
-        improved_tests = len([t for t in recent_tests if t.improvement_from_last_test and t.improvement_from_last_test > 0])
-        
-        # Baselines overview
-        baselines = PerformanceBaseline.query.filter_by(user_id=current_user_id).all()
-        targets_achieved = len([b for b in baselines if b.calculate_target_progress() >= 100])
-        
-        stats = {
-            'totals': {
-                'tests': total_tests,
-                'test_types': len(test_counts),
-                'baselines': len(baselines)
-            },
-            'test_distribution': test_counts,
-            'recent_performance': {
-                'total_recent_tests': len(recent_tests),
-                'improved_tests': improved_tests,
-                'improvement_rate': round((improved_tests / len(recent_tests)) * 100, 2) if recent_tests else 0
-            },
-            'goals': {
-                'total_targets': len(baselines),
-                'achieved_targets': targets_achieved,
-                'achievement_rate': round((targets_achieved / len(baselines)) * 100, 2) if baselines else 0
-            }
+        )
+    ).one()
+    
+    # Baselines overview
+    total_baselines, targets_achieved = db.session.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(case((PerformanceBaseline.short_term_progress >= 100, 1), else_=0)), 0)
+        ).where(PerformanceBaseline.user_id == current_user_id)
+    ).one()
+    
+    stats = {
+        'totals': {
+            'tests': total_tests,
+            'test_types': len(test_counts),
+            'baselines': total_baselines
+        },
+        'test_distribution': test_counts,
+        'recent_performance': {
+            'total_recent_tests': recent_total,
+            'improved_tests': improved_tests,
+            'improvement_rate': round((improved_tests / recent_total) * 100, 2) if recent_total else 0
+        },
+        'goals': {
+            'total_targets': total_baselines,
+            'achieved_targets': targets_achieved,
+            'achievement_rate': round((targets_achieved / total_baselines) * 100, 2) if total_baselines else 0
         }
-        
-        return jsonify(stats)
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    }
+    
+    return json_response(stats)
 
 # Helper functions
 
+def enrich_performance(performance_id):
+    """Fill in percentile rank, AI analysis and recommendations of a recorded test (background task)"""
+    performance = Performance.query.get(performance_id)
+    if not performance:
+        return
+    
+    user = User.query.get(performance.user_id)
+    
+    # The three latest tests of the same kind taken before this one, by (test_date, id) so
+    # backdated tests see the tests that preceded them rather than the ones inserted earlier
+    user_id, test_type, metric, before_date, before_id = (
+        performance.user_id, performance.test_type, performance.primary_metric, performance.test_date, performance.id
+    )
+    previous_tests = db.session.execute(lambda_stmt(lambda: (
+        select(Performance)
+        .where(Performance.user_id == user_id, Performance.test_type == test_type,
+               Performance.primary_metric == metric,
+               or_(Performance.test_date < before_date,
+                   and_(Performance.test_date == before_date, Performance.id < before_id)))
+        .order_by(Performance.test_date.desc(), Performance.id.desc())
+        .limit(3)
+    ))).scalars().all()
+    
+    performance.percentile_rank = calculate_percentile_rank(user, performance.test_type, performance.primary_value)
+    performance.ai_analysis = generate_ai_analysis(performance, previous_tests)
+    performance.recommendations = generate_recommendations(performance, user)
+    
+    db.session.commit()
+    invalidate_user_cache(performance.user_id)
+
+def enrich_pending_performances():
+    """Run enrich_performance for every test still missing its analysis (e.g. the worker exited first)"""
+    pending = db.session.scalars(
+        select(Performance.id).where(Performance.ai_analysis.is_(None)).order_by(Performance.id)
+    ).all()
+    for performance_id in pending:
+        enrich_performance(performance_id)
+    return len(pending)
+
+def get_encoded_reports(keys):
+    """Encoded PerformanceReportView of each (id, generated_at) key, loading only the reports not cached yet"""
+    with _report_cache_lock:
+        found = {key: _report_cache[key] for key in keys if key in _report_cache}
+        for key in found:
+            _report_cache.move_to_end(key)
+    
+    missing = [key[0] for key in keys if key not in found]
+    if missing:
+        rows = db.session.execute(
+            select(*PerformanceReport.view_columns()).where(PerformanceReport.id.in_(missing))
+        ).all()
+        encoded = {(row.id, row.generated_at): encode_json(PerformanceReport.view_from_row(row)) for row in rows}
+        found.update(encoded)
+        with _report_cache_lock:
+            _report_cache.update(encoded)
+            while len(_report_cache) > REPORT_CACHE_SIZE:
+                _report_cache.popitem(last=False)
+    
+    # A report deleted between the two queries is left out
+    return [found[key] for key in keys if key in found]
+
+def _group_key(test_type, metric):
+    """(test_type, metric) key that matches enum members and their raw string values alike"""
+    return (getattr(test_type, 'value', test_type), getattr(metric, 'value', metric))
+
 def calculate_improvement(current_value, previous_value, test_type):
     """Calculate improvement percentage"""
     if previous_value == 0:
         return 0
     
-    # Time-based tests: lower is better
-    time_based_tests = ['sprint_20m', 't_test', 'heart_rate_recovery']
-    
-    if test_type in time_based_tests:
+    if test_type in _TIME_BASED_TESTS:
         improvement = ((previous_value - current_value) / previous_value) * 100
     else:
         improvement = ((current_value - previous_value) / previous_value) * 100
     
     return round(improvement, 2)
 
-def calculate_percentile_rank(user, test_type, value):
+def calculate_percentile_rank(user, test_type, value, adjustment=None):
     """Calculate percentile rank (simplified implementation)"""
     # In a real implementation, this would compare against a database of similar athletes
     # For now, return a mock percentile based on user characteristics
+    base_percentile = _PERCENTILE_BASE.get(user.fitness_level.value if user.fitness_level else None, 50)
     
-    base_percentile = 50  # Average
-    
-    # Adjust based on fitness level
-    if user.fitness_level and user.fitness_level.value == 'elite':
-        base_percentile = 85
-    elif user.fitness_level and user.fitness_level.value == 'advanced':
-        base_percentile = 70
-    elif user.fitness_level and user.fitness_level.value == 'intermediate':
-        base_percentile = 55
-    
-    # Add some randomness for realism
-    import random
-    adjustment = random.randint(-10, 10)
+    # Add some randomness for realism (callers ranking a batch pass pre-drawn adjustments)
+    if adjustment is None:
+        adjustment = int(_rng.integers(-10, 11))
     
     return max(5, min(95, base_percentile + adjustment))
 
@@ -495,12 +704,12 @@ def generate_ai_analysis(performance, previous_tests):
             analysis['performance_category'] = 'concerning'
             analysis['key_insights'].append('Performance decline noted')
     
-    # Analyze trend over multiple tests
+    # Analyze trend over the three most recent tests (previous_tests is newest first)
     if len(previous_tests) >= 3:
-        values = [t.primary_value for t in previous_tests[-3:]]
-        if all(values[i] <= values[i+1] for i in range(len(values)-1)):
+        a, b, c = previous_tests[2].primary_value, previous_tests[1].primary_value, previous_tests[0].primary_value
+        if a <= b <= c:
             analysis['trend_analysis'] = 'improving'
-        elif all(values[i] >= values[i+1] for i in range(len(values)-1)):
+        elif a >= b >= c:
             analysis['trend_analysis'] = 'declining'
         else:
             analysis['trend_analysis'] = 'variable'
@@ -535,42 +744,31 @@ def generate_recommendations(performance, user):
     return recommendations
 
 def analyze_performance_trend(tests):
-    """Analyze trend in performance tests"""
+    """Analyze trend in performance tests (ordered oldest first)"""
     if len(tests) < 2:
         return {'trend': 'insufficient_data', 'slope': 0}
     
-    values = [test.primary_value for test in sorted(tests, key=lambda x: x.test_date)]
-    
-    # Simple linear trend
-    n = len(values)
-    x_values = list(range(n))
-    
-    sum_x = sum(x_values)
-    sum_y = sum(values)
-    sum_xy = sum(x * y for x, y in zip(x_values, values))
-    sum_x2 = sum(x * x for x in x_values)
+    n = len(tests)
+    values = np.fromiter((test.primary_value for test in tests), dtype=np.float64, count=n)
     
-    if n * sum_x2 - sum_x * sum_x == 0:
-        return {'trend': 'stable', 'slope': 0}
+    # Least-squares slope against the test index (denominator is n²(n²-1)/12, never 0 for n >= 2)
+    x_values = np.arange(n, dtype=np.float64)
+    sum_x = x_values.sum()
+    slope = float((n * x_values.dot(values) - sum_x * values.sum()) / (n * x_values.dot(x_values) - sum_x * sum_x))
     
-    slope = (n * sum_xy - sum_x * sum_y) / (n * sum_x2 - sum_x * sum_x)
-    
-    if slope > 0.1:
-        trend = 'improving'
-    elif slope < -0.1:
-        trend = 'declining'
-    else:
-        trend = 'stable'
+    # Index 0/1/2 for slope below -0.1, within ±0.1, above 0.1
+    trend = _TREND_LABELS[(slope > 0.1) - (slope < -0.1) + 1]
     
     return {'trend': trend, 'slope': round(slope, 3)}
 
-def calculate_overall_performance_score(baselines):
+def calculate_overall_performance_score(baselines, progresses=None):
     """Calculate overall performance score"""
     if not baselines:
         return 0
     
-    total_progress = sum([baseline.calculate_target_progress() for baseline in baselines])
-    average_progress = total_progress / len(baselines)
+    if progresses is None:
+        progresses = [baseline.short_term_progress for baseline in baselines]
+    average_progress = sum(progresses) / len(progresses)
     
     # Convert to 0-100 scale
     return round(min(average_progress, 100), 2)
@@ -581,20 +779,20 @@ def identify_strengths_weaknesses(baselines):
     weaknesses = []
     
     for baseline in baselines:
-        progress = baseline.calculate_target_progress()
+        progress = baseline.short_term_progress
         metric_name = baseline.metric.value if baseline.metric else 'unknown'
         
         if progress >= 80:
             strengths.append({
                 'metric': metric_name,
                 'progress': progress,
-                'improvement': baseline.calculate_current_improvement()
+                'improvement': baseline.current_improvement
             })
         elif progress < 30:
             weaknesses.append({
                 'metric': metric_name,
                 'progress': progress,
-                'improvement': baseline.calculate_current_improvement()
+                'improvement': baseline.current_improvement
             })
     
     return strengths, weaknesses
@@ -610,10 +808,11 @@ def generate_comprehensive_recommendations(user, baselines, trends):
     
     # Identify priority areas from weaknesses
     for baseline in baselines:
-        if baseline.calculate_target_progress() < 50:
+        progress = baseline.short_term_progress
+        if progress < 50:
             recommendations['priority_areas'].append({
                 'metric': baseline.metric.value if baseline.metric else 'unknown',
-                'current_deficit': 100 - baseline.calculate_target_progress(),
+                'current_deficit': 100 - progress,
                 'suggested_focus': f"Increase {baseline.metric.value} training frequency"
             })
     
@@ -639,54 +838,102 @@ def calculate_improvement_rate(tests):
     if len(tests) < 2:
         return 0
     
-    improved_tests = [t for t in tests if t.improvement_from_last_test and t.improvement_from_last_test > 0]
-    return round((len(improved_tests) / len(tests)) * 100, 2)
+    improvements = improvement_array(tests)
+    return round(float(np.count_nonzero(improvements > 0)) / len(tests) * 100, 2)
+
+def improvement_array(tests):
+    """improvement_from_last_test of each test as a float array (missing values count as 0)"""
+    return np.fromiter((t.improvement_from_last_test or 0 for t in tests), dtype=np.float64, count=len(tests))
+
+def summarize_period_tests(tests):
+    """Totals over the period's tests, all taken from one improvements array"""
+    improvements = improvement_array(tests)
+    return {
+        'count': len(tests),
+        'improvements': improvements,
+        'average_improvement': float(improvements.sum()) / len(tests) if tests else 0,
+        'declining': int(np.count_nonzero(improvements < -5))
+    }
+
+def summarize_period_sessions(user_id, start_date, end_date):
+    """Session counts and rating sums for the period in a single aggregate query"""
+    from models.training import TrainingSession, TrainingPlan
+    completed_rating = case(
+        (TrainingSession.is_completed & (TrainingSession.session_rating != 0), TrainingSession.session_rating)
+    )
+    summary = db.session.execute(
+        select(
+            func.count().label('count'),
+            func.coalesce(func.sum(case((TrainingSession.is_completed, 1), else_=0)), 0).label('completed'),
+            func.coalesce(func.sum(case((TrainingSession.perceived_exertion > 8, 1), else_=0)), 0).label('high_exertion'),
+            func.count(completed_rating).label('rated'),
+            func.coalesce(func.sum(completed_rating), 0).label('rating_sum'),
+            func.coalesce(func.sum(completed_rating * completed_rating), 0).label('rating_sq_sum')
+        )
+        .select_from(TrainingSession)
+        .join(TrainingPlan)
+        .where(
+            TrainingPlan.user_id == user_id,
+            TrainingSession.actual_end_time >= start_date,
+            TrainingSession.actual_end_time <= end_date
+        )
+    ).one()
+    return summary._asdict()
 
-def analyze_overall_progress(tests, sessions):
+def analyze_overall_progress(test_summary, session_summary):
     """Analyze overall progress for report period"""
     return {
-        'tests_completed': len(tests),
-        'sessions_completed': len([s for s in sessions if s.is_completed]),
-        'average_improvement': round(sum([t.improvement_from_last_test or 0 for t in tests]) / len(tests), 2) if tests else 0,
-        'consistency_score': calculate_consistency_score(sessions)
+        'tests_completed': test_summary['count'],
+        'sessions_completed': session_summary['completed'],
+        'average_improvement': round(test_summary['average_improvement'], 2) if test_summary['count'] else 0,
+        'consistency_score': calculate_consistency_score(session_summary)
     }
 
-def analyze_metric_improvements(tests):
+def analyze_metric_improvements(tests, improvements=None):
     """Analyze improvements by metric"""
-    improvements = {}
+    # Metric index per test, in order of first appearance
+    metric_index = {}
+    indices = np.fromiter(
+        (metric_index.setdefault(t.primary_metric.value if t.primary_metric else 'unknown', len(metric_index)) for t in tests),
+        dtype=np.intp, count=len(tests)
+    )
+    values = improvement_array(tests) if improvements is None else improvements
     
-    for test in tests:
-        metric = test.primary_metric.value if test.primary_metric else 'unknown'
-        if metric not in improvements:
-            improvements[metric] = []
-        
-        if test.improvement_from_last_test:
-            improvements[metric].append(test.improvement_from_last_test)
-    
-    # Calculate averages
-    for metric, values in improvements.items():
-        improvements[metric] = {
-            'average_improvement': round(sum(values) / len(values), 2),
-            'test_count': len(values),
-            'best_improvement': max(values),
-            'consistency': calculate_metric_consistency(values)
-        }
+    # Tests without an improvement (first of their kind, or no change) are left out of the stats
+    mask = values != 0
+    indices, values = indices[mask], values[mask]
     
-    return improvements
+    # Per-metric count, mean, best and variance in one pass each
+    k = len(metric_index)
+    counts = np.bincount(indices, minlength=k)
+    sums = np.bincount(indices, weights=values, minlength=k)
+    means = np.divide(sums, counts, out=np.zeros(k), where=counts > 0)
+    best = np.full(k, -np.inf)
+    np.maximum.at(best, indices, values)
+    variances = np.divide(np.bincount(indices, weights=(values - means[indices]) ** 2, minlength=k), counts,
+                          out=np.zeros(k), where=counts > 0)
+    
+    return {
+        metric: {
+            'average_improvement': round(float(means[i]), 2),
+            'test_count': int(counts[i]),
+            'best_improvement': float(best[i]) if counts[i] else None,
+            'consistency': round(max(0, 100 - float(variances[i]) * 10), 2) if counts[i] >= 2 else 100
+        }
+        for metric, i in metric_index.items()
+    }
 
-def analyze_training_effectiveness(sessions, tests):
+def analyze_training_effectiveness(session_summary, test_summary):
     """Analyze training effectiveness"""
-    if not sessions:
+    if not session_summary['count']:
         return {'effectiveness_score': 0, 'notes': 'No training data available'}
     
-    completed_sessions = [s for s in sessions if s.is_completed]
-    completion_rate = (len(completed_sessions) / len(sessions)) * 100
+    completion_rate = (session_summary['completed'] / session_summary['count']) * 100
     
-    avg_rating = sum([s.session_rating or 0 for s in completed_sessions if s.session_rating]) / len([s for s in completed_sessions if s.session_rating]) if completed_sessions else 0
+    avg_rating = session_summary['rating_sum'] / session_summary['rated'] if session_summary['rated'] else 0
     
     # Correlate with performance improvements
-    improvements = [t.improvement_from_last_test or 0 for t in tests]
-    avg_improvement = sum(improvements) / len(improvements) if improvements else 0
+    avg_improvement = test_summary['average_improvement']
     
     effectiveness_score = (completion_rate * 0.4) + (avg_rating * 10 * 0.3) + (max(0, avg_improvement) * 0.3)
     
@@ -697,13 +944,12 @@ def analyze_training_effectiveness(sessions, tests):
         'average_improvement': round(avg_improvement, 2)
     }
 
-def generate_ai_insights(user, tests, sessions):
+def generate_ai_insights(user, test_summary, session_summary):
     """Generate AI insights for the period"""
     insights = []
     
-    if len(tests) >= 2:
-        improvements = [t.improvement_from_last_test or 0 for t in tests]
-        avg_improvement = sum(improvements) / len(improvements)
+    if test_summary['count'] >= 2:
+        avg_improvement = test_summary['average_improvement']
         
         if avg_improvement > 2:
             insights.append("Excellent performance improvements observed this period")
@@ -712,8 +958,8 @@ def generate_ai_insights(user, tests, sessions):
         else:
             insights.append("Performance plateaued - consider training adjustments")
     
-    if sessions:
-        completed_rate = (len([s for s in sessions if s.is_completed]) / len(sessions)) * 100
+    if session_summary['count']:
+        completed_rate = (session_summary['completed'] / session_summary['count']) * 100
         if completed_rate > 90:
             insights.append("Outstanding training consistency")
         elif completed_rate < 70:
@@ -721,34 +967,33 @@ def generate_ai_insights(user, tests, sessions):
     
     return insights
 
-def generate_period_recommendations(user, tests, sessions):
+def generate_period_recommendations(user, test_summary, session_summary):
     """Generate recommendations for next period"""
     recommendations = []
     
     # Based on performance trends
-    if tests:
-        avg_improvement = sum([t.improvement_from_last_test or 0 for t in tests]) / len(tests)
+    if test_summary['count']:
+        avg_improvement = test_summary['average_improvement']
         if avg_improvement < 0:
             recommendations.append("Consider deload week or training modification")
         elif avg_improvement > 5:
             recommendations.append("Maintain current training intensity")
     
     # Based on training consistency
-    if sessions:
-        completion_rate = (len([s for s in sessions if s.is_completed]) / len(sessions)) * 100
+    if session_summary['count']:
+        completion_rate = (session_summary['completed'] / session_summary['count']) * 100
         if completion_rate < 80:
             recommendations.append("Focus on improving training consistency")
     
     return recommendations
 
-def identify_risk_factors(user, tests, sessions):
+def identify_risk_factors(user, test_summary, session_summary):
     """Identify potential risk factors"""
     risks = []
     
     # Performance decline risk
-    if tests:
-        declining_tests = [t for t in tests if t.improvement_from_last_test and t.improvement_from_last_test < -5]
-        if len(declining_tests) > len(tests) * 0.5:
+    if test_summary['count']:
+        if test_summary['declining'] > test_summary['count'] * 0.5:
             risks.append({
                 'type': 'performance_decline',
                 'severity': 'high',
@@ -756,9 +1001,8 @@ def identify_risk_factors(user, tests, sessions):
             })
     
     # Overtraining risk
-    if sessions:
-        high_exertion_sessions = [s for s in sessions if s.perceived_exertion and s.perceived_exertion > 8]
-        if len(high_exertion_sessions) > len(sessions) * 0.7:
+    if session_summary['count']:
+        if session_summary['high_exertion'] > session_summary['count'] * 0.7:
             risks.append({
                 'type': 'overtraining',
                 'severity': 'medium',
@@ -789,32 +1033,19 @@ def suggest_next_period_goals(user, tests):
     
     return goals
 
-def calculate_consistency_score(sessions):
+def calculate_consistency_score(session_summary):
     """Calculate training consistency score"""
-    if not sessions:
+    if not session_summary['count']:
         return 0
     
-    completed_sessions = [s for s in sessions if s.is_completed]
-    completion_rate = len(completed_sessions) / len(sessions)
+    completion_rate = session_summary['completed'] / session_summary['count']
     
-    # Factor in rating consistency
-    ratings = [s.session_rating for s in completed_sessions if s.session_rating]
-    if ratings:
-        rating_variance = sum([(r - sum(ratings)/len(ratings))**2 for r in ratings]) / len(ratings)
+    # Factor in rating consistency (ratings are integers, so the variance is exact from the sums)
+    rated = session_summary['rated']
+    if rated:
+        rating_variance = (rated * session_summary['rating_sq_sum'] - session_summary['rating_sum'] ** 2) / (rated * rated)
         consistency_factor = max(0, 1 - rating_variance/10)  # Normalize variance
     else:
         consistency_factor = 1
     
-    return round(completion_rate * consistency_factor * 100, 2)
-
-def calculate_metric_consistency(values):
-    """Calculate consistency score for a metric"""
-    if len(values) < 2:
-        return 100
-    
-    mean_val = sum(values) / len(values)
-    variance = sum([(v - mean_val)**2 for v in values]) / len(values)
-    
-    # Convert to consistency score (lower variance = higher consistency)
-    consistency = max(0, 100 - (variance * 10))
-    return round(consistency, 2)
\ No newline at end of file
+    return round(completion_rate * consistency_factor * 100, 2)
\ No newline at end of file
@@ -0,0 +1,25 @@
+from flask import Response, stream_with_context
+import orjson
+
+def encode_json(obj):
+    """obj as JSON bytes (orjson, NumPy values included)"""
+    return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+
+def json_response(obj):
+    """JSON response encoded with orjson (bytes straight into the response body)"""
+    return Response(encode_json(obj), mimetype='application/json')
+
+def stream_json_list(key, items):
+    """Stream {key: [item, ...], 'total_count': n}, encoding one item at a time"""
+    return stream_encoded_list(key, map(encode_json, items))
+
+def stream_encoded_list(key, encoded_items):
+    """Stream {key: [...], 'total_count': n} from items that are already JSON bytes"""
+    def generate():
+        count = 0
+        yield b'{"' + key.encode() + b'":['
+        for item in encoded_items:
+            yield (b',' if count else b'') + item
+            count += 1
+        yield b'],"total_count":' + str(count).encode() + b'}'
+    return Response(stream_with_context(generate()), mimetype='application/json')
@@ -0,0 +1,20 @@
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+
+# Post-commit work (analysis, enrichment) runs here instead of on the request thread.
+# The queue is in-process: work still queued when a worker exits is lost, so tasks must leave
+# a state in the database that a sweep can pick up again (see flask --app app enrich-pending).
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='background-task')
+
+def submit(task, *args):
+    """Run task(*args) in the background inside an application context"""
+    app = current_app._get_current_object()
+
+    def run():
+        with app.app_context():
+            try:
+                task(*args)
+            except Exception:
+                app.logger.exception('Background task %s failed', task.__name__)
+
+    return _executor.submit(run)
@@ -1,460 +1,424 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime, timedelta
-import json
+import numpy as np
 import sys
 import os
+from sqlalchemy import case, func, insert, select
+from sqlalchemy.orm import selectinload
 
 from models.user import User
 from models import db
-from models.training import TrainingPlan, TrainingSession, SessionExercise, Exercise
+from models.training import TrainingPlan, TrainingSession, SessionExercise, Exercise, ExerciseSport
 from ai.training_optimizer import TrainingOptimizer
+from api.cache import cached, invalidate_user_cache
+from api.errors import api_safe
+from api.responses import stream_json_list
 
 training_bp = Blueprint('training', __name__)
 
+# The optimizer keeps no per-request state, so one instance serves every request
+_optimizer = TrainingOptimizer()
+
 @training_bp.route('/generate', methods=['POST'])
 @jwt_required()
+@api_safe(rollback=True)
 def generate_training_plan():
     """Generate AI-powered training plan for user"""
-    try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
-        data = request.get_json()
-        current_week = data.get('week_number', 1)
-        
-        # Get user profile for AI
-        user_profile = {
-            'age': user.age,
-            'height': user.height,
-            'weight': user.weight,
-            'gender': user.gender,
-            'sport_type': user.sport_type.value if user.sport_type else 'other',
-            'years_experience': user.years_experience,
-            'fitness_level': user.fitness_level.value if user.fitness_level else 'intermediate',
-            'training_frequency': user.training_frequency,
-            'has_injuries': user.has_injuries,
-            'injury_description': user.injury_description
+    current_user_id = get_jwt_identity()
+    user = User.query.get(current_user_id)
+    
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    
+    data = request.get_json()
+    current_week = data.get('week_number', 1)
+    
+    # Get user profile for AI
+    user_profile = user.profile_dict
+    
+    # Get performance history (the optimizer only reads primary values)
+    from models.performance import Performance
+    performance_history = np.array(db.session.scalars(
+        select(Performance.primary_value)
+        .where(Performance.user_id == user.id)
+        .order_by(Performance.test_date.desc())
+        .limit(10)
+    ).all(), dtype=np.float64)
+    
+    # Generate training plan using AI
+    ai_plan = _optimizer.generate_training_plan(
+        user_profile, 
+        current_week, 
+        performance_history
+    )
+    
+    # Create training plan in database
+    training_plan = TrainingPlan(
+        user_id=user.id,
+        name=ai_plan['plan_name'],
+        description=f"AI-generated training plan focusing on {ai_plan['training_type']}",
+        week_number=current_week,
+        training_type=ai_plan['training_type'],
+        target_adaptations=ai_plan['target_adaptations'],
+        expected_duration=ai_plan['expected_duration'],
+        difficulty_score=ai_plan['difficulty_score'],
+        target_improvements={},  # To be filled with performance predictions
+        model_version=ai_plan['model_version']
+    )
+    
+    db.session.add(training_plan)
+    db.session.flush()  # Get the ID
+    
+    # Create training sessions in one multi-row INSERT (their IDs are not needed here)
+    db.session.execute(insert(TrainingSession), [
+        {
+            'plan_id': training_plan.id,
+            'session_name': session_data['session_name'],
+            'session_number': session_data['session_number'],
+            'primary_focus': session_data['primary_focus'],
+            'warm_up_duration': session_data['warm_up_duration'],
+            'main_duration': session_data['main_duration'],
+            'cool_down_duration': session_data['cool_down_duration']
         }
-        
-        # Get performance history
-        from models.performance import Performance
-        performance_tests = Performance.query.filter_by(user_id=user.id).order_by(
-            Performance.test_date.desc()
-        ).limit(10).all()
-        
-        performance_history = [test.to_dict() for test in performance_tests]
-        
-        # Generate training plan using AI
-        optimizer = TrainingOptimizer()
-        ai_plan = optimizer.generate_training_plan(
-            user_profile, 
-            current_week, 
-            performance_history
-        )
-        
-        # Create training plan in database
-        training_plan = TrainingPlan(
-            user_id=user.id,
-            name=ai_plan['plan_name'],
-            description=f"AI-generated training plan focusing on {ai_plan['training_type']}",
-            week_number=current_week,
-            training_type=ai_plan['training_type'],
-            target_adaptations=json.dumps(ai_plan['target_adaptations']),
-            expected_duration=ai_plan['expected_duration'],
-            difficulty_score=ai_plan['difficulty_score'],
-            target_improvements=json.dumps({}),  # To be filled with performance predictions
-            model_version=ai_plan['model_version']
-        )
-        
-        db.session.add(training_plan)
-        db.session.flush()  # Get the ID
-        
-        # Create training sessions
-        for session_data in ai_plan['sessions']:
-            session = TrainingSession(
-                plan_id=training_plan.id,
-                session_name=session_data['session_name'],
-                session_number=session_data['session_number'],
-                primary_focus=session_data['primary_focus'],
-                warm_up_duration=session_data['warm_up_duration'],
-                main_duration=session_data['main_duration'],
-                cool_down_duration=session_data['cool_down_duration']
-            )
-            db.session.add(session)
-        
-        db.session.commit()
-        
-        return jsonify({
-            'message': 'Training plan generated successfully',
-            'plan': training_plan.to_dict(),
-            'ai_analysis': ai_plan
-        }), 201
-        
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'error': str(e)}), 500
+        for session_data in ai_plan['sessions']
+    ])
+    
+    db.session.commit()
+    invalidate_user_cache(user.id, prefix='training')
+    
+    return jsonify({
+        'message': 'Training plan generated successfully',
+        'plan': training_plan.to_dict(),
+        'ai_analysis': ai_plan
+    }), 201
 
 @training_bp.route('/plans', methods=['GET'])
 @jwt_required()
+@api_safe()
 def get_training_plans():
     """Get user's training plans"""
-    try:
-        current_user_id = get_jwt_identity()
-        
-        # Query parameters
-        active_only = request.args.get('active_only', 'false').lower() == 'true'
-        limit = int(request.args.get('limit', 10))
-        
-        query = TrainingPlan.query.filter_by(user_id=current_user_id)
-        
-        if active_only:
-            query = query.filter_by(is_active=True)
-        
-        plans = query.order_by(TrainingPlan.created_at.desc()).limit(limit).all()
-        
-        return jsonify({
-            'plans': [plan.to_dict() for plan in plans],
-            'total_count': len(plans)
-        })
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    current_user_id = get_jwt_identity()
+    
+    # Query parameters
+    active_only = request.args.get('active_only', 'false').lower() == 'true'
+    limit = int(request.args.get('limit', 10))
+    
+    query = TrainingPlan.query.filter_by(user_id=current_user_id)
+    
+    if active_only:
+        query = query.filter_by(is_active=True)
+    
+    # Executed here so query errors still become a 500; rows are fetched 100 at a time while streaming.
+    # id breaks created_at ties (the server clock has one-second resolution on SQLite)
+    plans = db.session.scalars(
+        query.order_by(TrainingPlan.created_at.desc(), TrainingPlan.id.desc())
+        .limit(limit).statement.execution_options(yield_per=100)
+    )
+    
+    return stream_json_list('plans', (plan.to_view() for plan in plans))
 
 @training_bp.route('/plans/<int:plan_id>', methods=['GET'])
 @jwt_required()
+@api_safe()
 def get_training_plan(plan_id):
     """Get specific training plan with sessions"""
-    try:
-        current_user_id = get_jwt_identity()
-        
-        plan = TrainingPlan.query.filter_by(
-            id=plan_id, 
-            user_id=current_user_id
-        ).first()
-        
-        if not plan:
-            return jsonify({'error': 'Training plan not found'}), 404
-        
-        plan_dict = plan.to_dict()
-        plan_dict['sessions'] = [session.to_dict() for session in plan.sessions]
-        
-        return jsonify(plan_dict)
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    current_user_id = get_jwt_identity()
+    
+    plan = TrainingPlan.query.filter_by(
+        id=plan_id, 
+        user_id=current_user_id
+    ).first()
+    
+    if not plan:
+        return jsonify({'error': 'Training plan not found'}), 404
+    
+    # Sessions only report an exercise count, so they come back as rows without loading any exercises
+    sessions = db.session.execute(
+        select(*TrainingSession.summary_columns())
+        .where(TrainingSession.plan_id == plan.id)
+        .order_by(TrainingSession.id)
+    ).all()
+    
+    plan_dict = plan.to_dict()
+    plan_dict['sessions'] = [TrainingSession.summary_dict(row, row.exercises_count) for row in sessions]
+    
+    return jsonify(plan_dict)
 
 @training_bp.route('/sessions/<int:session_id>', methods=['GET'])
 @jwt_required()
+@api_safe()
 def get_training_session(session_id):
     """Get specific training session with exercises"""
-    try:
-        current_user_id = get_jwt_identity()
-        
-        session = TrainingSession.query.join(TrainingPlan).filter(
-            TrainingSession.id == session_id,
-            TrainingPlan.user_id == current_user_id
-        ).first()
-        
-        if not session:
-            return jsonify({'error': 'Training session not found'}), 404
-        
-        session_dict = session.to_dict()
-        session_dict['exercises'] = [exercise.to_dict() for exercise in session.exercises]
-        
-        return jsonify(session_dict)
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    current_user_id = get_jwt_identity()
+    
+    # Exercises in one IN query; each one's Exercise is joined in by the relationship default
+    session = TrainingSession.query.options(
+        selectinload(TrainingSession.exercises)
+    ).join(TrainingPlan).filter(
+        TrainingSession.id == session_id,
+        TrainingPlan.user_id == current_user_id
+    ).first()
+    
+    if not session:
+        return jsonify({'error': 'Training session not found'}), 404
+    
+    session_dict = session.to_dict()
+    session_dict['exercises'] = [exercise.to_dict() for exercise in session.exercises]
+    
+    return jsonify(session_dict)
 
 @training_bp.route('/sessions/<int:session_id>/start', methods=['POST'])
 @jwt_required()
+@api_safe(rollback=True)
 def start_training_session(session_id):
     """Start a training session"""
-    try:
-        current_user_id = get_jwt_identity()
-        
-        session = TrainingSession.query.join(TrainingPlan).filter(
-            TrainingSession.id == session_id,
-            TrainingPlan.user_id == current_user_id
-        ).first()
-        
-        if not session:
-            return jsonify({'error': 'Training session not found'}), 404
-        
-        if session.is_completed:
-            return jsonify({'error': 'Session already completed'}), 400
-        
-        session.actual_start_time = datetime.utcnow()
-        db.session.commit()
-        
-        return jsonify({
-            'message': 'Training session started',
-            'session': session.to_dict()
-        })
-        
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'error': str(e)}), 500
+    current_user_id = get_jwt_identity()
+    
+    session = TrainingSession.query.join(TrainingPlan).filter(
+        TrainingSession.id == session_id,
+        TrainingPlan.user_id == current_user_id
+    ).first()
+    
+    if not session:
+        return jsonify({'error': 'Training session not found'}), 404
+    
+    if session.is_completed:
+        return jsonify({'error': 'Session already completed'}), 400
+    
+    session.actual_start_time = datetime.utcnow()
+    db.session.commit()
+    
+    return jsonify({
+        'message': 'Training session started',
+        'session': session.to_dict()
+    })
 
 @training_bp.route('/sessions/<int:session_id>/complete', methods=['POST'])
 @jwt_required()
+@api_safe(rollback=True)
 def complete_training_session(session_id):
     """Complete a training session"""
-    try:
-        current_user_id = get_jwt_identity()
-        
-        session = TrainingSession.query.join(TrainingPlan).filter(
-            TrainingSession.id == session_id,
-            TrainingPlan.user_id == current_user_id
-        ).first()
-        
-        if not session:
-            return jsonify({'error': 'Training session not found'}), 404
-        
-        data = request.get_json()
-        
-        session.actual_end_time = datetime.utcnow()
-        session.is_completed = True
-        session.perceived_exertion = data.get('perceived_exertion')
-        session.user_notes = data.get('user_notes')
-        session.session_rating = data.get('session_rating')
-        
-        # Calculate actual duration
-        if session.actual_start_time:
-            duration = session.actual_end_time - session.actual_start_time
-            session.actual_duration = int(duration.total_seconds() / 60)
-        
-        db.session.commit()
-        
-        return jsonify({
-            'message': 'Training session completed',
-            'session': session.to_dict()
-        })
-        
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'error': str(e)}), 500
+    current_user_id = get_jwt_identity()
+    
+    session = TrainingSession.query.join(TrainingPlan).filter(
+        TrainingSession.id == session_id,
+        TrainingPlan.user_id == current_user_id
+    ).first()
+    
+    if not session:
+        return jsonify({'error': 'Training session not found'}), 404
+    
+    data = request.get_json()
+    
+    session.actual_end_time = datetime.utcnow()
+    session.is_completed = True
+    session.perceived_exertion = data.get('perceived_exertion')
+    session.user_notes = data.get('user_notes')
+    session.session_rating = data.get('session_rating')
+    
+    # Calculate actual duration
+    if session.actual_start_time:
+        duration = session.actual_end_time - session.actual_start_time
+        session.actual_duration = int(duration.total_seconds() / 60)
+    
+    db.session.commit()
+    invalidate_user_cache(current_user_id, prefix='training')
+    
+    return jsonify({
+        'message': 'Training session completed',
+        'session': session.to_dict()
+    })
 
 @training_bp.route('/exercises', methods=['GET'])
+@cached(ttl=300, prefix='exercises', per_user=False)
+@api_safe()
 def get_exercises():
     """Get exercise library"""
-    try:
-        # Query parameters
-        exercise_type = request.args.get('type')
-        sport = request.args.get('sport')
-        difficulty = request.args.get('difficulty')
-        limit = int(request.args.get('limit', 50))
-        
-        query = Exercise.query
-        
-        if exercise_type:
-            query = query.filter_by(exercise_type=exercise_type)
-        
-        if sport:
-            # Filter by primary sports (stored as JSON)
-            query = query.filter(Exercise.primary_sports.contains(sport))
-        
-        if difficulty:
-            query = query.filter_by(difficulty_level=int(difficulty))
-        
-        exercises = query.limit(limit).all()
-        
-        return jsonify({
-            'exercises': [exercise.to_dict() for exercise in exercises],
-            'total_count': len(exercises)
-        })
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    # Query parameters
+    exercise_type = request.args.get('type')
+    sport = request.args.get('sport')
+    difficulty = request.args.get('difficulty')
+    limit = int(request.args.get('limit', 50))
+    
+    query = Exercise.query
+    
+    if exercise_type:
+        query = query.filter_by(exercise_type=exercise_type)
+    
+    if sport:
+        # Filter by primary sport through the indexed exercise_sports table
+        query = query.join(Exercise.sports).filter(ExerciseSport.sport == sport)
+    
+    if difficulty:
+        query = query.filter_by(difficulty_level=int(difficulty))
+    
+    # Executed here, like the plans list; rows are fetched 200 at a time while streaming
+    exercises = db.session.scalars(query.limit(limit).statement.execution_options(yield_per=200))
+    
+    return stream_json_list('exercises', (exercise.to_view() for exercise in exercises))
 
 @training_bp.route('/exercises/<int:exercise_id>', methods=['GET'])
+@cached(ttl=300, prefix='exercises', per_user=False)
+@api_safe()
 def get_exercise(exercise_id):
     """Get specific exercise details"""
-    try:
-        exercise = Exercise.query.get(exercise_id)
-        
-        if not exercise:
-            return jsonify({'error': 'Exercise not found'}), 404
-        
-        return jsonify(exercise.to_dict())
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    exercise = Exercise.query.get(exercise_id)
+    
+    if not exercise:
+        return jsonify({'error': 'Exercise not found'}), 404
+    
+    return jsonify(exercise.to_dict())
 
 @training_bp.route('/optimize-load', methods=['POST'])
 @jwt_required()
+@api_safe()
 def optimize_exercise_load():
     """Optimize exercise load using AI"""
-    try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
-        data = request.get_json()
-        exercise_type = data.get('exercise_type')
-        
-        if not exercise_type:
-            return jsonify({'error': 'Exercise type required'}), 400
-        
-        # Get user profile
-        user_profile = {
-            'age': user.age,
-            'height': user.height,
-            'weight': user.weight,
-            'sport_type': user.sport_type.value if user.sport_type else 'other',
-            'years_experience': user.years_experience,
-            'fitness_level': user.fitness_level.value if user.fitness_level else 'intermediate',
-            'training_frequency': user.training_frequency
+    current_user_id = get_jwt_identity()
+    user = User.query.get(current_user_id)
+    
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    
+    data = request.get_json()
+    exercise_type = data.get('exercise_type')
+    
+    if not exercise_type:
+        return jsonify({'error': 'Exercise type required'}), 400
+    
+    # Get user profile
+    user_profile = user.profile_dict
+    
+    # Get recent performance history (the optimizer only reads primary values)
+    from models.performance import Performance
+    performance_history = np.array(db.session.scalars(
+        select(Performance.primary_value)
+        .where(Performance.user_id == user.id)
+        .order_by(Performance.test_date.desc())
+        .limit(5)
+    ).all(), dtype=np.float64)
+    
+    # Optimize using AI
+    optimized_params = _optimizer.optimize_exercise_load(
+        exercise_type,
+        user_profile,
+        performance_history
+    )
+    
+    return jsonify({
+        'exercise_type': exercise_type,
+        'optimized_parameters': optimized_params,
+        'user_factors': {
+            'age_factor': 1.0 if user.age < 30 else 0.9,
+            'experience_factor': min(user.years_experience / 10, 1.0),
+            'fitness_level': user.fitness_level.value if user.fitness_level else 'intermediate'
         }
-        
-        # Get recent performance history
-        from models.performance import Performance
-        recent_tests = Performance.query.filter_by(user_id=user.id).order_by(
-            Performance.test_date.desc()
-        ).limit(5).all()
-        
-        performance_history = [test.to_dict() for test in recent_tests]
-        
-        # Optimize using AI
-        optimizer = TrainingOptimizer()
-        optimized_params = optimizer.optimize_exercise_load(
-            exercise_type,
-            user_profile,
-            performance_history
-        )
-        
-        return jsonify({
-            'exercise_type': exercise_type,
-            'optimized_parameters': optimized_params,
-            'user_factors': {
-                'age_factor': 1.0 if user.age < 30 else 0.9,
-                'experience_factor': min(user.years_experience / 10, 1.0),
-                'fitness_level': user.fitness_level.value if user.fitness_level else 'intermediate'
-            }
-        })
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    })
 
 @training_bp.route('/predict-improvement', methods=['POST'])
 @jwt_required()
+@api_safe()
 def predict_performance_improvement():
     """Predict performance improvements using AI"""
-    try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
-        data = request.get_json()
-        plan_id = data.get('plan_id')
-        weeks_ahead = data.get('weeks_ahead', 4)
-        
-        # Get training plan
-        plan = TrainingPlan.query.filter_by(
-            id=plan_id,
-            user_id=user.id
-        ).first()
-        
-        if not plan:
-            return jsonify({'error': 'Training plan not found'}), 404
-        
-        # Get user profile
-        user_profile = {
-            'age': user.age,
-            'sport_type': user.sport_type.value if user.sport_type else 'other',
-            'years_experience': user.years_experience,
-            'fitness_level': user.fitness_level.value if user.fitness_level else 'intermediate'
-        }
-        
-        # Get training plan data
-        training_plan = {
-            'training_type': plan.training_type.value if plan.training_type else 'strength'
-        }
-        
-        # Predict improvements
-        optimizer = TrainingOptimizer()
-        predictions = optimizer.predict_performance_improvement(
-            user_profile,
-            training_plan,
-            weeks_ahead
-        )
-        
-        return jsonify({
-            'plan_id': plan_id,
-            'weeks_ahead': weeks_ahead,
-            'predictions': predictions,
-            'generated_at': datetime.utcnow().isoformat()
-        })
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    current_user_id = get_jwt_identity()
+    user = User.query.get(current_user_id)
+    
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    
+    data = request.get_json()
+    plan_id = data.get('plan_id')
+    weeks_ahead = data.get('weeks_ahead', 4)
+    
+    # Get training plan
+    plan = TrainingPlan.query.filter_by(
+        id=plan_id,
+        user_id=user.id
+    ).first()
+    
+    if not plan:
+        return jsonify({'error': 'Training plan not found'}), 404
+    
+    # Get user profile
+    user_profile = user.profile_dict
+    
+    # Get training plan data
+    training_plan = {
+        'training_type': plan.training_type.value if plan.training_type else 'strength'
+    }
+    
+    # Predict improvements
+    predictions = _optimizer.predict_performance_improvement(
+        user_profile,
+        training_plan,
+        weeks_ahead
+    )
+    
+    return jsonify({
+        'plan_id': plan_id,
+        'weeks_ahead': weeks_ahead,
+        'predictions': predictions,
+        'generated_at': datetime.utcnow().isoformat()
+    })
 
 @training_bp.route('/stats', methods=['GET'])
 @jwt_required()
+@cached(ttl=30, prefix='training')
+@api_safe()
 def get_training_stats():
     """Get training statistics for user"""
-    try:
-        current_user_id = get_jwt_identity()
-        
-        # Total plans and sessions
-        total_plans = TrainingPlan.query.filter_by(user_id=current_user_id).count()
-        completed_plans = TrainingPlan.query.filter_by(
-            user_id=current_user_id, 
-            is_completed=True
-        ).count()
-        
-        # Session statistics
-        total_sessions = db.session.query(TrainingSession).join(TrainingPlan).filter(
-            TrainingPlan.user_id == current_user_id
-        ).count()
-        
-        completed_sessions = db.session.query(TrainingSession).join(TrainingPlan).filter(
-            TrainingPlan.user_id == current_user_id,
-            TrainingSession.is_completed == True
-        ).count()
-        
-        # Recent activity
-        recent_sessions = db.session.query(TrainingSession).join(TrainingPlan).filter(
+    current_user_id = get_jwt_identity()
+    
+    # Plan and session totals, one aggregate query each
+    total_plans, completed_plans = db.session.execute(
+        select(
+            func.count(TrainingPlan.id),
+            func.count(case((TrainingPlan.is_completed == True, 1)))
+        ).where(TrainingPlan.user_id == current_user_id)
+    ).one()
+    
+    total_sessions, completed_sessions = db.session.execute(
+        select(
+            func.count(TrainingSession.id),
+            func.count(case((TrainingSession.is_completed == True, 1)))
+        ).join(TrainingPlan).where(TrainingPlan.user_id == current_user_id)
+    ).one()
+    
+    # Recent activity (plain rows; no ORM objects are needed for the summaries)
+    recent_sessions = db.session.execute(
+        select(*TrainingSession.summary_columns())
+        .join(TrainingSession.plan)
+        .where(
             TrainingPlan.user_id == current_user_id,
             TrainingSession.is_completed == True
-        ).order_by(TrainingSession.actual_end_time.desc()).limit(10).all()
-        
-        # Training frequency analysis
-        if recent_sessions:
-            total_duration = sum([s.actual_duration or 0 for s in recent_sessions])
-            avg_duration = total_duration / len(recent_sessions) if recent_sessions else 0
-            avg_rating = sum([s.session_rating or 0 for s in recent_sessions if s.session_rating]) / len([s for s in recent_sessions if s.session_rating]) if recent_sessions else 0
-        else:
-            avg_duration = 0
-            avg_rating = 0
-        
-        stats = {
-            'totals': {
-                'plans': total_plans,
-                'completed_plans': completed_plans,
-                'sessions': total_sessions,
-                'completed_sessions': completed_sessions
-            },
-            'completion_rates': {
-                'plans': round((completed_plans / total_plans) * 100, 2) if total_plans > 0 else 0,
-                'sessions': round((completed_sessions / total_sessions) * 100, 2) if total_sessions > 0 else 0
-            },
-            'averages': {
-                'session_duration': round(avg_duration, 1),
-                'session_rating': round(avg_rating, 1)
-            },
-            'recent_activity': [session.to_dict() for session in recent_sessions]
-        }
-        
-        return jsonify(stats)
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        )
+        .order_by(TrainingSession.actual_end_time.desc())
+        .limit(10)
+    ).all()
+    
+    # Training frequency analysis
+    durations = np.fromiter((s.actual_duration or 0 for s in recent_sessions), dtype=np.int64, count=len(recent_sessions))
+    ratings = np.fromiter((s.session_rating for s in recent_sessions if s.session_rating), dtype=np.float64)
+    avg_duration = float(durations.mean()) if durations.size else 0
+    avg_rating = float(ratings.mean()) if ratings.size else 0
+    
+    stats = {
+        'totals': {
+            'plans': total_plans,
+            'completed_plans': completed_plans,
+            'sessions': total_sessions,
+            'completed_sessions': completed_sessions
+        },
+        'completion_rates': {
+            'plans': round((completed_plans / total_plans) * 100, 2) if total_plans > 0 else 0,
+            'sessions': round((completed_sessions / total_sessions) * 100, 2) if total_sessions > 0 else 0
+        },
+        'averages': {
+            'session_duration': round(avg_duration, 1),
+            'session_rating': round(avg_rating, 1)
+        },
+        'recent_activity': [TrainingSession.summary_dict(row, row.exercises_count) for row in recent_sessions]
+    }
+    
+    return jsonify(stats)
\ No newline at end of file
@@ -2,179 +2,183 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 import sys
 import os
+from sqlalchemy import case, desc, distinct, func, literal, select, union_all
+from sqlalchemy.orm import raiseload
 
 from models.user import User
 from models import db
+from api.cache import invalidate_user_cache
+from api.errors import api_safe
 
 users_bp = Blueprint('users', __name__)
 
 @users_bp.route('/dashboard', methods=['GET'])
 @jwt_required()
+@api_safe()
 def get_dashboard_data():
     """Get user dashboard data"""
-    try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
-        # Get user statistics
-        dashboard_data = {
-            'user_profile': user.to_dict(),
-            'stats': {
-                'total_trainings': len(user.trainings) if user.trainings else 0,
-                'total_performances': len(user.performances) if user.performances else 0,
-                'current_week': get_current_training_week(user),
-                'profile_completeness': user.get_profile_completeness(),
-                'bmi': user.calculate_bmi(),
-                'bmi_category': get_bmi_category(user.calculate_bmi())
-            },
-            'recent_activity': get_recent_activity(user),
-            'upcoming_sessions': get_upcoming_sessions(user)
-        }
-        
-        return jsonify(dashboard_data)
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    current_user_id = get_jwt_identity()
+    # Nothing below should touch user.trainings / user.performances; fail loudly if it does
+    user = db.session.get(User, current_user_id, options=[raiseload('*')])
+    
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    
+    total_trainings, total_performances, current_week = get_dashboard_counts(user)
+    
+    # BMI and completeness are already part of the profile view
+    user_profile = user.to_view()
+    
+    # Get user statistics
+    dashboard_data = {
+        'user_profile': user_profile,
+        'stats': {
+            'total_trainings': total_trainings,
+            'total_performances': total_performances,
+            'current_week': current_week,
+            'profile_completeness': user_profile.profile_completeness,
+            'bmi': user_profile.bmi,
+            'bmi_category': get_bmi_category(user_profile.bmi)
+        },
+        'recent_activity': get_recent_activity(user),
+        'upcoming_sessions': get_upcoming_sessions(user)
+    }
+    
+    return jsonify(dashboard_data)
 
 @users_bp.route('/stats', methods=['GET'])
 @jwt_required()
+@api_safe()
 def get_user_stats():
     """Get detailed user statistics"""
-    try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
-        stats = {
-            'training_stats': get_training_statistics(user),
-            'performance_stats': get_performance_statistics(user),
-            'health_metrics': get_health_metrics(user),
-            'achievements': get_user_achievements(user)
-        }
-        
-        return jsonify(stats)
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    current_user_id = get_jwt_identity()
+    # Statistics are all queried in SQL; fail loudly if anything lazy-loads a collection
+    user = db.session.get(User, current_user_id, options=[raiseload('*')])
+    
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    
+    stats = {
+        'training_stats': get_training_statistics(user),
+        'performance_stats': get_performance_statistics(user),
+        'health_metrics': get_health_metrics(user),
+        'achievements': get_user_achievements(user)
+    }
+    
+    return jsonify(stats)
 
 @users_bp.route('/goals', methods=['GET'])
 @jwt_required()
+@api_safe()
 def get_user_goals():
     """Get user goals and targets"""
-    try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
-        from models.performance import PerformanceBaseline
-        
-        baselines = PerformanceBaseline.query.filter_by(user_id=user.id).all()
-        goals = [baseline.to_dict() for baseline in baselines]
-        
-        return jsonify({
-            'goals': goals,
-            'summary': {
-                'total_goals': len(goals),
-                'achieved_goals': len([g for g in goals if g['short_term_progress'] >= 100]),
-                'in_progress_goals': len([g for g in goals if 0 < g['short_term_progress'] < 100])
-            }
-        })
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    current_user_id = get_jwt_identity()
+    user = User.query.get(current_user_id)
+    
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    
+    from models.performance import PerformanceBaseline
+    
+    baselines = PerformanceBaseline.query.filter_by(user_id=user.id).all()
+    goals = [baseline.to_dict() for baseline in baselines]
+    
+    return jsonify({
+        'goals': goals,
+        'summary': {
+            'total_goals': len(goals),
+            'achieved_goals': len([g for g in goals if g['short_term_progress'] >= 100]),
+            'in_progress_goals': len([g for g in goals if 0 < g['short_term_progress'] < 100])
+        }
+    })
 
 @users_bp.route('/preferences', methods=['GET'])
 @jwt_required()
+@api_safe()
 def get_user_preferences():
     """Get user preferences and settings"""
-    try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
-        preferences = {
-            'training_preferences': {
-                'training_frequency': user.training_frequency,
-                'fitness_level': user.fitness_level.value if user.fitness_level else None,
-                'sport_type': user.sport_type.value if user.sport_type else None,
-                'has_injuries': user.has_injuries,
-                'injury_description': user.injury_description
-            },
-            'notifications': {
-                'email_notifications': True,  # Default settings
-                'workout_reminders': True,
-                'progress_updates': True,
-                'weekly_reports': True
-            },
-            'privacy': {
-                'data_sharing': False,
-                'public_profile': False,
-                'leaderboard_participation': True
-            }
+    current_user_id = get_jwt_identity()
+    user = User.query.get(current_user_id)
+    
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    
+    preferences = {
+        'training_preferences': {
+            'training_frequency': user.training_frequency,
+            'fitness_level': user.fitness_level.value if user.fitness_level else None,
+            'sport_type': user.sport_type.value if user.sport_type else None,
+            'has_injuries': user.has_injuries,
+            'injury_description': user.injury_description
+        },
+        'notifications': {
+            'email_notifications': True,  # Default settings
+            'workout_reminders': True,
+            'progress_updates': True,
+            'weekly_reports': True
+        },
+        'privacy': {
+            'data_sharing': False,
+            'public_profile': False,
+            'leaderboard_participation': True
         }
-        
-        return jsonify(preferences)
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    }
+    
+    return jsonify(preferences)
 
 @users_bp.route('/preferences', methods=['PUT'])
 @jwt_required()
+@api_safe(rollback=True)
 def update_user_preferences():
     """Update user preferences"""
-    try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
-        data = request.get_json()
-        
-        # Update training preferences
-        if 'training_preferences' in data:
-            tp = data['training_preferences']
-            if 'training_frequency' in tp:
-                user.training_frequency = tp['training_frequency']
-            if 'fitness_level' in tp:
-                user.fitness_level = tp['fitness_level']
-            if 'has_injuries' in tp:
-                user.has_injuries = tp['has_injuries']
-            if 'injury_description' in tp:
-                user.injury_description = tp['injury_description']
-        
-        # Note: In a real application, you'd store notification and privacy preferences
-        # in separate tables or JSON fields. For now, we'll just return success.
-        
-        db.session.commit()
-        
-        return jsonify({'message': 'Preferences updated successfully'})
-        
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'error': str(e)}), 500
+    current_user_id = get_jwt_identity()
+    user = User.query.get(current_user_id)
+    
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    
+    data = request.get_json()
+    
+    # Update training preferences
+    if 'training_preferences' in data:
+        tp = data['training_preferences']
+        if 'training_frequency' in tp:
+            user.training_frequency = tp['training_frequency']
+        if 'fitness_level' in tp:
+            user.fitness_level = tp['fitness_level']
+        if 'has_injuries' in tp:
+            user.has_injuries = tp['has_injuries']
+        if 'injury_description' in tp:
+            user.injury_description = tp['injury_description']
+    
+    # Note: In a real application, you'd store notification and privacy preferences
+    # in separate tables or JSON fields. For now, we'll just return success.
+    
+    db.session.commit()
+    # Cached performance analysis depends on the fitness level
+    invalidate_user_cache(user.id)
+    
+    return jsonify({'message': 'Preferences updated successfully'})
 
 # Helper functions
 
-def get_current_training_week(user):
-    """Get current training week number"""
+def get_dashboard_counts(user):
+    """Get (training plan count, performance test count, current training week) in one query"""
     from models.training import TrainingPlan
+    from models.performance import Performance
     
-    active_plan = TrainingPlan.query.filter_by(
-        user_id=user.id, 
-        is_active=True
-    ).first()
+    current_week = select(TrainingPlan.week_number).where(
+        TrainingPlan.user_id == user.id,
+        TrainingPlan.is_active == True
+    ).limit(1).scalar_subquery()
     
-    return active_plan.week_number if active_plan else 0
+    return db.session.execute(
+        select(
+            select(func.count(TrainingPlan.id)).where(TrainingPlan.user_id == user.id).scalar_subquery(),
+            select(func.count(Performance.id)).where(Performance.user_id == user.id).scalar_subquery(),
+            func.coalesce(current_week, 0)
+        )
+    ).one()
 
 def get_bmi_category(bmi):
     """Get BMI category"""
@@ -189,77 +193,107 @@ def get_bmi_category(bmi):
 
 def get_recent_activity(user):
     """Get recent user activity"""
-    from models.training import TrainingSession
+    from models.training import TrainingSession, TrainingPlan
     from models.performance import Performance
     
-    # Get recent training sessions
-    recent_sessions = TrainingSession.query.join(
-        TrainingSession.plan
-    ).filter_by(user_id=user.id).order_by(
-        TrainingSession.created_at.desc()
-    ).limit(5).all()
+    # Latest 5 sessions and 3 tests, merged and ordered by date in one UNION ALL
+    # (id breaks ties: created_at comes from a server clock with one-second resolution on SQLite)
+    recent_sessions = select(
+        literal('training_session').label('type'),
+        TrainingSession.id.label('id'),
+        TrainingSession.created_at.label('date')
+    ).join(TrainingSession.plan).where(
+        TrainingPlan.user_id == user.id
+    ).order_by(TrainingSession.created_at.desc(), TrainingSession.id.desc()).limit(5).subquery()
     
-    # Get recent performance tests
-    recent_tests = Performance.query.filter_by(
-        user_id=user.id
-    ).order_by(Performance.test_date.desc()).limit(3).all()
+    recent_tests = select(
+        literal('performance_test').label('type'),
+        Performance.id.label('id'),
+        Performance.test_date.label('date')
+    ).where(
+        Performance.user_id == user.id
+    ).order_by(Performance.test_date.desc(), Performance.id.desc()).limit(3).subquery()
     
-    activity = []
+    activity_rows = db.session.execute(
+        select(union_all(select(recent_sessions), select(recent_tests)).subquery())
+        .order_by(desc('date'), 'type', desc('id'))
+        .limit(10)
+    ).all()
     
-    for session in recent_sessions:
-        activity.append({
-            'type': 'training_session',
-            'title': session.session_name,
-            'date': session.created_at.isoformat() if session.created_at else None,
-            'status': 'completed' if session.is_completed else 'pending',
-            'data': session.to_dict()
-        })
+    # Hydrate each kind with one batched query
+    session_ids = [row.id for row in activity_rows if row.type == 'training_session']
+    test_ids = [row.id for row in activity_rows if row.type == 'performance_test']
+    sessions = {
+        row.id: row
+        for row in db.session.execute(
+            select(*TrainingSession.summary_columns()).where(TrainingSession.id.in_(session_ids))
+        )
+    } if session_ids else {}
+    tests = {
+        test.id: test for test in Performance.query.filter(Performance.id.in_(test_ids))
+    } if test_ids else {}
     
-    for test in recent_tests:
-        activity.append({
-            'type': 'performance_test',
-            'title': f"{test.test_type.value} Test",
-            'date': test.test_date.isoformat() if test.test_date else None,
-            'status': 'completed',
-            'data': test.to_dict()
-        })
+    activity = []
     
-    # Sort by date
-    activity.sort(key=lambda x: x['date'], reverse=True)
+    for row in activity_rows:
+        if row.type == 'training_session':
+            session = sessions[row.id]
+            activity.append({
+                'type': 'training_session',
+                'title': session.session_name,
+                'date': session.created_at.isoformat() if session.created_at else None,
+                'status': 'completed' if session.is_completed else 'pending',
+                'data': TrainingSession.summary_dict(session, session.exercises_count)
+            })
+        else:
+            test = tests[row.id]
+            activity.append({
+                'type': 'performance_test',
+                'title': f"{test.test_type.value} Test",
+                'date': test.test_date.isoformat() if test.test_date else None,
+                'status': 'completed',
+                'data': test.to_dict()
+            })
     
-    return activity[:10]  # Return last 10 activities
+    return activity
 
 def get_upcoming_sessions(user):
     """Get upcoming training sessions"""
-    from models.training import TrainingSession
+    from models.training import TrainingSession, TrainingPlan
     from datetime import datetime, timedelta
     
-    upcoming = TrainingSession.query.join(
-        TrainingSession.plan
-    ).filter_by(user_id=user.id).filter(
-        TrainingSession.is_completed == False,
-        TrainingSession.scheduled_date >= datetime.now().date(),
-        TrainingSession.scheduled_date <= (datetime.now() + timedelta(days=7)).date()
-    ).order_by(TrainingSession.scheduled_date).limit(5).all()
+    upcoming = db.session.execute(
+        select(*TrainingSession.summary_columns())
+        .join(TrainingSession.plan)
+        .where(
+            TrainingPlan.user_id == user.id,
+            TrainingSession.is_completed == False,
+            TrainingSession.scheduled_date >= datetime.now().date(),
+            TrainingSession.scheduled_date <= (datetime.now() + timedelta(days=7)).date()
+        )
+        .order_by(TrainingSession.scheduled_date)
+        .limit(5)
+    ).all()
     
-    return [session.to_dict() for session in upcoming]
+    return [TrainingSession.summary_dict(row, row.exercises_count) for row in upcoming]
 
 def get_training_statistics(user):
     """Get training statistics"""
     from models.training import TrainingSession, TrainingPlan
     
-    total_plans = TrainingPlan.query.filter_by(user_id=user.id).count()
-    completed_plans = TrainingPlan.query.filter_by(user_id=user.id, is_completed=True).count()
-    
-    total_sessions = TrainingSession.query.join(
-        TrainingSession.plan
-    ).filter_by(user_id=user.id).count()
-    
-    completed_sessions = TrainingSession.query.join(
-        TrainingSession.plan
-    ).filter_by(user_id=user.id).filter(
-        TrainingSession.is_completed == True
-    ).count()
+    # All four counts in one pass over plans outer-joined to their sessions
+    # (plan counts are DISTINCT because each plan repeats once per session)
+    total_plans, completed_plans, total_sessions, completed_sessions = db.session.execute(
+        select(
+            func.count(distinct(TrainingPlan.id)),
+            func.count(distinct(case((TrainingPlan.is_completed == True, TrainingPlan.id)))),
+            func.count(TrainingSession.id),
+            func.count(case((TrainingSession.is_completed == True, 1)))
+        )
+        .select_from(TrainingPlan)
+        .outerjoin(TrainingPlan.sessions)
+        .where(TrainingPlan.user_id == user.id)
+    ).one()
     
     return {
         'total_plans': total_plans,
@@ -274,19 +308,21 @@ def get_performance_statistics(user):
     """Get performance statistics"""
     from models.performance import Performance, TestType
     
-    total_tests = Performance.query.filter_by(user_id=user.id).count()
+    # Test and improvement counts per type in one GROUP BY
+    rows = db.session.execute(
+        select(
+            Performance.test_type,
+            func.count(),
+            func.sum(case((Performance.improvement_from_baseline > 0, 1), else_=0))
+        )
+        .where(Performance.user_id == user.id)
+        .group_by(Performance.test_type)
+    ).all()
+    type_counts = {test_type: count for test_type, count, _ in rows}
     
-    # Get test counts by type
-    test_counts = {}
-    for test_type in TestType:
-        count = Performance.query.filter_by(user_id=user.id, test_type=test_type).count()
-        if count > 0:
-            test_counts[test_type.value] = count
-    
-    # Get improvement statistics
-    improved_tests = Performance.query.filter_by(user_id=user.id).filter(
-        Performance.improvement_from_baseline > 0
-    ).count()
+    test_counts = {test_type.value: type_counts[test_type] for test_type in TestType if type_counts.get(test_type)}
+    total_tests = sum(type_counts.values())
+    improved_tests = sum(improved for _, _, improved in rows)
     
     return {
         'total_tests': total_tests,
@@ -297,9 +333,10 @@ def get_performance_statistics(user):
 
 def get_health_metrics(user):
     """Get health metrics"""
+    bmi = user.bmi
     return {
-        'bmi': user.calculate_bmi(),
-        'bmi_category': get_bmi_category(user.calculate_bmi()),
+        'bmi': bmi,
+        'bmi_category': get_bmi_category(bmi),
         'age': user.age,
         'years_experience': user.years_experience,
         'training_frequency': user.training_frequency,
@@ -309,27 +346,39 @@ def get_health_metrics(user):
 
 def get_user_achievements(user):
     """Get user achievements"""
+    from models.training import TrainingPlan
+    from models.performance import Performance
+    
+    # Plan count and the first plan's and test's dates, without loading either collection
+    training_count, first_plan_created, first_test_date = db.session.execute(
+        select(
+            select(func.count()).where(TrainingPlan.user_id == user.id).scalar_subquery(),
+            select(func.min(TrainingPlan.created_at)).where(TrainingPlan.user_id == user.id).scalar_subquery(),
+            select(func.min(Performance.test_date)).where(Performance.user_id == user.id).scalar_subquery()
+        )
+    ).one()
+    
     achievements = []
     
     # Basic achievements based on activity
-    if user.trainings and len(user.trainings) >= 1:
+    if training_count >= 1:
         achievements.append({
             'title': 'First Training Plan',
             'description': 'Completed your first training plan',
             'icon': 'trophy',
-            'date_earned': user.trainings[0].created_at.isoformat() if user.trainings[0].created_at else None
+            'date_earned': first_plan_created.isoformat() if first_plan_created else None
         })
     
-    if user.performances and len(user.performances) >= 1:
+    # test_date is NOT NULL, so it is only missing when there are no tests
+    if first_test_date is not None:
         achievements.append({
             'title': 'First Performance Test',
             'description': 'Completed your first performance test',
             'icon': 'chart-line',
-            'date_earned': user.performances[0].test_date.isoformat() if user.performances[0].test_date else None
+            'date_earned': first_test_date.isoformat()
         })
     
     # Streak achievements
-    training_count = len(user.trainings) if user.trainings else 0
     if training_count >= 10:
         achievements.append({
             'title': 'Training Enthusiast',
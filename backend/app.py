@@ -1,39 +1,104 @@
 from flask import Flask, jsonify, request
+from flask.json.provider import DefaultJSONProvider, JSONProvider
 from flask_cors import CORS
+from flask_compress import Compress
 from flask_jwt_extended import JWTManager
 from dotenv import load_dotenv
+import orjson
 import os
 
 # Load environment variables
 load_dotenv()
 
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson (jsonify and request.get_json use it)"""
+    
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=DefaultJSONProvider.default, option=self.options).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=DefaultJSONProvider.default, option=self.options)
+        return self._app.response_class(body, mimetype='application/json')
+
+class HealthCheckMiddleware:
+    """Answers GET/HEAD /api/health before Flask: no routing, JWT, CORS or compression work per probe"""
+    
+    body = orjson.dumps({'status': 'healthy', 'message': 'Sports AI Platform is running!'})
+    headers = [
+        ('Content-Type', 'application/json'),
+        ('Content-Length', str(len(body))),
+        ('Access-Control-Allow-Origin', '*')  # what CORS(app) would add
+    ]
+    
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+    
+    def __call__(self, environ, start_response):
+        method = environ.get('REQUEST_METHOD')
+        if environ.get('PATH_INFO') == '/api/health' and method in ('GET', 'HEAD'):
+            start_response('200 OK', list(self.headers))
+            return [self.body if method == 'GET' else b'']
+        return self.wsgi_app(environ, start_response)
+
 # Initialize Flask app
 app = Flask(__name__)
+app.wsgi_app = HealthCheckMiddleware(app.wsgi_app)
+app.json = ORJSONProvider(app)
 
 # Configuration
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///sportsai.db')  # SQLite for demo
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    # JSON/JSONB columns are encoded and decoded with orjson (its decoder reuses one str object per repeated short key)
+    'json_serializer': lambda obj: orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode(),
+    'json_deserializer': orjson.loads
+}
+if not app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+    # Database server: connections per process = pool_size + max_overflow (size to worker threads, keep
+    # processes x that under the server's max_connections); no pre-ping round trip on checkout, and
+    # connections are replaced before typical server/proxy idle timeouts instead
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'].update(
+        pool_size=int(os.getenv('DB_POOL_SIZE', 20)),
+        max_overflow=int(os.getenv('DB_MAX_OVERFLOW', 10)),
+        pool_pre_ping=False,
+        pool_recycle=1800
+    )
 app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'jwt-secret-string')
+app.config['REDIS_URL'] = os.getenv('REDIS_URL')  # Response cache; disabled when unset
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']  # Negotiated per request from Accept-Encoding
+app.config['COMPRESS_MIN_SIZE'] = 500
 
 # Initialize db from models
-from models import db
+from models import db, convert_enum_columns
 db.init_app(app)
 
 # Initialize other extensions
 jwt = JWTManager(app)
 CORS(app)
+Compress(app)
+
+# Development aid: log lazy loads that fire once per row (pip install nplusone)
+if os.getenv('NPLUSONE'):
+    from nplusone.ext.flask_sqlalchemy import NPlusOne
+    NPlusOne(app)
 
 # Import models after db initialization
 from models.user import User
-from models.training import TrainingPlan, TrainingSession, SessionExercise, Exercise
-from models.performance import Performance, PerformanceBaseline, PerformanceReport
+from models.training import TrainingPlan, TrainingSession, SessionExercise, Exercise, ExerciseSport, backfill_exercise_sports
+from models.performance import Performance, PerformanceBaseline, PerformanceReport, install_improvement_trigger
 
 # Import API blueprints
 from api.auth import auth_bp
 from api.users import users_bp
 from api.training import training_bp
-from api.performance import performance_bp
+from api.performance import performance_bp, enrich_pending_performances
 
 # Register blueprints
 app.register_blueprint(auth_bp, url_prefix='/api/auth')
@@ -41,11 +106,6 @@ app.register_blueprint(users_bp, url_prefix='/api/users')
 app.register_blueprint(training_bp, url_prefix='/api/training')
 app.register_blueprint(performance_bp, url_prefix='/api/performance')
 
-@app.route('/api/health')
-def health_check():
-    """Health check endpoint"""
-    return jsonify({'status': 'healthy', 'message': 'Sports AI Platform is running!'})
-
 @app.route('/')
 def index():
     """Root endpoint"""
@@ -61,10 +121,29 @@ def index():
         }
     })
 
-# Create database tables
-with app.app_context():
+def init_database():
+    """Create missing tables, convert legacy enum columns, (re)install database triggers and backfill derived rows"""
     db.create_all()
+    convert_enum_columns()
+    install_improvement_trigger()
+    backfill_exercise_sports()
+
+# Schema setup runs on demand (flask --app app init-db), not on every import / worker start
+@app.cli.command('init-db')
+def init_db_command():
+    """Create the database tables"""
+    init_database()
     print("Database tables created successfully!")
 
+# Background analysis is queued in-process; run this after a restart (or from cron) to finish what was lost
+@app.cli.command('enrich-pending')
+def enrich_pending_command():
+    """Analyse performance tests whose background enrichment never ran"""
+    count = enrich_pending_performances()
+    print(f"Enriched {count} pending performance tests")
+
 if __name__ == '__main__':
+    # Development server: make sure the tables exist first
+    with app.app_context():
+        init_database()
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
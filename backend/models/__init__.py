@@ -1,4 +1,104 @@
 # Models package initialization
+from enum import Enum
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import DateTime, Float, Integer, Numeric, SmallInteger, cast, func, inspect, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.types import TypeDecorator
 
-db = SQLAlchemy()
\ No newline at end of file
+db = SQLAlchemy()
+
+# Native JSON storage (JSONB on Postgres); values are plain dicts/lists, serialized by the engine
+JSONType = db.JSON().with_variant(JSONB(), 'postgresql')
+
+class SmallIntEnum(TypeDecorator):
+    """Enum stored as a SMALLINT code, taken from an explicit {member: code} mapping.
+
+    Codes are part of the stored data: never renumber or reuse one. Binds members or their
+    values (what the API passes); loads members.
+    """
+    impl = SmallInteger
+    cache_ok = True
+    
+    def __init__(self, enum_class, member_codes):
+        super().__init__()
+        if set(member_codes) != set(enum_class) or len(set(member_codes.values())) != len(member_codes):
+            raise ValueError(f"{enum_class.__name__} needs exactly one unique code per member")
+        # member_codes is not kept as an attribute: it is fixed per enum_class, which alone keys the statement cache
+        self.enum_class = enum_class
+        self.members = {code: member for member, code in member_codes.items()}
+        # Converted VARCHAR columns on SQLite keep text affinity and hand the codes back as strings
+        self.members.update({str(code): member for member, code in member_codes.items()})
+        self.codes = dict(member_codes)
+        self.codes.update({member.value: code for member, code in member_codes.items()})
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        try:
+            return self.codes[value]
+        except (KeyError, TypeError):
+            raise LookupError(f"{value!r} is not among the defined enum values of {self.enum_class.__name__}") from None
+    
+    def process_result_value(self, value, dialect):
+        return self.members[value] if value is not None else None
+
+def convert_enum_columns():
+    """Rewrite SmallIntEnum columns still holding enum names (tables created before the codes) as codes.
+
+    Idempotent: columns that are already integers are skipped. On Postgres the column becomes
+    SMALLINT and the old native enum type is dropped; SQLite cannot change a column type, so the
+    values are updated in place.
+    """
+    columns = [
+        (table, column) for table in db.metadata.sorted_tables for column in table.columns
+        if isinstance(column.type, SmallIntEnum)
+    ]
+    existing = inspect(db.engine).get_table_names()
+    enum_types = set()
+    with db.engine.begin() as connection:
+        inspector = inspect(connection)
+        for table, column in columns:
+            if table.name not in existing:
+                continue
+            current = {c['name']: c['type'] for c in inspector.get_columns(table.name)}[column.name]
+            if isinstance(current, Integer):
+                continue
+            enum_type = column.type
+            # Stored names (what db.Enum wrote), values, and codes written by a previous run
+            whens = ' '.join(
+                f"WHEN '{label}' THEN {code}"
+                for member, code in enum_type.codes.items() if isinstance(member, Enum)
+                for label in (member.name, member.value, str(code))
+            )
+            if connection.dialect.name == 'postgresql':
+                connection.execute(text(
+                    f'ALTER TABLE {table.name} ALTER COLUMN {column.name} TYPE SMALLINT '
+                    f'USING CASE {column.name}::text {whens} END'
+                ))
+                enum_types.add(enum_type.enum_class.__name__.lower())  # db.Enum's default type name
+            else:
+                connection.execute(text(
+                    f'UPDATE {table.name} SET {column.name} = CASE {column.name} {whens} END '
+                    f'WHERE {column.name} IS NOT NULL'
+                ))
+        for enum_type in sorted(enum_types):
+            connection.execute(text(f'DROP TYPE IF EXISTS {enum_type}'))
+
+def round2(value):
+    """round(value, 2) in SQL (PostgreSQL only rounds numerics to a scale)"""
+    return cast(func.round(cast(value, Numeric), 2), Float)
+
+class utcnow(FunctionElement):
+    """Current UTC time computed by the database (for server-side timestamp defaults)"""
+    type = DateTime()
+    inherit_cache = True
+
+@compiles(utcnow)
+def _utcnow_default(element, compiler, **kw):
+    return 'CURRENT_TIMESTAMP'  # UTC on SQLite
+
+@compiles(utcnow, 'postgresql')
+def _utcnow_postgresql(element, compiler, **kw):
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
@@ -1,7 +1,10 @@
+from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
-import json
-from . import db
+import numpy as np
+from sqlalchemy import DDL, bindparam, case, func, or_, text, update
+from analytics.trend import linreg_slope_pct
+from . import db, JSONType, SmallIntEnum, round2, utcnow
 
 class TestType(Enum):
     VERTICAL_JUMP = "vertical_jump"      # Patlayıcı güç
@@ -14,6 +17,22 @@ class TestType(Enum):
     ENDURANCE = "endurance"              # Dayanıklılık
     SPORT_SPECIFIC = "sport_specific"    # Spor branşına özel testler
 
+# Stored SMALLINT code of each member: permanent, so new members take the next unused code
+_TEST_TYPE_CODES = {
+    TestType.VERTICAL_JUMP: 1,
+    TestType.SPRINT_20M: 2,
+    TestType.T_TEST: 3,
+    TestType.HEART_RATE_RECOVERY: 4,
+    TestType.VO2_MAX: 5,
+    TestType.FLEXIBILITY: 6,
+    TestType.STRENGTH_1RM: 7,
+    TestType.ENDURANCE: 8,
+    TestType.SPORT_SPECIFIC: 9
+}
+
+# Tests where a lower value is better
+TIME_BASED_METRICS = frozenset({TestType.SPRINT_20M, TestType.T_TEST})
+
 class PerformanceMetric(Enum):
     # Physical metrics
     POWER = "power"
@@ -35,28 +54,104 @@ class PerformanceMetric(Enum):
     BALANCE = "balance"
     TECHNIQUE_SCORE = "technique_score"
 
+# Stored SMALLINT code of each member: permanent, so new members take the next unused code
+_PERFORMANCE_METRIC_CODES = {
+    PerformanceMetric.POWER: 1,
+    PerformanceMetric.SPEED: 2,
+    PerformanceMetric.AGILITY: 3,
+    PerformanceMetric.ENDURANCE: 4,
+    PerformanceMetric.STRENGTH: 5,
+    PerformanceMetric.FLEXIBILITY: 6,
+    PerformanceMetric.HEART_RATE: 7,
+    PerformanceMetric.RECOVERY_RATE: 8,
+    PerformanceMetric.VO2_MAX: 9,
+    PerformanceMetric.LACTATE_THRESHOLD: 10,
+    PerformanceMetric.REACTION_TIME: 11,
+    PerformanceMetric.COORDINATION: 12,
+    PerformanceMetric.BALANCE: 13,
+    PerformanceMetric.TECHNIQUE_SCORE: 14
+}
+
+@dataclass
+class PerformanceView:
+    """Fixed-shape view of a Performance row, encoded directly by orjson (enums and datetimes included)"""
+    id: int
+    user_id: int
+    test_type: TestType
+    test_date: datetime
+    week_number: int
+    primary_metric: PerformanceMetric
+    primary_value: float
+    primary_unit: str
+    secondary_metrics: dict
+    test_conditions: dict
+    pre_test_state: dict
+    improvement_from_baseline: float
+    improvement_from_last_test: float
+    percentile_rank: float
+    ai_analysis: dict
+    recommendations: dict
+    tester_notes: str
+    user_feedback: str
+    video_url: str
+    created_at: datetime
+    updated_at: datetime
+    
+    # No per-instance __dict__ (dataclass(slots=True) needs Python 3.10)
+    __slots__ = tuple(__annotations__)
+
+@dataclass
+class PerformanceReportView:
+    """Fixed-shape view of a PerformanceReport row, encoded directly by orjson"""
+    id: int
+    user_id: int
+    report_type: str
+    period_start: datetime
+    period_end: datetime
+    overall_progress: dict
+    metric_improvements: dict
+    training_effectiveness: dict
+    ai_insights: dict
+    recommendations: dict
+    risk_factors: dict
+    next_period_goals: dict
+    generated_at: datetime
+    
+    __slots__ = tuple(__annotations__)
+
+def _dict_or_empty(value):
+    """A JSON document column value, with NULL read as {}"""
+    return value if value is not None else {}
+
 class Performance(db.Model):
     __tablename__ = 'performances'
+    __table_args__ = (
+        # Latest test of a kind (record_performance_test) and date-window scans (/tests, /analysis, /stats)
+        db.Index('ix_perf_user_type_metric_date', 'user_id', 'test_type', 'primary_metric', 'test_date'),
+        db.Index('ix_perf_user_date', 'user_id', 'test_date'),
+        # Test history of one type, newest first (/tests?test_type=..., trend inputs)
+        db.Index('ix_perf_user_type_date', 'user_id', 'test_type', 'test_date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     
     # Test information
-    test_type = db.Column(db.Enum(TestType), nullable=False)
+    test_type = db.Column(SmallIntEnum(TestType, _TEST_TYPE_CODES), nullable=False)
     test_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     week_number = db.Column(db.Integer)  # Training week when test was performed
     
     # Test results
-    primary_metric = db.Column(db.Enum(PerformanceMetric), nullable=False)
+    primary_metric = db.Column(SmallIntEnum(PerformanceMetric, _PERFORMANCE_METRIC_CODES), nullable=False)
     primary_value = db.Column(db.Float, nullable=False)
     primary_unit = db.Column(db.String(20), nullable=False)  # cm, seconds, bpm, etc.
     
     # Additional metrics (JSON format)
-    secondary_metrics = db.Column(db.Text)  # JSON: {metric: {value: x, unit: y}}
+    secondary_metrics = db.Column(JSONType)  # JSON: {metric: {value: x, unit: y}}
     
     # Test conditions
-    test_conditions = db.Column(db.Text)  # JSON: weather, equipment, etc.
-    pre_test_state = db.Column(db.Text)   # JSON: fatigue level, sleep, nutrition
+    test_conditions = db.Column(JSONType)  # JSON: weather, equipment, etc.
+    pre_test_state = db.Column(JSONType)   # JSON: fatigue level, sleep, nutrition
     
     # Performance analysis
     improvement_from_baseline = db.Column(db.Float)  # Percentage improvement
@@ -64,46 +159,39 @@ class Performance(db.Model):
     percentile_rank = db.Column(db.Float)  # Ranking among similar athletes
     
     # AI analysis
-    ai_analysis = db.Column(db.Text)      # JSON: AI insights about performance
-    recommendations = db.Column(db.Text)  # JSON: AI recommendations
+    ai_analysis = db.Column(JSONType)      # JSON: AI insights about performance
+    recommendations = db.Column(JSONType)  # JSON: AI recommendations
     
     # Notes and observations
     tester_notes = db.Column(db.Text)
     user_feedback = db.Column(db.Text)
     video_url = db.Column(db.String(500))  # Recording of the test
     
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, server_default=utcnow())
+    updated_at = db.Column(db.DateTime, server_default=utcnow(), onupdate=utcnow())
+    
+    # Relationships
+    user = db.relationship('User', back_populates='performances')
     
     def get_secondary_metrics(self):
         """Get secondary metrics as dict"""
-        if self.secondary_metrics:
-            return json.loads(self.secondary_metrics)
-        return {}
+        return self.secondary_metrics if self.secondary_metrics is not None else {}
     
     def get_test_conditions(self):
         """Get test conditions as dict"""
-        if self.test_conditions:
-            return json.loads(self.test_conditions)
-        return {}
+        return self.test_conditions if self.test_conditions is not None else {}
     
     def get_pre_test_state(self):
         """Get pre-test state as dict"""
-        if self.pre_test_state:
-            return json.loads(self.pre_test_state)
-        return {}
+        return self.pre_test_state if self.pre_test_state is not None else {}
     
     def get_ai_analysis(self):
         """Get AI analysis as dict"""
-        if self.ai_analysis:
-            return json.loads(self.ai_analysis)
-        return {}
+        return self.ai_analysis if self.ai_analysis is not None else {}
     
     def get_recommendations(self):
         """Get recommendations as dict"""
-        if self.recommendations:
-            return json.loads(self.recommendations)
-        return {}
+        return self.recommendations if self.recommendations is not None else {}
     
     def calculate_improvement_trend(self, previous_tests):
         """Calculate improvement trend over time"""
@@ -111,28 +199,13 @@ class Performance(db.Model):
             return None
         
         # Calculate trend over last 4-6 tests
-        values = [test.primary_value for test in previous_tests[-6:]]
-        values.append(self.primary_value)
+        values = np.array([test.primary_value for test in previous_tests[-6:]] + [self.primary_value], dtype=np.float64)
         
-        if len(values) < 3:
+        if values.size < 3:
             return None
         
-        # Simple linear trend calculation
-        x_values = list(range(len(values)))
-        n = len(values)
-        
-        sum_x = sum(x_values)
-        sum_y = sum(values)
-        sum_xy = sum(x * y for x, y in zip(x_values, values))
-        sum_x2 = sum(x * x for x in x_values)
-        
-        slope = (n * sum_xy - sum_x * sum_y) / (n * sum_x2 - sum_x * sum_x)
-        
-        # Return percentage trend per test
-        avg_value = sum_y / n
-        trend_percentage = (slope / avg_value) * 100 if avg_value != 0 else 0
-        
-        return round(trend_percentage, 2)
+        # Linear trend as a percentage of the mean per test
+        return round(linreg_slope_pct(values), 2)
     
     def to_dict(self):
         return {
@@ -158,16 +231,129 @@ class Performance(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
+    
+    def to_view(self):
+        """Same content as to_dict(), left for orjson to encode"""
+        return self.view_from_row(self)
+    
+    @classmethod
+    def view_columns(cls):
+        """Columns behind PerformanceView, for list queries that skip building ORM objects"""
+        return [getattr(cls, name) for name in PerformanceView.__slots__]
+    
+    @staticmethod
+    def view_from_row(row):
+        """PerformanceView of a view_columns() row (or of a Performance)"""
+        return PerformanceView(
+            row.id, row.user_id, row.test_type, row.test_date, row.week_number,
+            row.primary_metric, row.primary_value, row.primary_unit,
+            _dict_or_empty(row.secondary_metrics), _dict_or_empty(row.test_conditions),
+            _dict_or_empty(row.pre_test_state),
+            row.improvement_from_baseline, row.improvement_from_last_test, row.percentile_rank,
+            _dict_or_empty(row.ai_analysis), _dict_or_empty(row.recommendations),
+            row.tester_notes, row.user_feedback, row.video_url,
+            row.created_at, row.updated_at
+        )
+
+# On Postgres, improvement_from_last_test is filled in by the database when a row is inserted
+# without one (same formula as api.performance.calculate_improvement; time-based tests improve downwards)
+_IMPROVEMENT_TRIGGER = 'performances_improvement_from_last_test'
+_trigger_time_based_codes = ', '.join(
+    str(Performance.test_type.type.codes[test_type]) for test_type in ('sprint_20m', 't_test', 'heart_rate_recovery')
+)
+# Idempotent, so init-db can (re)install it on databases whose tables already exist
+_IMPROVEMENT_TRIGGER_DDL = (
+    DDL(f"""
+CREATE OR REPLACE FUNCTION performances_improvement_from_last_test() RETURNS trigger AS $$
+DECLARE
+    prev double precision;
+BEGIN
+    IF NEW.improvement_from_last_test IS NULL THEN
+        SELECT primary_value INTO prev FROM performances
+        WHERE user_id = NEW.user_id AND test_type = NEW.test_type AND primary_metric = NEW.primary_metric
+        ORDER BY test_date DESC LIMIT 1;
+        IF prev = 0 THEN
+            NEW.improvement_from_last_test := 0;
+        ELSIF prev IS NOT NULL THEN
+            IF NEW.test_type IN ({_trigger_time_based_codes}) THEN
+                NEW.improvement_from_last_test := round(((prev - NEW.primary_value) / prev * 100)::numeric, 2);
+            ELSE
+                NEW.improvement_from_last_test := round(((NEW.primary_value - prev) / prev * 100)::numeric, 2);
+            END IF;
+        END IF;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""),
+    DDL(f"DROP TRIGGER IF EXISTS {_IMPROVEMENT_TRIGGER} ON performances"),
+    DDL(f"""
+CREATE TRIGGER {_IMPROVEMENT_TRIGGER}
+BEFORE INSERT ON performances
+FOR EACH ROW EXECUTE FUNCTION performances_improvement_from_last_test()
+"""),
+)
+
+def install_improvement_trigger():
+    """Create or replace the improvement_from_last_test trigger (Postgres only)"""
+    if db.engine.dialect.name != 'postgresql':
+        return
+    with db.engine.begin() as connection:
+        for ddl in _IMPROVEMENT_TRIGGER_DDL:
+            connection.execute(ddl)
+
+_improvement_trigger_present = None
+
+def improvement_trigger_present():
+    """Whether the database fills improvement_from_last_test itself (looked up once per process)"""
+    global _improvement_trigger_present
+    if _improvement_trigger_present is None:
+        _improvement_trigger_present = db.engine.dialect.name == 'postgresql' and bool(db.session.scalar(
+            text("SELECT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = :name AND tgrelid = 'performances'::regclass)"),
+            {'name': _IMPROVEMENT_TRIGGER}
+        ))
+    return _improvement_trigger_present
+
+# Target column of each target_type of calculate_target_progress
+_TARGET_ATTRS = {
+    'short_term': 'short_term_target',
+    'medium_term': 'medium_term_target',
+    'long_term': 'long_term_target'
+}
+
+def _improvement_expression(test_type, baseline_value, current_best):
+    """SQL form of PerformanceBaseline.calculate_current_improvement"""
+    return case(
+        (current_best.is_(None) | (current_best == 0) | (baseline_value == 0), 0),
+        (test_type.in_(TIME_BASED_METRICS), round2((baseline_value - current_best) * 100.0 / baseline_value)),
+        else_=round2((current_best - baseline_value) * 100.0 / baseline_value)
+    )
+
+def _progress_expression(target, baseline_value, current_best):
+    """SQL form of PerformanceBaseline.calculate_target_progress for one target column"""
+    needed = func.abs(target - baseline_value)
+    progress = round2(func.abs(current_best - baseline_value) * 100.0 / needed)
+    return case(
+        (target.is_(None) | (target == 0), 0),
+        (current_best.is_(None) | (current_best == 0), 0),
+        (needed == 0, 100),
+        (progress >= 100, 100),
+        else_=progress
+    )
 
 class PerformanceBaseline(db.Model):
     __tablename__ = 'performance_baselines'
+    __table_args__ = (
+        # Baseline of a test kind (record_performance_test, target updates); the prefix serves per-type lookups
+        db.Index('ix_baseline_user_type_metric', 'user_id', 'test_type', 'metric'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     
     # Baseline information
-    test_type = db.Column(db.Enum(TestType), nullable=False)
-    metric = db.Column(db.Enum(PerformanceMetric), nullable=False)
+    test_type = db.Column(SmallIntEnum(TestType, _TEST_TYPE_CODES), nullable=False)
+    metric = db.Column(SmallIntEnum(PerformanceMetric, _PERFORMANCE_METRIC_CODES), nullable=False)
     baseline_value = db.Column(db.Float, nullable=False)
     baseline_unit = db.Column(db.String(20), nullable=False)
     
@@ -186,8 +372,15 @@ class PerformanceBaseline(db.Model):
     current_best_date = db.Column(db.DateTime)
     tests_count = db.Column(db.Integer, default=0)
     
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, server_default=utcnow())
+    updated_at = db.Column(db.DateTime, server_default=utcnow(), onupdate=utcnow())
+    
+    # SQL forms of calculate_current_improvement / calculate_target_progress, loaded with the row
+    # (and refreshed with it after a commit)
+    current_improvement = db.column_property(_improvement_expression(test_type, baseline_value, current_best))
+    short_term_progress = db.column_property(_progress_expression(short_term_target, baseline_value, current_best))
+    medium_term_progress = db.column_property(_progress_expression(medium_term_target, baseline_value, current_best))
+    long_term_progress = db.column_property(_progress_expression(long_term_target, baseline_value, current_best))
     
     def calculate_current_improvement(self):
         """Calculate current improvement from baseline"""
@@ -195,9 +388,7 @@ class PerformanceBaseline(db.Model):
             return 0
         
         # Different calculation for metrics where lower is better (time-based)
-        time_based_metrics = [TestType.SPRINT_20M, TestType.T_TEST]
-        
-        if self.test_type in time_based_metrics:
+        if self.test_type in TIME_BASED_METRICS:
             # For time-based: improvement = (baseline - current) / baseline * 100
             improvement = ((self.baseline_value - self.current_best) / self.baseline_value) * 100
         else:
@@ -208,13 +399,8 @@ class PerformanceBaseline(db.Model):
     
     def calculate_target_progress(self, target_type='short_term'):
         """Calculate progress towards target"""
-        targets = {
-            'short_term': self.short_term_target,
-            'medium_term': self.medium_term_target,
-            'long_term': self.long_term_target
-        }
-        
-        target = targets.get(target_type)
+        attr = _TARGET_ATTRS.get(target_type)
+        target = getattr(self, attr) if attr else None
         if not target or not self.current_best:
             return 0
         
@@ -230,13 +416,11 @@ class PerformanceBaseline(db.Model):
     
     def update_current_best(self, new_value, test_date):
         """Update current best if new value is better"""
-        time_based_metrics = [TestType.SPRINT_20M, TestType.T_TEST]
-        
         should_update = False
         
         if self.current_best is None:
             should_update = True
-        elif self.test_type in time_based_metrics:
+        elif self.test_type in TIME_BASED_METRICS:
             # For time-based metrics, lower is better
             should_update = new_value < self.current_best
         else:
@@ -246,10 +430,60 @@ class PerformanceBaseline(db.Model):
         if should_update:
             self.current_best = new_value
             self.current_best_date = test_date
-            self.updated_at = datetime.utcnow()
         
         self.tests_count += 1
     
+    @classmethod
+    def bulk_update_bests(cls, results):
+        """update_current_best for many (baseline, value, test_date) results.
+
+        Results are folded into one best and one test count per baseline. Baselines added in this
+        session and not yet flushed get them set directly; stored ones are updated with a single
+        executemany UPDATE, where the comparison with the stored best runs in the database.
+        """
+        folded = {}
+        for baseline, value, test_date in results:
+            row = folded.get(baseline)
+            if row is None:
+                folded[baseline] = {'baseline_id': baseline.id, 'value': value, 'test_date': test_date, 'count': 1}
+                continue
+            row['count'] += 1
+            if value < row['value'] if baseline.test_type in TIME_BASED_METRICS else value > row['value']:
+                row['value'], row['test_date'] = value, test_date
+        
+        updates = {}
+        for baseline, row in folded.items():
+            if row['baseline_id'] is not None:
+                updates[row['baseline_id']] = row
+                continue
+            if baseline.current_best is None or (
+                row['value'] < baseline.current_best if baseline.test_type in TIME_BASED_METRICS
+                else row['value'] > baseline.current_best
+            ):
+                baseline.current_best, baseline.current_best_date = row['value'], row['test_date']
+            baseline.tests_count = (baseline.tests_count or 0) + row['count']
+        
+        if not updates:
+            return
+        table = cls.__table__
+        value = bindparam('value', type_=db.Float)
+        # OR of equalities rather than IN: expanding IN parameters cannot be used with executemany
+        time_based = or_(*(table.c.test_type == test_type for test_type in sorted(TIME_BASED_METRICS, key=str)))
+        better = table.c.current_best.is_(None) | case(
+            (time_based, value < table.c.current_best),
+            else_=value > table.c.current_best
+        )
+        db.session.execute(
+            update(table)
+            .where(table.c.id == bindparam('baseline_id'))
+            .values(
+                current_best=case((better, value), else_=table.c.current_best),
+                current_best_date=case((better, bindparam('test_date')), else_=table.c.current_best_date),
+                tests_count=table.c.tests_count + bindparam('count')
+            ),
+            list(updates.values())
+        )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -267,10 +501,10 @@ class PerformanceBaseline(db.Model):
             'current_best': self.current_best,
             'current_best_date': self.current_best_date.isoformat() if self.current_best_date else None,
             'tests_count': self.tests_count,
-            'current_improvement': self.calculate_current_improvement(),
-            'short_term_progress': self.calculate_target_progress('short_term'),
-            'medium_term_progress': self.calculate_target_progress('medium_term'),
-            'long_term_progress': self.calculate_target_progress('long_term'),
+            'current_improvement': self.current_improvement,
+            'short_term_progress': self.short_term_progress,
+            'medium_term_progress': self.medium_term_progress,
+            'long_term_progress': self.long_term_progress,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
@@ -287,54 +521,40 @@ class PerformanceReport(db.Model):
     period_end = db.Column(db.DateTime, nullable=False)
     
     # Performance summary (JSON)
-    overall_progress = db.Column(db.Text)  # JSON: overall performance summary
-    metric_improvements = db.Column(db.Text)  # JSON: improvements by metric
-    training_effectiveness = db.Column(db.Text)  # JSON: training program effectiveness
+    overall_progress = db.Column(JSONType)  # JSON: overall performance summary
+    metric_improvements = db.Column(JSONType)  # JSON: improvements by metric
+    training_effectiveness = db.Column(JSONType)  # JSON: training program effectiveness
     
     # AI insights
-    ai_insights = db.Column(db.Text)  # JSON: AI-generated insights
-    recommendations = db.Column(db.Text)  # JSON: recommendations for next period
-    risk_factors = db.Column(db.Text)  # JSON: identified risk factors
+    ai_insights = db.Column(JSONType)  # JSON: AI-generated insights
+    recommendations = db.Column(JSONType)  # JSON: recommendations for next period
+    risk_factors = db.Column(JSONType)  # JSON: identified risk factors
     
     # Goals and targets
-    next_period_goals = db.Column(db.Text)  # JSON: goals for next period
+    next_period_goals = db.Column(JSONType)  # JSON: goals for next period
     
-    generated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    generated_at = db.Column(db.DateTime, server_default=utcnow())
     
     def get_overall_progress(self):
-        if self.overall_progress:
-            return json.loads(self.overall_progress)
-        return {}
+        return self.overall_progress if self.overall_progress is not None else {}
     
     def get_metric_improvements(self):
-        if self.metric_improvements:
-            return json.loads(self.metric_improvements)
-        return {}
+        return self.metric_improvements if self.metric_improvements is not None else {}
     
     def get_training_effectiveness(self):
-        if self.training_effectiveness:
-            return json.loads(self.training_effectiveness)
-        return {}
+        return self.training_effectiveness if self.training_effectiveness is not None else {}
     
     def get_ai_insights(self):
-        if self.ai_insights:
-            return json.loads(self.ai_insights)
-        return {}
+        return self.ai_insights if self.ai_insights is not None else {}
     
     def get_recommendations(self):
-        if self.recommendations:
-            return json.loads(self.recommendations)
-        return {}
+        return self.recommendations if self.recommendations is not None else {}
     
     def get_risk_factors(self):
-        if self.risk_factors:
-            return json.loads(self.risk_factors)
-        return {}
+        return self.risk_factors if self.risk_factors is not None else {}
     
     def get_next_period_goals(self):
-        if self.next_period_goals:
-            return json.loads(self.next_period_goals)
-        return {}
+        return self.next_period_goals if self.next_period_goals is not None else {}
     
     def to_dict(self):
         return {
@@ -351,4 +571,24 @@ class PerformanceReport(db.Model):
             'risk_factors': self.get_risk_factors(),
             'next_period_goals': self.get_next_period_goals(),
             'generated_at': self.generated_at.isoformat() if self.generated_at else None
-        }
\ No newline at end of file
+        }
+    
+    def to_view(self):
+        """Same content as to_dict(), left for orjson to encode"""
+        return self.view_from_row(self)
+    
+    @classmethod
+    def view_columns(cls):
+        """Columns behind PerformanceReportView, for list queries that skip building ORM objects"""
+        return [getattr(cls, name) for name in PerformanceReportView.__slots__]
+    
+    @staticmethod
+    def view_from_row(row):
+        """PerformanceReportView of a view_columns() row (or of a PerformanceReport)"""
+        return PerformanceReportView(
+            row.id, row.user_id, row.report_type, row.period_start, row.period_end,
+            _dict_or_empty(row.overall_progress), _dict_or_empty(row.metric_improvements),
+            _dict_or_empty(row.training_effectiveness), _dict_or_empty(row.ai_insights),
+            _dict_or_empty(row.recommendations), _dict_or_empty(row.risk_factors),
+            _dict_or_empty(row.next_period_goals), row.generated_at
+        )
\ No newline at end of file
@@ -1,7 +1,7 @@
+from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
-import json
-from . import db
+from . import db, JSONType, SmallIntEnum, utcnow
 
 class TrainingType(Enum):
     STRENGTH = "strength"
@@ -12,6 +12,17 @@ class TrainingType(Enum):
     FLEXIBILITY = "flexibility"
     SPORT_SPECIFIC = "sport_specific"
 
+# Stored SMALLINT code of each member: permanent, so new members take the next unused code
+_TRAINING_TYPE_CODES = {
+    TrainingType.STRENGTH: 1,
+    TrainingType.CARDIO: 2,
+    TrainingType.HIIT: 3,
+    TrainingType.AGILITY: 4,
+    TrainingType.ENDURANCE: 5,
+    TrainingType.FLEXIBILITY: 6,
+    TrainingType.SPORT_SPECIFIC: 7
+}
+
 class ExerciseType(Enum):
     # Type 2 muscle fiber exercises
     EXPLOSIVE = "explosive"
@@ -28,6 +39,19 @@ class ExerciseType(Enum):
     AGILITY_DRILL = "agility_drill"
     SKILL_BASED = "skill_based"
 
+# Stored SMALLINT code of each member: permanent, so new members take the next unused code
+_EXERCISE_TYPE_CODES = {
+    ExerciseType.EXPLOSIVE: 1,
+    ExerciseType.POWER: 2,
+    ExerciseType.SPRINT: 3,
+    ExerciseType.PLYOMETRIC: 4,
+    ExerciseType.AEROBIC: 5,
+    ExerciseType.TEMPO: 6,
+    ExerciseType.THRESHOLD: 7,
+    ExerciseType.AGILITY_DRILL: 8,
+    ExerciseType.SKILL_BASED: 9
+}
+
 class IntensityLevel(Enum):
     LOW = "low"        # 50-60% max effort
     MODERATE = "moderate"  # 60-70% max effort
@@ -35,41 +59,95 @@ class IntensityLevel(Enum):
     VERY_HIGH = "very_high"  # 85-95% max effort
     MAXIMAL = "maximal"    # 95-100% max effort
 
+# Stored SMALLINT code of each member: permanent, so new members take the next unused code
+_INTENSITY_LEVEL_CODES = {
+    IntensityLevel.LOW: 1,
+    IntensityLevel.MODERATE: 2,
+    IntensityLevel.HIGH: 3,
+    IntensityLevel.VERY_HIGH: 4,
+    IntensityLevel.MAXIMAL: 5
+}
+
+@dataclass
+class ExerciseView:
+    """Fixed-shape view of an Exercise row, encoded directly by orjson (enums included)"""
+    id: int
+    name: str
+    description: str
+    exercise_type: ExerciseType
+    target_muscle_groups: list
+    equipment_needed: list
+    instructions: str
+    video_url: str
+    difficulty_level: int
+    primary_sports: list
+    
+    # No per-instance __dict__ (dataclass(slots=True) needs Python 3.10)
+    __slots__ = tuple(__annotations__)
+
+@dataclass
+class TrainingPlanView:
+    """Fixed-shape view of a TrainingPlan row, encoded directly by orjson (enums and datetimes included)"""
+    id: int
+    user_id: int
+    name: str
+    description: str
+    week_number: int
+    training_type: TrainingType
+    target_adaptations: dict
+    expected_duration: int
+    difficulty_score: float
+    target_improvements: dict
+    is_active: bool
+    is_completed: bool
+    completion_rate: float
+    completion_date: datetime
+    model_version: str
+    created_at: datetime
+    updated_at: datetime
+    sessions_count: int
+    
+    __slots__ = tuple(__annotations__)
+
 class Exercise(db.Model):
     __tablename__ = 'exercises'
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
-    exercise_type = db.Column(db.Enum(ExerciseType), nullable=False)
-    target_muscle_groups = db.Column(db.Text)  # JSON string
-    equipment_needed = db.Column(db.Text)      # JSON string
+    exercise_type = db.Column(SmallIntEnum(ExerciseType, _EXERCISE_TYPE_CODES), nullable=False)
+    target_muscle_groups = db.Column(JSONType)  # JSON list
+    equipment_needed = db.Column(JSONType)      # JSON list
     instructions = db.Column(db.Text)
     video_url = db.Column(db.String(500))
     difficulty_level = db.Column(db.Integer, default=1)  # 1-5 scale
     
     # Sport-specific targeting
-    primary_sports = db.Column(db.Text)  # JSON string of sports this exercise benefits
+    primary_sports = db.Column(JSONType)  # JSON list of sports this exercise benefits
     
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, server_default=utcnow())
+    
+    # Relationships
+    session_uses = db.relationship('SessionExercise', back_populates='exercise')
+    sports = db.relationship('ExerciseSport', back_populates='exercise', cascade='all, delete-orphan')
+    
+    @db.validates('primary_sports')
+    def _sync_sports(self, key, value):
+        """Mirror primary_sports into the indexed exercise_sports rows"""
+        self.sports = [ExerciseSport(sport=sport) for sport in dict.fromkeys(value or ())]
+        return value
     
     def get_target_muscles(self):
         """Get target muscle groups as list"""
-        if self.target_muscle_groups:
-            return json.loads(self.target_muscle_groups)
-        return []
+        return self.target_muscle_groups if self.target_muscle_groups is not None else []
     
     def get_equipment(self):
         """Get equipment needed as list"""
-        if self.equipment_needed:
-            return json.loads(self.equipment_needed)
-        return []
+        return self.equipment_needed if self.equipment_needed is not None else []
     
     def get_primary_sports(self):
         """Get primary sports as list"""
-        if self.primary_sports:
-            return json.loads(self.primary_sports)
-        return []
+        return self.primary_sports if self.primary_sports is not None else []
     
     def to_dict(self):
         return {
@@ -84,9 +162,46 @@ class Exercise(db.Model):
             'difficulty_level': self.difficulty_level,
             'primary_sports': self.get_primary_sports()
         }
+    
+    def to_view(self):
+        """Same content as to_dict(), left for orjson to encode"""
+        return ExerciseView(
+            self.id, self.name, self.description, self.exercise_type,
+            self.get_target_muscles(), self.get_equipment(), self.instructions,
+            self.video_url, self.difficulty_level, self.get_primary_sports()
+        )
+
+class ExerciseSport(db.Model):
+    """One row per (exercise, sport) pair of Exercise.primary_sports, so sport filters are index lookups"""
+    __tablename__ = 'exercise_sports'
+    __table_args__ = (
+        # Exercise library filtered by sport (/training/exercises?sport=...)
+        db.Index('ix_exercise_sports_sport_exercise', 'sport', 'exercise_id'),
+    )
+    
+    exercise_id = db.Column(db.Integer, db.ForeignKey('exercises.id'), primary_key=True)
+    sport = db.Column(db.String(50), primary_key=True)
+    
+    # Relationships
+    exercise = db.relationship('Exercise', back_populates='sports')
+
+def backfill_exercise_sports():
+    """Create missing exercise_sports rows for exercises stored before the table existed"""
+    missing = Exercise.query.filter(
+        Exercise.primary_sports.isnot(None),
+        ~Exercise.sports.any()
+    ).all()
+    for exercise in missing:
+        exercise._sync_sports('primary_sports', exercise.primary_sports)
+    if missing:
+        db.session.commit()
 
 class TrainingPlan(db.Model):
     __tablename__ = 'training_plans'
+    __table_args__ = (
+        # Plan totals and completed counts per user (/training/stats)
+        db.Index('ix_plan_user_completed', 'user_id', 'is_completed'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -95,15 +210,15 @@ class TrainingPlan(db.Model):
     name = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
     week_number = db.Column(db.Integer, nullable=False)
-    training_type = db.Column(db.Enum(TrainingType), nullable=False)
+    training_type = db.Column(SmallIntEnum(TrainingType, _TRAINING_TYPE_CODES), nullable=False)
     
     # AI-generated parameters
-    target_adaptations = db.Column(db.Text)  # JSON: muscle fiber types, energy systems
+    target_adaptations = db.Column(JSONType)  # JSON: muscle fiber types, energy systems
     expected_duration = db.Column(db.Integer)  # minutes
     difficulty_score = db.Column(db.Float)     # 1-10 scale
     
     # Performance targets
-    target_improvements = db.Column(db.Text)  # JSON: specific metrics to improve
+    target_improvements = db.Column(JSONType)  # JSON: specific metrics to improve
     
     # Plan status
     is_active = db.Column(db.Boolean, default=True)
@@ -113,30 +228,26 @@ class TrainingPlan(db.Model):
     # AI model version for tracking
     model_version = db.Column(db.String(50))
     
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, server_default=utcnow())
+    updated_at = db.Column(db.DateTime, server_default=utcnow(), onupdate=utcnow())
     
     # Relationships
-    sessions = db.relationship('TrainingSession', backref='plan', lazy=True, cascade='all, delete-orphan')
+    user = db.relationship('User', back_populates='trainings')
+    sessions = db.relationship('TrainingSession', back_populates='plan', lazy=True, cascade='all, delete-orphan')
     
     def get_target_adaptations(self):
         """Get target adaptations as dict"""
-        if self.target_adaptations:
-            return json.loads(self.target_adaptations)
-        return {}
+        return self.target_adaptations if self.target_adaptations is not None else {}
     
     def get_target_improvements(self):
         """Get target improvements as dict"""
-        if self.target_improvements:
-            return json.loads(self.target_improvements)
-        return {}
+        return self.target_improvements if self.target_improvements is not None else {}
     
     def calculate_completion_rate(self):
         """Calculate plan completion percentage"""
-        if not self.sessions:
+        if not self.sessions_count:
             return 0
-        completed_sessions = sum(1 for session in self.sessions if session.is_completed)
-        return round((completed_sessions / len(self.sessions)) * 100, 2)
+        return round((self.completed_sessions_count / self.sessions_count) * 100, 2)
     
     def to_dict(self):
         return {
@@ -157,11 +268,25 @@ class TrainingPlan(db.Model):
             'model_version': self.model_version,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'sessions_count': len(self.sessions) if self.sessions else 0
+            'sessions_count': self.sessions_count
         }
+    
+    def to_view(self):
+        """Same content as to_dict(), left for orjson to encode"""
+        return TrainingPlanView(
+            self.id, self.user_id, self.name, self.description, self.week_number, self.training_type,
+            self.get_target_adaptations(), self.expected_duration, self.difficulty_score,
+            self.get_target_improvements(), self.is_active, self.is_completed,
+            self.calculate_completion_rate(), self.completion_date, self.model_version,
+            self.created_at, self.updated_at, self.sessions_count
+        )
 
 class TrainingSession(db.Model):
     __tablename__ = 'training_sessions'
+    __table_args__ = (
+        # Session totals and completed counts per plan (/training/stats, reports)
+        db.Index('ix_session_plan_completed', 'plan_id', 'is_completed'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     plan_id = db.Column(db.Integer, db.ForeignKey('training_plans.id'), nullable=False)
@@ -188,11 +313,12 @@ class TrainingSession(db.Model):
     user_notes = db.Column(db.Text)
     session_rating = db.Column(db.Integer)  # 1-5 stars
     
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, server_default=utcnow())
+    updated_at = db.Column(db.DateTime, server_default=utcnow(), onupdate=utcnow())
     
     # Relationships
-    exercises = db.relationship('SessionExercise', backref='session', lazy=True, cascade='all, delete-orphan')
+    plan = db.relationship('TrainingPlan', back_populates='sessions')
+    exercises = db.relationship('SessionExercise', back_populates='session', lazy=True, cascade='all, delete-orphan')
     
     def calculate_total_duration(self):
         """Calculate total planned session duration"""
@@ -206,27 +332,55 @@ class TrainingSession(db.Model):
         return None
     
     def to_dict(self):
+        return TrainingSession.summary_dict(self, len(self.exercises) if self.exercises else 0)
+    
+    @classmethod
+    def summary_columns(cls):
+        """Table columns plus exercises_count, enough to build to_dict() output from a plain row"""
+        exercises_count = db.select(db.func.count(SessionExercise.id)).where(
+            SessionExercise.session_id == cls.id
+        ).scalar_subquery().label('exercises_count')
+        return [*cls.__table__.columns, exercises_count]
+    
+    @staticmethod
+    def summary_dict(session, exercises_count):
+        """to_dict() content for a TrainingSession or a row of its summary_columns()"""
         return {
-            'id': self.id,
-            'plan_id': self.plan_id,
-            'session_name': self.session_name,
-            'session_number': self.session_number,
-            'scheduled_date': self.scheduled_date.isoformat() if self.scheduled_date else None,
-            'primary_focus': self.primary_focus,
-            'warm_up_duration': self.warm_up_duration,
-            'main_duration': self.main_duration,
-            'cool_down_duration': self.cool_down_duration,
-            'total_duration': self.calculate_total_duration(),
-            'is_completed': self.is_completed,
-            'actual_start_time': self.actual_start_time.isoformat() if self.actual_start_time else None,
-            'actual_end_time': self.actual_end_time.isoformat() if self.actual_end_time else None,
-            'actual_duration': self.calculate_actual_duration_minutes(),
-            'perceived_exertion': self.perceived_exertion,
-            'user_notes': self.user_notes,
-            'session_rating': self.session_rating,
-            'exercises_count': len(self.exercises) if self.exercises else 0
+            'id': session.id,
+            'plan_id': session.plan_id,
+            'session_name': session.session_name,
+            'session_number': session.session_number,
+            'scheduled_date': session.scheduled_date.isoformat() if session.scheduled_date else None,
+            'primary_focus': session.primary_focus,
+            'warm_up_duration': session.warm_up_duration,
+            'main_duration': session.main_duration,
+            'cool_down_duration': session.cool_down_duration,
+            'total_duration': TrainingSession.calculate_total_duration(session),
+            'is_completed': session.is_completed,
+            'actual_start_time': session.actual_start_time.isoformat() if session.actual_start_time else None,
+            'actual_end_time': session.actual_end_time.isoformat() if session.actual_end_time else None,
+            'actual_duration': TrainingSession.calculate_actual_duration_minutes(session),
+            'perceived_exertion': session.perceived_exertion,
+            'user_notes': session.user_notes,
+            'session_rating': session.session_rating,
+            'exercises_count': exercises_count
         }
 
+# Session counts are loaded with the plan row itself (correlated subqueries covered by
+# ix_session_plan_completed), so to_dict() never has to load the sessions collection
+TrainingPlan.sessions_count = db.column_property(
+    db.select(db.func.count(TrainingSession.id))
+    .where(TrainingSession.plan_id == TrainingPlan.id)
+    .correlate_except(TrainingSession)
+    .scalar_subquery()
+)
+TrainingPlan.completed_sessions_count = db.column_property(
+    db.select(db.func.count(TrainingSession.id))
+    .where(TrainingSession.plan_id == TrainingPlan.id, TrainingSession.is_completed == True)
+    .correlate_except(TrainingSession)
+    .scalar_subquery()
+)
+
 class SessionExercise(db.Model):
     __tablename__ = 'session_exercises'
     
@@ -240,7 +394,7 @@ class SessionExercise(db.Model):
     reps = db.Column(db.String(50))  # Can be "12", "8-10", "30 seconds", etc.
     weight = db.Column(db.Float)     # kg
     rest_time = db.Column(db.Integer)  # seconds
-    intensity = db.Column(db.Enum(IntensityLevel))
+    intensity = db.Column(SmallIntEnum(IntensityLevel, _INTENSITY_LEVEL_CODES))
     
     # Special parameters for different exercise types
     distance = db.Column(db.Float)   # meters for running/cycling
@@ -257,10 +411,12 @@ class SessionExercise(db.Model):
     form_notes = db.Column(db.Text)
     difficulty_rating = db.Column(db.Integer)  # 1-10 scale
     
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, server_default=utcnow())
     
     # Relationships
-    exercise = db.relationship('Exercise', backref='session_uses')
+    session = db.relationship('TrainingSession', back_populates='exercises')
+    # Always rendered by to_dict(), so loaded in the same SELECT
+    exercise = db.relationship('Exercise', back_populates='session_uses', lazy='joined')
     
     def to_dict(self):
         return {
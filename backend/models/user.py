@@ -1,7 +1,14 @@
+from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
+from functools import cached_property
+import os
 import bcrypt
-from . import db
+from sqlalchemy.ext.hybrid import hybrid_property
+from . import db, SmallIntEnum, round2, utcnow
+
+# Work factor of new hashes (each +1 doubles hashing time); stored hashes below it are upgraded at login
+BCRYPT_COST = int(os.getenv('BCRYPT_COST', 12))
 
 class SportType(Enum):
     FOOTBALL = "football"
@@ -14,12 +21,66 @@ class SportType(Enum):
     BADMINTON = "badminton"
     OTHER = "other"
 
+# Stored SMALLINT code of each member: permanent, so new members take the next unused code
+_SPORT_TYPE_CODES = {
+    SportType.FOOTBALL: 1,
+    SportType.BASKETBALL: 2,
+    SportType.TENNIS: 3,
+    SportType.RUNNING: 4,
+    SportType.CYCLING: 5,
+    SportType.SWIMMING: 6,
+    SportType.VOLLEYBALL: 7,
+    SportType.BADMINTON: 8,
+    SportType.OTHER: 9
+}
+
 class FitnessLevel(Enum):
     BEGINNER = "beginner"
     INTERMEDIATE = "intermediate"
     ADVANCED = "advanced"
     ELITE = "elite"
 
+# Stored SMALLINT code of each member: permanent, so new members take the next unused code
+_FITNESS_LEVEL_CODES = {
+    FitnessLevel.BEGINNER: 1,
+    FitnessLevel.INTERMEDIATE: 2,
+    FitnessLevel.ADVANCED: 3,
+    FitnessLevel.ELITE: 4
+}
+
+@dataclass
+class UserView:
+    """Fixed-shape view of a User row, encoded directly by orjson (enums and datetimes included)"""
+    id: int
+    email: str
+    first_name: str
+    last_name: str
+    age: int
+    height: float
+    weight: float
+    gender: str
+    sport_type: SportType
+    years_experience: int
+    fitness_level: FitnessLevel
+    training_frequency: int
+    has_injuries: bool
+    injury_description: str
+    medical_conditions: str
+    bmi: float
+    profile_completeness: float
+    created_at: datetime
+    updated_at: datetime
+    last_login: datetime
+    
+    __slots__ = tuple(__annotations__)
+
+# Profile fields counted by get_profile_completeness, out of _PROFILE_TOTAL_FIELDS
+_PROFILE_FIELDS = (
+    'email', 'first_name', 'last_name', 'age', 'height', 'weight', 'gender', 'sport_type',
+    'years_experience', 'fitness_level', 'training_frequency'
+)
+_PROFILE_TOTAL_FIELDS = 15
+
 class User(db.Model):
     __tablename__ = 'users'
     
@@ -36,9 +97,9 @@ class User(db.Model):
     gender = db.Column(db.String(10), nullable=False)
     
     # Sports information
-    sport_type = db.Column(db.Enum(SportType), nullable=False)
+    sport_type = db.Column(SmallIntEnum(SportType, _SPORT_TYPE_CODES), nullable=False)
     years_experience = db.Column(db.Integer, nullable=False)
-    fitness_level = db.Column(db.Enum(FitnessLevel), nullable=False)
+    fitness_level = db.Column(SmallIntEnum(FitnessLevel, _FITNESS_LEVEL_CODES), nullable=False)
     training_frequency = db.Column(db.Integer, nullable=False)  # days per week
     
     # Health information
@@ -47,43 +108,61 @@ class User(db.Model):
     medical_conditions = db.Column(db.Text)
     
     # Timestamps
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, server_default=utcnow())
+    updated_at = db.Column(db.DateTime, server_default=utcnow(), onupdate=utcnow())
     last_login = db.Column(db.DateTime)
     
-    # Relationships
-    trainings = db.relationship('Training', backref='user', lazy=True, cascade='all, delete-orphan')
-    performances = db.relationship('Performance', backref='user', lazy=True, cascade='all, delete-orphan')
+    # Relationships (loaded only on demand: endpoints query plans and tests directly, or count them in SQL)
+    trainings = db.relationship('TrainingPlan', back_populates='user', lazy=True, cascade='all, delete-orphan')
+    performances = db.relationship('Performance', back_populates='user', lazy=True, cascade='all, delete-orphan')
     
     def set_password(self, password):
         """Hash and set password"""
-        self.password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        # bcrypt releases the GIL, so concurrent request threads hash in parallel
+        hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(BCRYPT_COST))
+        self.password_hash = hashed.decode('utf-8')
     
     def check_password(self, password):
         """Check if provided password matches hash"""
         return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
     
-    def calculate_bmi(self):
-        """Calculate Body Mass Index"""
+    def password_needs_rehash(self):
+        """Whether the stored hash uses a lower work factor than BCRYPT_COST"""
+        # Hashes look like $2b$12$<salt+digest>; the cost sits between the second and third '$'
+        return int(self.password_hash.split('$')[2]) < BCRYPT_COST
+    
+    @hybrid_property
+    def bmi(self):
+        """Body Mass Index"""
         height_m = self.height / 100
         return round(self.weight / (height_m ** 2), 2)
     
+    @bmi.expression
+    def bmi(cls):
+        """SQL form of bmi (for filtering and ordering users by it)"""
+        height_m = cls.height / 100
+        return round2(cls.weight / (height_m * height_m))
+    
     def get_profile_completeness(self):
         """Calculate profile completeness percentage"""
-        total_fields = 15
-        completed_fields = 0
-        
-        required_fields = [
-            self.email, self.first_name, self.last_name, self.age,
-            self.height, self.weight, self.gender, self.sport_type,
-            self.years_experience, self.fitness_level, self.training_frequency
-        ]
-        
-        for field in required_fields:
-            if field is not None:
-                completed_fields += 1
-                
-        return round((completed_fields / total_fields) * 100, 2)
+        completed_fields = sum(getattr(self, name) is not None for name in _PROFILE_FIELDS)
+        return round(completed_fields / _PROFILE_TOTAL_FIELDS * 100, 2)
+    
+    @cached_property
+    def profile_dict(self):
+        """User profile fields as passed to the training optimizer (built once per instance)"""
+        return {
+            'age': self.age,
+            'height': self.height,
+            'weight': self.weight,
+            'gender': self.gender,
+            'sport_type': self.sport_type.value if self.sport_type else 'other',
+            'years_experience': self.years_experience,
+            'fitness_level': self.fitness_level.value if self.fitness_level else 'intermediate',
+            'training_frequency': self.training_frequency,
+            'has_injuries': self.has_injuries,
+            'injury_description': self.injury_description
+        }
     
     def to_dict(self):
         """Convert user object to dictionary"""
@@ -103,12 +182,22 @@ class User(db.Model):
             'has_injuries': self.has_injuries,
             'injury_description': self.injury_description,
             'medical_conditions': self.medical_conditions,
-            'bmi': self.calculate_bmi(),
+            'bmi': self.bmi,
             'profile_completeness': self.get_profile_completeness(),
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'last_login': self.last_login.isoformat() if self.last_login else None
         }
     
+    def to_view(self):
+        """Same content as to_dict(), left for orjson to encode"""
+        return UserView(
+            self.id, self.email, self.first_name, self.last_name, self.age, self.height, self.weight,
+            self.gender, self.sport_type, self.years_experience, self.fitness_level, self.training_frequency,
+            self.has_injuries, self.injury_description, self.medical_conditions,
+            self.bmi, self.get_profile_completeness(),
+            self.created_at, self.updated_at, self.last_login
+        )
+    
     def __repr__(self):
         return f'<User {self.email}>'
\ No newline at end of file
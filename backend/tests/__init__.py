@@ -0,0 +1,10 @@
+import atexit
+import os
+import tempfile
+
+# The app reads DATABASE_URL at import, so point it at a throwaway SQLite file before any test imports it
+_db_fd, _db_path = tempfile.mkstemp(suffix='.db')
+os.close(_db_fd)
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_path}'
+os.environ.pop('REDIS_URL', None)
+atexit.register(os.unlink, _db_path)
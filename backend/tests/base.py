@@ -0,0 +1,38 @@
+import unittest
+
+from app import app, init_database
+from models import db
+
+
+class ApiTestCase(unittest.TestCase):
+    """Fresh schema per test class and a registered user per test"""
+
+    @classmethod
+    def setUpClass(cls):
+        with app.app_context():
+            init_database()
+
+    @classmethod
+    def tearDownClass(cls):
+        with app.app_context():
+            db.drop_all()
+            db.engine.dispose()
+
+    def setUp(self):
+        self.client = app.test_client()
+        response = self.client.post('/api/auth/register', json={
+            'email': f'{self.id()}@example.com',
+            'password': 'secret123',
+            'first_name': 'Test',
+            'last_name': 'User',
+            'age': 25,
+            'height': 180,
+            'weight': 75,
+            'gender': 'male',
+            'sport_type': 'football',
+            'years_experience': 3,
+            'fitness_level': 'intermediate',
+            'training_frequency': 4
+        })
+        self.assertEqual(response.status_code, 201, response.get_data(as_text=True))
+        self.headers = {'Authorization': f"Bearer {response.get_json()['access_token']}"}
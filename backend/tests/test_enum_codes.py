@@ -0,0 +1,60 @@
+import unittest
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.schema import CreateTable
+
+from app import app, init_database
+from models import db, SmallIntEnum
+from models.performance import PerformanceBaseline, PerformanceMetric, TestType
+from tests.base import ApiTestCase
+
+
+class SmallIntEnumTestCase(unittest.TestCase):
+
+    def test_every_member_needs_a_unique_code(self):
+        with self.assertRaises(ValueError):
+            SmallIntEnum(TestType, {TestType.VERTICAL_JUMP: 1})
+        with self.assertRaises(ValueError):
+            SmallIntEnum(TestType, {member: 1 for member in TestType})
+
+
+class ConvertEnumColumnsTestCase(ApiTestCase):
+    """init_database() on a table created when enum columns still held member names"""
+
+    def test_legacy_name_columns_are_converted(self):
+        table = PerformanceBaseline.__table__
+        with app.app_context():
+            legacy_ddl = str(CreateTable(table).compile(db.engine)).replace(
+                'test_type SMALLINT', 'test_type VARCHAR(19)'
+            ).replace('metric SMALLINT', 'metric VARCHAR(17)')
+            with db.engine.begin() as connection:
+                connection.execute(text('DROP TABLE performance_baselines'))
+                connection.execute(text(legacy_ddl))
+                connection.execute(text(
+                    "INSERT INTO performance_baselines (user_id, test_type, metric, baseline_value, baseline_unit, "
+                    "baseline_date, tests_count) VALUES (1, 'T_TEST', 'AGILITY', 10.5, 's', :date, 0)"
+                ), {'date': datetime(2024, 1, 1)})
+
+            # Twice: the conversion is idempotent
+            init_database()
+            init_database()
+            db.session.remove()
+
+            baseline = PerformanceBaseline.query.filter_by(test_type='t_test', metric=PerformanceMetric.AGILITY).one()
+            self.assertIs(baseline.test_type, TestType.T_TEST)
+            self.assertIs(baseline.metric, PerformanceMetric.AGILITY)
+
+            db.session.add(PerformanceBaseline(
+                user_id=1, test_type='sprint_20m', metric='speed', baseline_value=3.1, baseline_unit='s',
+                baseline_date=datetime(2024, 1, 2)
+            ))
+            db.session.commit()
+            db.session.remove()
+            self.assertEqual(
+                sorted(b.test_type.value for b in PerformanceBaseline.query.all()), ['sprint_20m', 't_test']
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+from types import SimpleNamespace
+
+from api.performance import generate_ai_analysis
+
+
+def _tests(*values):
+    """Previous tests with the given primary values, newest first (as the handlers pass them)"""
+    return [SimpleNamespace(primary_value=value) for value in values]
+
+
+class GenerateAiAnalysisTrendTestCase(unittest.TestCase):
+    """Trend window of generate_ai_analysis: the three most recent previous tests"""
+
+    current = SimpleNamespace(improvement_from_last_test=None)
+
+    def trend(self, *values):
+        return generate_ai_analysis(self.current, _tests(*values))['trend_analysis']
+
+    def test_rising_recent_values_are_improving(self):
+        self.assertEqual(self.trend(12, 11, 10), 'improving')
+
+    def test_falling_recent_values_are_declining(self):
+        self.assertEqual(self.trend(10, 11, 12), 'declining')
+
+    def test_older_tests_are_ignored(self):
+        # Newest three rise; the older ones (which used to be the window) fall
+        self.assertEqual(self.trend(12, 11, 10, 20, 30, 40), 'improving')
+        self.assertEqual(self.trend(10, 11, 12, 5, 4, 3), 'declining')
+
+    def test_mixed_recent_values_are_variable(self):
+        self.assertEqual(self.trend(11, 12, 10, 9), 'variable')
+
+    def test_fewer_than_three_tests_are_stable(self):
+        self.assertEqual(self.trend(12, 11), 'stable')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+from tests.base import ApiTestCase
+
+
+class BulkPerformanceTestsTestCase(ApiTestCase):
+    """POST /api/performance/tests/bulk"""
+
+    def post_tests(self, values, test_type='t_test', metric='agility'):
+        return self.client.post('/api/performance/tests/bulk', headers=self.headers, json={'tests': [
+            {
+                'test_type': test_type,
+                'primary_metric': metric,
+                'primary_value': value,
+                'primary_unit': 's',
+                'test_date': f'2024-01-{day:02d}T10:00:00'
+            }
+            for day, value in enumerate(values, start=1)
+        ]})
+
+    def test_several_records_for_new_metric(self):
+        response = self.post_tests([10.4, 10.1, 10.3])
+        self.assertEqual(response.status_code, 201, response.get_data(as_text=True))
+
+        body = response.get_json()
+        self.assertEqual(body['created'], 3)
+        baseline, = body['baselines_updated']
+        # Same result as posting the records one by one: the first sets the baseline
+        self.assertEqual(baseline['baseline_value'], 10.4)
+        self.assertEqual(baseline['current_best'], 10.1)
+        self.assertEqual(baseline['tests_count'], 2)
+
+    def test_new_and_stored_baselines(self):
+        self.assertEqual(self.post_tests([50.0], test_type='vertical_jump', metric='power').status_code, 201)
+
+        response = self.post_tests([52.0, 49.0], test_type='vertical_jump', metric='power')
+        self.assertEqual(response.status_code, 201, response.get_data(as_text=True))
+        baseline, = response.get_json()['baselines_updated']
+        self.assertEqual(baseline['baseline_value'], 50.0)
+        self.assertEqual(baseline['current_best'], 52.0)
+        self.assertEqual(baseline['tests_count'], 2)
+
+    def test_unknown_enum_value_is_rejected_before_writing(self):
+        response = self.client.post('/api/performance/tests/bulk', headers=self.headers, json={'tests': [
+            {'test_type': 't_test', 'primary_metric': 'agility', 'primary_value': 10.4, 'primary_unit': 's'},
+            {'test_type': 'long_jump', 'primary_metric': 'power', 'primary_value': 2.1, 'primary_unit': 'm'}
+        ]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()['error'], "Test 1: invalid test_type: 'long_jump'")
+
+        response = self.client.get('/api/performance/tests', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['tests'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import time
+import unittest
+
+from app import app
+from models import db
+from models.performance import Performance
+from tests.base import ApiTestCase
+
+
+class RecordPerformanceTestTestCase(ApiTestCase):
+    """POST /api/performance/tests and its background enrichment"""
+
+    def post_test(self, value, day):
+        return self.client.post('/api/performance/tests', headers=self.headers, json={
+            'test_type': 'vertical_jump',
+            'primary_metric': 'power',
+            'primary_value': value,
+            'primary_unit': 'cm',
+            'test_date': f'2024-03-{day:02d}T10:00:00'
+        })
+
+    def wait_for_analysis(self, test_id, timeout=5):
+        """GET /tests/<id> until the background task has filled in the analysis"""
+        deadline = time.monotonic() + timeout
+        while True:
+            test = self.client.get(f'/api/performance/tests/{test_id}', headers=self.headers).get_json()
+            if test['ai_analysis'] or time.monotonic() > deadline:
+                return test
+            time.sleep(0.05)
+
+    def test_returns_202_and_enriches_in_background(self):
+        response = self.post_test(40.0, 1)
+        self.assertEqual(response.status_code, 202, response.get_data(as_text=True))
+        body = response.get_json()
+        self.assertEqual(body['message'], 'Performance test recorded, analysis in progress')
+        self.assertEqual(body['performance']['primary_value'], 40.0)
+        self.assertEqual(body['baseline_updated']['baseline_value'], 40.0)
+
+        test = self.wait_for_analysis(body['performance']['id'])
+        self.assertIn('trend_analysis', test['ai_analysis'])
+        self.assertIsNotNone(test['percentile_rank'])
+        self.assertIsNotNone(test['recommendations'])
+
+    def test_improvement_from_last_test_is_filled(self):
+        first = self.post_test(40.0, 1).get_json()['performance']
+        self.assertIsNone(first['improvement_from_last_test'])
+
+        second = self.post_test(44.0, 2).get_json()['performance']
+        self.assertEqual(second['improvement_from_last_test'], 10.0)
+
+    def test_backdated_test_is_compared_with_the_tests_before_it(self):
+        for day, value in ((1, 40.0), (2, 41.0), (3, 42.0), (10, 30.0)):
+            self.wait_for_analysis(self.post_test(value, day).get_json()['performance']['id'])
+
+        # Taken on day 4, recorded last: the tests of days 1-3 rise, the later day-10 test is not before it
+        test = self.wait_for_analysis(self.post_test(43.0, 4).get_json()['performance']['id'])
+        self.assertEqual(test['ai_analysis']['trend_analysis'], 'improving')
+
+    def test_enrich_pending_finishes_lost_background_work(self):
+        user_id = self.client.get('/api/auth/profile', headers=self.headers).get_json()['id']
+        with app.app_context():
+            performance = Performance(
+                user_id=user_id, test_type='vertical_jump', primary_metric='power',
+                primary_value=40.0, primary_unit='cm'
+            )
+            db.session.add(performance)
+            db.session.commit()
+            test_id = performance.id
+
+        result = app.test_cli_runner().invoke(args=['enrich-pending'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn('Enriched 1 pending performance tests', result.output)
+
+        test = self.client.get(f'/api/performance/tests/{test_id}', headers=self.headers).get_json()
+        self.assertIn('trend_analysis', test['ai_analysis'])
+
+
+if __name__ == '__main__':
+    unittest.main()
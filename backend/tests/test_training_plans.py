@@ -0,0 +1,32 @@
+import unittest
+from datetime import datetime
+
+from app import app
+from models import db
+from models.training import TrainingPlan
+from tests.base import ApiTestCase
+
+
+class TrainingPlansListTestCase(ApiTestCase):
+    """GET /api/training/plans"""
+
+    def test_plans_created_in_the_same_second_are_newest_first(self):
+        user_id = self.client.get('/api/auth/profile', headers=self.headers).get_json()['id']
+        created_at = datetime(2024, 3, 1, 10, 0, 0)
+        with app.app_context():
+            plans = [
+                TrainingPlan(user_id=user_id, name=f'Plan {i}', week_number=1, training_type='strength',
+                             created_at=created_at)
+                for i in range(3)
+            ]
+            db.session.add_all(plans)
+            db.session.commit()
+            plan_ids = [plan.id for plan in plans]
+
+        response = self.client.get('/api/training/plans', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([plan['id'] for plan in response.get_json()['plans']], plan_ids[::-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
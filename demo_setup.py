@@ -7,9 +7,16 @@ import json
 import os
 from datetime import datetime
 
+try:
+    import orjson  # installed with backend/requirements.txt; the script also runs without it
+except ImportError:
+    orjson = None
+
 def create_sample_data():
     """Create sample data for demo purposes"""
     
+    now = datetime.utcnow().isoformat()
+    
     # Sample user data
     sample_user = {
         "email": "demo@sportsai.com",
@@ -71,7 +78,7 @@ def create_sample_data():
             "primary_metric": "power",
             "primary_value": 45.5,
             "primary_unit": "cm",
-            "test_date": datetime.utcnow().isoformat(),
+            "test_date": now,
             "improvement_from_baseline": 0.0,
             "percentile_rank": 65.5
         },
@@ -80,7 +87,7 @@ def create_sample_data():
             "primary_metric": "speed", 
             "primary_value": 3.2,
             "primary_unit": "seconds",
-            "test_date": datetime.utcnow().isoformat(),
+            "test_date": now,
             "improvement_from_baseline": 0.0,
             "percentile_rank": 72.3
         }
@@ -96,6 +103,7 @@ def generate_demo_api_responses():
     """Generate sample API responses for frontend testing"""
     
     sample_data = create_sample_data()
+    now = datetime.utcnow().isoformat()
     
     # API responses structure
     api_responses = {
@@ -128,13 +136,13 @@ def generate_demo_api_responses():
                     {
                         "type": "training_session",
                         "title": "Training Day 1 - Power Focus",
-                        "date": datetime.utcnow().isoformat(),
+                        "date": now,
                         "status": "completed"
                     },
                     {
                         "type": "performance_test",
                         "title": "Vertical Jump Test",
-                        "date": datetime.utcnow().isoformat(),
+                        "date": now,
                         "status": "completed"
                     }
                 ]
@@ -180,18 +188,23 @@ def generate_demo_api_responses():
     
     return api_responses
 
-def create_demo_files():
+def create_demo_files(demo_data=None):
     """Create demo files and documentation"""
     
     # Create demo data directory
     os.makedirs("demo_data", exist_ok=True)
     
-    # Generate sample data
-    demo_data = generate_demo_api_responses()
+    # Generate sample data (unless the caller already has it)
+    if demo_data is None:
+        demo_data = generate_demo_api_responses()
     
     # Save to JSON file
-    with open("demo_data/sample_api_responses.json", "w", encoding="utf-8") as f:
-        json.dump(demo_data, f, indent=2, ensure_ascii=False)
+    if orjson is not None:
+        with open("demo_data/sample_api_responses.json", "wb") as f:
+            f.write(orjson.dumps(demo_data, option=orjson.OPT_INDENT_2))
+    else:
+        with open("demo_data/sample_api_responses.json", "w", encoding="utf-8") as f:
+            json.dump(demo_data, f, indent=2, ensure_ascii=False)
     
     # Create project structure documentation
     project_structure = """
@@ -359,10 +372,11 @@ def main():
     print("🚀 Sports AI Platform Demo Setup")
     print("=" * 50)
     
-    create_demo_files()
+    # Built once: written to disk and summarized below
+    demo_data = generate_demo_api_responses()
+    create_demo_files(demo_data)
     
     print("\n📊 Sample Data Generated:")
-    demo_data = generate_demo_api_responses()
     
     print(f"👤 User: {demo_data['auth']['login']['user']['first_name']} {demo_data['auth']['login']['user']['last_name']}")
     print(f"🏃 Sport: {demo_data['auth']['login']['user']['sport_type']}")